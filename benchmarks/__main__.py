@@ -0,0 +1,100 @@
+import argparse
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.history import HISTORY_FILE, append_history, load_history, load_thresholds, regressions
+from benchmarks.suite import FEATURE_FILE, attachment_throughput, client_overhead, run_scenarios
+from features.utils.stub_server import StubServer
+
+parser = argparse.ArgumentParser(description="Benchmark the test harness against a local stand-in API.")
+parser.add_argument("--workers", type=int, default=1, help="behave processes for the scenario run")
+parser.add_argument("--feature", default=FEATURE_FILE, help="Feature file to run for scenarios/s")
+parser.add_argument("--requests", type=int, default=500, help="Requests for the client overhead measurement")
+parser.add_argument("--attachments", type=int, default=2000, help="Attachments for the write throughput measurement")
+parser.add_argument("--attachment-kb", type=int, default=8, help="Size of each attachment")
+parser.add_argument("--history", default=HISTORY_FILE, help="JSON history file")
+parser.add_argument("--baseline-runs", type=int, default=5, help="Previous runs whose median is the baseline")
+parser.add_argument("--no-record", action="store_true", help="Compare against the history without appending this run")
+args = parser.parse_args()
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "features", "run_tests.py"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return f"{revision}{'-dirty' if dirty else ''}"
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+work_dir = tempfile.mkdtemp(prefix="harness-bench-")
+stub = StubServer().start()
+try:
+    print(f"\n Stand-in API on {stub.base_url}; scratch files in {work_dir}")
+
+    print(f" Running {args.feature} with {args.workers} worker(s)...")
+    scenarios = run_scenarios(stub.base_url, work_dir, args.workers, args.feature)
+
+    print(f" Measuring client overhead over {args.requests} requests...")
+    account = stub.ledger.create_account({"currency": "USD"})[1]
+    overhead = client_overhead(stub.base_url, account["id"], args.requests)
+
+    print(f" Writing {args.attachments} attachments of {args.attachment_kb} KB...")
+    attachments = attachment_throughput(work_dir, args.attachments, args.attachment_kb)
+finally:
+    stub.stop()
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+metrics = {
+    "scenarios_per_second": scenarios["scenarios_per_second"],
+    "before_scenario_ms": scenarios["before_scenario_ms"],
+    "client_overhead_ms": overhead["client_overhead_ms"],
+    "attachments_mb_per_s": attachments["attachments_mb_per_s"],
+    "peak_rss_mb": scenarios["peak_rss_mb"],
+}
+run = {
+    "timestamp": time.time(),
+    "revision": git_revision(),
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "metrics": metrics,
+    "details": {"scenarios": scenarios, "client": overhead, "attachments": attachments},
+}
+
+print(f"\n {scenarios['scenarios']} scenarios in {scenarios['elapsed_s']}s: {metrics['scenarios_per_second']} scenarios/s"
+      f" ({scenarios['workers']} worker(s), failed workers: {scenarios['failed_workers'] or 'none'})")
+print(f" before_scenario fixture: median {metrics['before_scenario_ms']} ms, p95 {scenarios['before_scenario_p95_ms']} ms")
+print(f" Client overhead: {metrics['client_overhead_ms']} ms/request "
+      f"(raw {overhead['raw_request_ms']} ms, client {overhead['client_request_ms']} ms)")
+print(f" Attachments: {attachments['attachments_per_second']}/s, {metrics['attachments_mb_per_s']} MB/s "
+      f"({attachments['deduplicated']} deduplicated)")
+print(f" Peak RSS per worker (MB): {scenarios['peak_rss_mb_per_worker']}")
+
+# Numbers from a run where workers failed or scenarios were skipped are not comparable to the history
+incomplete = bool(scenarios["failed_workers"] or scenarios["not_run"])
+if scenarios["not_run"]:
+    print(f" {len(scenarios['not_run'])} of {scenarios['discovered']} scenario(s) did not run: {scenarios['not_run']}")
+
+history = load_history(args.history)
+results = regressions(metrics, history, load_thresholds(), args.baseline_runs)
+if results:
+    print(f"\n Against the median of the last {min(len(history), args.baseline_runs)} run(s):")
+    for result in results:
+        flag = "REGRESSION" if result["regressed"] else "ok"
+        print(f"   {flag:<10} {result['metric']:<22} {result['current']} vs {result['baseline']} "
+              f"({result['worse_by']:+.1%} worse, {result['allowed']:.0%} allowed)")
+else:
+    print("\n No history yet; this run becomes the baseline.")
+
+if incomplete:
+    print(" Incomplete run; not appended to the history\n")
+elif not args.no_record:
+    append_history(run, args.history)
+    print(f" Run appended to {args.history}\n")
+
+# Non-zero exit on an incomplete run or a regression beyond the thresholds in benchmarks/thresholds.json (useful for CI/CD pipelines)
+sys.exit(1 if incomplete or any(result["regressed"] for result in results) else 0)
@@ -0,0 +1,31 @@
+import atexit
+import json
+import sys
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where the resource module is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+def main():
+    """python -m benchmarks.behave_worker <stats.json> <behave args...>: runs behave and records its memory peak."""
+    stats_path, behave_args = sys.argv[1], sys.argv[2:]
+
+    def write_stats():
+        with open(stats_path, "w", encoding="utf-8") as handle:
+            json.dump({"peak_rss_mb": peak_rss_mb()}, handle)
+
+    atexit.register(write_stats)
+    from behave.__main__ import main as behave_main
+    sys.exit(behave_main(behave_args))
+
+
+if __name__ == "__main__":
+    main()
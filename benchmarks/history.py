@@ -0,0 +1,57 @@
+import json
+import os
+import statistics
+
+HISTORY_FILE = os.path.join("reports", "benchmark_history.json")
+THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), "thresholds.json")
+
+
+def load_history(path=HISTORY_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def append_history(run, path=HISTORY_FILE):
+    history = load_history(path)
+    history.append(run)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(history, handle, indent=2)
+    return history
+
+
+def load_thresholds(path=THRESHOLDS_FILE):
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def regressions(metrics, history, thresholds, baseline_runs=5):
+    """
+    Compares `metrics` with the median of the last `baseline_runs` runs in `history`.
+
+    A metric regresses when it is worse than that baseline by more than its
+    max_regression fraction (e.g. 0.2 = 20% fewer scenarios/s, or 20% more memory).
+    Returns one dict per metric that has a baseline, with "regressed" set accordingly.
+    """
+    results = []
+    for name, rule in thresholds.items():
+        previous = [run["metrics"][name] for run in history[-baseline_runs:] if run["metrics"].get(name) is not None]
+        current = metrics.get(name)
+        if not previous or current is None:
+            continue
+        baseline = statistics.median(previous)
+        if rule["higher_is_better"]:
+            change = (baseline - current) / baseline if baseline else 0.0
+        else:
+            change = (current - baseline) / baseline if baseline else 0.0
+        results.append({
+            "metric": name,
+            "baseline": round(baseline, 3),
+            "current": current,
+            "worse_by": round(change, 4),
+            "allowed": rule["max_regression"],
+            "regressed": change > rule["max_regression"],
+        })
+    return results
@@ -0,0 +1,161 @@
+import glob
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from features.utils.load import percentile
+from features.utils.scheduler import assign_shards, base_scenario_name, discover_scenarios, load_durations
+
+FEATURE_FILE = os.path.join("features", "fund_transfer.feature")
+
+
+def _median_ms(seconds):
+    return round(statistics.median(seconds) * 1000, 3) if seconds else None
+
+
+# ================================
+# Scenario throughput, fixture cost and memory (behave against the stand-in)
+# ================================
+
+def run_scenarios(base_url, work_dir, workers=1, feature_file=FEATURE_FILE):
+    """
+    Runs `feature_file` in `workers` behave processes against `base_url` and returns
+    scenarios/s, before_scenario fixture cost (from the profiler timings) and the peak
+    RSS of every worker.
+    """
+    from features.utils.scheduler import behave_command
+
+    scenarios = discover_scenarios([feature_file])
+    shards = assign_shards(scenarios, workers, load_durations())
+    timings_dir = os.path.join(work_dir, "timings")
+
+    def run_worker(index, shard):
+        worker_id = f"bench-{index}"
+        stats_path = os.path.join(work_dir, f"{worker_id}.json")
+        command = behave_command([feature_file], shard["scenarios"], os.path.join(work_dir, "allure", worker_id))
+        # Same argv as a scheduler shard, but behave runs under the memory-reporting wrapper
+        command = [sys.executable, "-m", "benchmarks.behave_worker", stats_path] + command[3:]
+        env = dict(
+            os.environ,
+            TEST_WORKER_ID=worker_id,
+            API_MODE="live",
+            API_BASE_URL=base_url,
+            API_CASSETTE_MODE="off",
+            PROFILING_ENABLED="true",
+            TIMINGS_DIR=timings_dir,
+            RESULTS_DB=os.path.join(work_dir, "results.db"),
+            LOG_DIR=os.path.join(work_dir, "logs"),
+        )
+        exit_code = subprocess.call(command, env=env, stdout=subprocess.DEVNULL)
+        with open(stats_path, encoding="utf-8") as handle:
+            return dict(json.load(handle), worker=worker_id, exit_code=exit_code)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        worker_stats = list(executor.map(lambda item: run_worker(*item), enumerate(shards)))
+    elapsed = time.perf_counter() - started
+
+    executed = 0
+    executed_names = set()
+    fixture_seconds = []
+    for path in glob.glob(os.path.join(timings_dir, "api", "*.json")):
+        with open(path, encoding="utf-8") as handle:
+            timings = json.load(handle)
+        executed += len(timings["scenarios"])
+        executed_names.update(base_scenario_name(scenario["name"]) for scenario in timings["scenarios"])
+        fixture_seconds += [fixture["seconds"] for fixture in timings["fixtures"] if fixture["scenario"] is not None]
+
+    ordered = sorted(fixture_seconds)
+    peaks = [stats["peak_rss_mb"] for stats in worker_stats if stats["peak_rss_mb"] is not None]
+    return {
+        "workers": len(shards),
+        "scenarios": executed,
+        "discovered": len(scenarios),
+        "not_run": [name for name in scenarios if name not in executed_names],
+        "elapsed_s": round(elapsed, 3),
+        "scenarios_per_second": round(executed / elapsed, 3) if elapsed else 0.0,
+        "before_scenario_ms": _median_ms(fixture_seconds),
+        "before_scenario_p95_ms": round(percentile(ordered, 0.95) * 1000, 3) if ordered else None,
+        "peak_rss_mb": max(peaks) if peaks else None,
+        "peak_rss_mb_per_worker": {stats["worker"]: stats["peak_rss_mb"] for stats in worker_stats},
+        "failed_workers": [stats["worker"] for stats in worker_stats if stats["exit_code"] != 0],
+    }
+
+
+# ================================
+# Per-request client overhead
+# ================================
+
+def client_overhead(base_url, account_id, requests=500):
+    """
+    Median time of a deposit through ApiClient minus the same request sent over a raw
+    keep-alive http.client connection: what the client layer adds on top of the wire.
+    """
+    from features.utils.api_client import ApiClient, deposit_payload
+
+    payload = json.dumps(deposit_payload(account_id, 1, "USD"))
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port)
+    raw = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        connection.request("POST", "/transaction/deposit", body=payload, headers={"Content-Type": "application/json"})
+        connection.getresponse().read()
+        raw.append(time.perf_counter() - started)
+    connection.close()
+
+    client = ApiClient(base_url=base_url, pool_size=1, retries=0)
+    # Same shape as a profiled run: one listener per request
+    client.listeners.append(lambda record: None)
+    wrapped = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.deposit(account_id, 1, "USD").json()
+        wrapped.append(time.perf_counter() - started)
+    client.close()
+
+    return {
+        "requests": requests,
+        "raw_request_ms": _median_ms(raw),
+        "client_request_ms": _median_ms(wrapped),
+        "client_overhead_ms": round(max(0.0, statistics.median(wrapped) - statistics.median(raw)) * 1000, 3),
+    }
+
+
+# ================================
+# Allure attachment write throughput
+# ================================
+
+def attachment_throughput(work_dir, count=2000, size_kb=8, duplicate_ratio=0.25, batch_size=None):
+    """Pushes `count` attachments through BufferedAttachmentWriter and times them until they are on disk."""
+    from allure_commons.logger import AllureFileLogger
+    from features.utils import config
+    from features.utils.attachments import BufferedAttachmentWriter
+
+    report_dir = os.path.join(work_dir, "attachments")
+    os.makedirs(report_dir, exist_ok=True)
+    writer = BufferedAttachmentWriter(AllureFileLogger(report_dir), batch_size=batch_size or config.ATTACHMENT_BATCH_SIZE)
+
+    filler = "x" * (size_kb * 1024)
+    unique = max(1, int(count * (1 - duplicate_ratio)))
+    bodies = [f'{{"n": {index % unique}, "payload": "{filler}"}}' for index in range(count)]
+    total_bytes = sum(len(body) for body in bodies)
+
+    started = time.perf_counter()
+    for index, body in enumerate(bodies):
+        writer.report_attached_data(body, f"bench-{index}-attachment.json")
+    writer.flush()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "attachments": count,
+        "size_kb": size_kb,
+        "deduplicated": writer.deduplicated,
+        "attachments_per_second": round(count / elapsed, 1),
+        "attachments_mb_per_s": round(total_bytes / (1024 * 1024) / elapsed, 2),
+    }
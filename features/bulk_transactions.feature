@@ -0,0 +1,10 @@
+Feature: Data-driven Transaction Testing
+
+  Scenario Outline: Transactions from a dataset return their expected status
+    Given the transaction dataset "<dataset>"
+    When the dataset rows are executed in batches of <batch_size>
+    Then every dataset row should return its expected status
+
+    Examples:
+      | dataset               | batch_size |
+      | data/transactions.csv | 10         |
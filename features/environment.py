@@ -1,35 +1,159 @@
-import requests
-import logging
-import allure
-from features.utils.config import API_BASE_URL
-from features.utils.logger import logger
+import re
+from features.utils import attachments, config
+from features.utils.account_pool import AccountPool, aacquire_account, parse_buckets, prefetch_accounts
+from features.utils.api_client import close_client, get_client
+from features.utils.async_client import configure_async_client, ledger_transport
+from features.utils.async_steps import close_worker_loop, run
+from features.utils.logger import logger, set_log_context
+from features.utils.profiling import Profiler, timed_fixture
+from features.utils.results_store import ScenarioRecorder, runner_step_registry
+
+ACCOUNT_KEYWORDS = ["existing account", "debit account", "credit account", "transfer money"]
+
+# Setup steps that take an account, mapped to the (currency, balance) they ask for
+ACCOUNT_STEPS = [
+    (re.compile(r'^an existing account$'), lambda match: ("USD", 0.0)),
+    (re.compile(r'^an existing debit account with balance (?P<balance>\S+) in "(?P<currency>[^"]+)"$'),
+     lambda match: (match["currency"], float(match["balance"]))),
+]
+
+def before_all(context):
+    """Bulk-create and pre-fund the accounts scenarios will need, so scenario setup is just a pool lookup."""
+    context.recorder = ScenarioRecorder(runner_step_registry(context))
+    context.profiler = None
+    if config.PROFILING_ENABLED:
+        context.profiler = Profiler(config.WORKER_ID, config.PROFILE_REQUEST_SAMPLE)
+        get_client().listeners.append(context.profiler.record_request)
+
+    attachments.install()
+
+    # responses (stub mode) and the cassette layer are only imported when they are switched on
+    context.api_stub = None
+    transport = None
+    if config.API_MODE == "stub":
+        from features.utils.stub_mode import start_stub
+        context.api_stub = start_stub()
+        transport = ledger_transport(context.api_stub.ledger)
+    if config.API_CASSETTE_MODE != "off":
+        from features.utils.cassette import cassette_transport, get_cassette
+        transport = cassette_transport(get_cassette(), transport)
+    if config.SERIAL_ACCOUNT_SETUP:
+        logger.warning("Recording a cassette: account pool, prefetching and concurrent dataset rows are off for this run")
+    configure_async_client(
+        transport=transport,
+        listeners=[context.profiler.record_request] if context.profiler is not None else []
+    )
+    context.prefetched_accounts = {}
+
+    context.account_pool = None
+    if config.ACCOUNT_POOL_ENABLED:
+        with timed_fixture(context, "account pool provisioning"):
+            context.account_pool = AccountPool(
+                parse_buckets(config.ACCOUNT_POOL_BUCKETS),
+                size=config.ACCOUNT_POOL_SIZE,
+                concurrency=config.ACCOUNT_POOL_CONCURRENCY
+            )
+            context.account_pool.provision()
+
+def accounts_needed(scenario):
+    """The (currency, balance) of every account the scenario will acquire, in acquisition order."""
+    needs = []
+    if any(keyword in scenario.name.lower() for keyword in ACCOUNT_KEYWORDS):
+        needs += [("USD", 0.0), ("USD", 0.0)]
+    for step in scenario.all_steps:
+        for pattern, account in ACCOUNT_STEPS:
+            match = pattern.match(step.name)
+            if match:
+                needs.append(account(match))
+    return needs
+
+
+def before_feature(context, feature):
+    """Without an account pool, start creating every scenario's accounts up front on the async loop."""
+    if context.account_pool is not None or not config.ASYNC_PREFETCH_ENABLED:
+        return
+    for scenario in feature.walk_scenarios():
+        needs = accounts_needed(scenario)
+        if needs and scenario.should_run(context.config):
+            prefetch_accounts(context, scenario, needs)
+
 
 def before_scenario(context, scenario):
     """
     Before each scenario, check if it requires test accounts.
     Additionally, ensure a specific balance exists for withdrawal scenarios.
     """
+    set_log_context(scenario=scenario.name, step=None)
+    context.recorder.start_scenario(scenario)
+    if context.profiler is not None:
+        context.profiler.start_scenario(scenario)
 
     # Create test accounts if required
-    if any(keyword in scenario.name.lower() for keyword in ["existing account", "debit account", "credit account", "transfer money"]):
-        create_test_accounts(context)
+    if any(keyword in scenario.name.lower() for keyword in ACCOUNT_KEYWORDS):
+        with timed_fixture(context, "test accounts"):
+            create_test_accounts(context)
 
 
 def create_test_accounts(context):
-    """Creates debit & credit accounts before tests that need them."""
-    url = f"{API_BASE_URL}/account"
-    payload = {"currency": "USD"}
-
-    # Create debit account
-    logger.info("Creating a test debit account before scenario execution...")
-    response = requests.post(url, json=payload)
-    assert response.status_code == 201, f"Failed to create test debit account. Response: {response.text}"
-    context.debit_account_id = response.json().get("id")
-    logger.info(f"Test debit account created with ID: {context.debit_account_id}")
-
-    # Create credit account
-    logger.info("Creating a test credit account before scenario execution...")
-    response = requests.post(url, json=payload)
-    assert response.status_code == 201, f"Failed to create test credit account. Response: {response.text}"
-    context.credit_account_id = response.json().get("id")
-    logger.info(f"Test credit account created with ID: {context.credit_account_id}")
+    """Hands out debit & credit accounts before tests that need them; both are acquired concurrently unless a cassette is active."""
+
+    import asyncio
+
+    async def acquire_pair():
+        if config.SERIAL_ACCOUNT_SETUP:
+            return [await aacquire_account(context, "USD"), await aacquire_account(context, "USD")]
+        return await asyncio.gather(aacquire_account(context, "USD"), aacquire_account(context, "USD"))
+
+    debit, credit = run(acquire_pair())
+    context.debit_account_id = debit["id"]
+    logger.info(f"Test debit account ready with ID: {context.debit_account_id}")
+
+    context.credit_account_id = credit["id"]
+    logger.info(f"Test credit account ready with ID: {context.credit_account_id}")
+
+
+def before_step(context, step):
+    set_log_context(step=f"{step.keyword} {step.name}")
+    if context.profiler is not None:
+        context.profiler.start_step(step)
+
+
+def after_step(context, step):
+    """Keep or drop the attachments held back for this step, depending on ATTACHMENT_LEVEL."""
+    if context.profiler is not None:
+        context.profiler.end_step(step)
+    context.recorder.record_step(step)
+    attachments.after_step(step)
+
+
+def after_scenario(context, scenario):
+    if context.profiler is not None:
+        context.profiler.end_scenario(scenario)
+    context.recorder.end_scenario(scenario)
+    set_log_context(scenario=None, step=None)
+
+
+def after_all(context):
+    """Report account pool usage and timings, and release the pooled HTTP connections once the run is over."""
+    if context.account_pool is not None:
+        logger.info(f"Account pool stats: {context.account_pool.stats()}")
+        print(f"\n Account pool stats: {context.account_pool.stats()}\n")
+        context.account_pool.close()
+    close_client()
+    close_worker_loop()
+    if config.API_CASSETTE_MODE != "off":
+        from features.utils.cassette import close_cassette
+        cassette_stats = close_cassette()
+        if cassette_stats is not None:
+            logger.info(f"API cassette stats: {cassette_stats}")
+            print(f" API cassette stats: {cassette_stats}\n")
+    attachments.flush()
+    context.recorder.flush(config.WORKER_ID)
+    if context.api_stub is not None:
+        from features.utils.stub_mode import stop_stub
+        stop_stub(context.api_stub)
+
+    if context.profiler is not None:
+        path = context.profiler.write(f"{config.TIMINGS_DIR}/api", config.PROFILE_TOP_N)
+        print(context.profiler.format_summary(config.PROFILE_TOP_N))
+        print(f" Timings written to {path}\n")
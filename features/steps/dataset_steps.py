@@ -0,0 +1,54 @@
+from behave import given, when, then
+from features.utils import config
+from features.utils.attachments import allure_step, attach, attachment_type
+from features.utils.datasets import resolve_dataset, run_dataset
+from features.utils.logger import logger
+from features.utils.validation import to_json
+
+# ================================
+# Data-driven Transaction Steps
+# ================================
+
+@allure_step("Given the transaction dataset {dataset}")
+@given("the transaction dataset \"{dataset}\"")
+def step_impl(context, dataset):
+    """Stores the dataset path; rows are only read when the dataset is executed."""
+    context.dataset = resolve_dataset(dataset)
+    logger.info(f"Using transaction dataset: {context.dataset}")
+
+@allure_step("When the dataset rows are executed in batches of {batch_size}")
+@when("the dataset rows are executed in batches of {batch_size:d}")
+def step_impl(context, batch_size):
+    """Streams the dataset through the shared API client; only failing rows are attached to Allure."""
+
+    def report_failure(failure):
+        logger.error(f"Dataset row {failure['row']} failed: expected {failure['expected']} but got {failure['actual']}")
+        attach(
+            lambda: to_json(failure),
+            name=f"Dataset row {failure['row']} (expected {failure['expected']}, got {failure['actual']})",
+            attachment_type=attachment_type.JSON
+        )
+
+    context.dataset_run = run_dataset(
+        context.dataset,
+        batch_size=batch_size,
+        concurrency=config.DATASET_CONCURRENCY,
+        on_failure=report_failure
+    )
+    logger.info(f"Dataset {context.dataset}: {context.dataset_run.passed}/{context.dataset_run.rows} rows passed")
+
+@allure_step("Then every dataset row should return its expected status")
+@then("every dataset row should return its expected status")
+def step_impl(context):
+    """Asserts on the aggregated dataset outcome."""
+    run = context.dataset_run
+    attach(
+        to_json({"rows": run.rows, "passed": run.passed, "failed": run.failure_count, "outcomes": run.outcomes}),
+        name="Dataset Summary",
+        attachment_type=attachment_type.JSON
+    )
+    assert run.rows > 0, f"Dataset {context.dataset} has no rows"
+    assert run.failure_count == 0, (
+        f"{run.failure_count} of {run.rows} dataset rows failed; first failures: "
+        + "; ".join(f"row {failure['row']}: expected {failure['expected']} got {failure['actual']}" for failure in run.failures[:5])
+    )
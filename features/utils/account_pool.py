@@ -0,0 +1,199 @@
+import queue
+import threading
+from features.utils.api_client import get_client
+from features.utils.logger import logger
+
+
+class AccountProvisioningError(Exception):
+    """Raised when the API refuses to create or fund a pooled account."""
+
+
+def parse_buckets(spec):
+    """Parses "USD:0,USD:500,EUR:0" into [("USD", 0.0), ("USD", 500.0), ("EUR", 0.0)]."""
+    buckets = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        currency, _, balance = item.partition(":")
+        buckets.append((currency.strip(), float(balance or 0)))
+    return buckets
+
+
+def create_account(client, currency, balance=0):
+    """Creates (and funds, when balance > 0) one account through the API."""
+    response = client.create_account(currency)
+    if response.status_code != 201:
+        raise AccountProvisioningError(f"Failed to create {currency} account. Response: {response.text}")
+    account = {"id": response.json().get("id"), "currency": currency, "balance": float(balance)}
+
+    if balance:
+        response = client.deposit(account["id"], balance, currency)
+        if response.status_code != 200:
+            raise AccountProvisioningError(f"Failed to fund account {account['id']}. Response: {response.text}")
+    return account
+
+
+async def acreate_account(client, currency, balance=0):
+    """create_account for an AsyncApiClient; the deposit still waits for the create, other setup can overlap."""
+    response = await client.create_account(currency)
+    if response.status_code != 201:
+        raise AccountProvisioningError(f"Failed to create {currency} account. Response: {response.text}")
+    account = {"id": response.json().get("id"), "currency": currency, "balance": float(balance)}
+
+    if balance:
+        response = await client.deposit(account["id"], balance, currency)
+        if response.status_code != 200:
+            raise AccountProvisioningError(f"Failed to fund account {account['id']}. Response: {response.text}")
+    return account
+
+
+def acquire_account(context, currency="USD", balance=0):
+    """Takes an account from the scenario's pool, or creates one directly when pooling is disabled."""
+    prefetched = _take_prefetched(context, currency, balance)
+    if prefetched is not None:
+        return prefetched.result()
+    pool = getattr(context, "account_pool", None)
+    if pool is None:
+        return create_account(get_client(), currency, balance)
+    return pool.acquire(currency, balance)
+
+
+async def aacquire_account(context, currency="USD", balance=0):
+    """acquire_account for coroutine steps: prefetched, pooled, or created with the async client."""
+    from features.utils.async_client import get_async_client
+
+    import asyncio
+
+    prefetched = _take_prefetched(context, currency, balance)
+    if prefetched is not None:
+        return await asyncio.wrap_future(prefetched)
+    pool = getattr(context, "account_pool", None)
+    if pool is None:
+        return await acreate_account(get_async_client(), currency, balance)
+    return await asyncio.to_thread(pool.acquire, currency, balance)
+
+
+# ================================
+# Prefetching on the async worker loop
+# ================================
+
+def prefetch_accounts(context, scenario, needs):
+    """
+    Starts creating the accounts `scenario` will ask for, as (currency, balance) pairs, on the
+    async worker loop. Called for a whole feature at once so setup for later scenarios runs
+    while earlier ones execute; acquire_account() then picks them up for the running scenario.
+    """
+    from features.utils.async_client import get_async_client
+    from features.utils.async_steps import submit
+
+    async def create(currency, balance):
+        return await acreate_account(get_async_client(), currency, balance)
+
+    prefetched = context.prefetched_accounts.setdefault(id(scenario), {})
+    for currency, balance in needs:
+        prefetched.setdefault(AccountPool.key(currency, balance), []).append(submit(create(currency, balance)))
+
+
+def _take_prefetched(context, currency, balance):
+    scenario = getattr(context, "scenario", None)
+    prefetched = getattr(context, "prefetched_accounts", None)
+    if not prefetched or scenario is None:
+        return None
+    futures = prefetched.get(id(scenario), {}).get(AccountPool.key(currency, balance))
+    return futures.pop(0) if futures else None
+
+
+class AccountPool:
+    """
+    Pre-created, pre-funded accounts grouped by (currency, balance) bucket.
+
+    Every account is handed out once and never returned, because scenarios mutate balances.
+    The pool lives in one behave process; parallel workers each build their own pool, so
+    accounts are never shared between processes.
+    """
+
+    def __init__(self, buckets, size=5, low_water=None, concurrency=8, client=None):
+        self.client = client or get_client()
+        self.size = size
+        self.low_water = size // 2 if low_water is None else low_water
+        self.queues = {self.key(currency, balance): queue.Queue() for currency, balance in buckets}
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._refilling = set()
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="account-pool")
+
+    @staticmethod
+    def key(currency, balance):
+        return currency, float(balance)
+
+    # ================================
+    # Provisioning
+    # ================================
+
+    def create_account(self, currency, balance):
+        return create_account(self.client, currency, balance)
+
+    def fill(self, key, count):
+        futures = [self._executor.submit(self.create_account, *key) for _ in range(count)]
+        for future in futures:
+            self.queues[key].put(future.result())
+
+    def provision(self):
+        """Fills every bucket up to `size`, creating accounts concurrently."""
+        for key, bucket in self.queues.items():
+            missing = self.size - bucket.qsize()
+            if missing > 0:
+                self.fill(key, missing)
+        logger.info(f"Account pool provisioned: {self.levels()}")
+
+    def _refill_in_background(self, key):
+        with self._stats_lock:
+            if key in self._refilling:
+                return
+            self._refilling.add(key)
+
+        def refill():
+            try:
+                self.fill(key, self.size - self.queues[key].qsize())
+            except Exception as e:
+                logger.warning(f"Background refill of {key} failed: {e}")
+            finally:
+                with self._stats_lock:
+                    self._refilling.discard(key)
+
+        threading.Thread(target=refill, name=f"account-pool-refill-{key[0]}", daemon=True).start()
+
+    # ================================
+    # Consumption
+    # ================================
+
+    def acquire(self, currency="USD", balance=0):
+        """Returns a ready account for the bucket, falling back to creating one inline."""
+        key = self.key(currency, balance)
+        bucket = self.queues.get(key)
+
+        try:
+            account = bucket.get_nowait() if bucket is not None else None
+        except queue.Empty:
+            account = None
+
+        with self._stats_lock:
+            if account is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if bucket is not None and bucket.qsize() <= self.low_water:
+            self._refill_in_background(key)
+
+        return account or self.create_account(currency, balance)
+
+    def levels(self):
+        return {f"{currency}:{balance:g}": bucket.qsize() for (currency, balance), bucket in self.queues.items()}
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "levels": self.levels()}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
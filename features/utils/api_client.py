@@ -0,0 +1,166 @@
+import time
+from features.utils import config
+from features.utils.logger import logger
+
+# Transactions sent twice with the same key must be applied once (see features/utils/idempotency.py)
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+# ================================
+# Payload builders (shared by the steps and the client)
+# ================================
+
+def account_payload(currency):
+    return {"currency": currency}
+
+
+def deposit_payload(account_id, amount, currency):
+    return {"accountId": account_id, "amount": float(amount), "currency": currency}
+
+
+def withdraw_payload(account_id, amount, currency):
+    return {"accountId": account_id, "amount": float(amount), "currency": currency}
+
+
+def transfer_payload(debit_account_id, credit_account_id, amount, currency):
+    return {
+        "debitAccountId": debit_account_id,
+        "creditAccountId": credit_account_id,
+        "amount": float(amount),
+        "currency": currency
+    }
+
+
+def idempotency_headers(key):
+    return {IDEMPOTENCY_HEADER: key} if key else {}
+
+
+class ApiClient:
+    """Thin wrapper around one pooled, keep-alive requests.Session for the fund-transfer API."""
+
+    def __init__(self, base_url=None, pool_size=None, connect_timeout=None, read_timeout=None,
+                 retries=None, backoff_factor=None, cassette=None):
+        self.base_url = (base_url or config.API_BASE_URL).rstrip("/")
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else config.HTTP_CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else config.HTTP_READ_TIMEOUT,
+        )
+        pool_size = pool_size or config.HTTP_POOL_SIZE
+
+        # requests/urllib3 are only imported once a client is needed (see features/utils/http_transport.py)
+        import requests
+        from urllib3.util.retry import Retry
+        from features.utils.http_transport import TimedHTTPAdapter, connect_timing
+
+        # Only idempotent methods are retried on 5xx; POSTs are retried on connection errors only,
+        # so a transaction is never sent twice once the server has seen it.
+        retry = Retry(
+            total=config.HTTP_RETRIES if retries is None else retries,
+            connect=config.HTTP_RETRIES if retries is None else retries,
+            backoff_factor=config.HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False,
+        )
+        if cassette is not None:
+            # Record/replay sits under the session, so retries, listeners and stub mode behave as usual
+            from features.utils.cassette import CassetteAdapter
+            adapter = CassetteAdapter(cassette, pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        else:
+            adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": "application/json"})
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Callables notified after every request with a timing record (see features/utils/profiling.py)
+        self.listeners = []
+        self.connect_timing = connect_timing
+
+    # ================================
+    # Low-level helpers
+    # ================================
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        if not self.listeners:
+            return self.session.request(method, self.url(path), **kwargs)
+
+        self.connect_timing.seconds = 0.0
+        started = time.perf_counter()
+        response = self.session.request(method, self.url(path), **kwargs)
+        total = time.perf_counter() - started
+        connect = self.connect_timing.seconds
+
+        record = {
+            "method": method,
+            "path": path,
+            "status": response.status_code,
+            "total_s": total,
+            "connect_s": connect,
+            # Time from the request being sent until the response headers arrived, minus connection setup
+            "server_s": max(0.0, response.elapsed.total_seconds() - connect),
+        }
+        for listener in self.listeners:
+            listener(record)
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, payload, **kwargs):
+        return self.request("POST", path, json=payload, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    # ================================
+    # Account endpoints
+    # ================================
+
+    def create_account(self, currency="USD"):
+        return self.post("/account", account_payload(currency))
+
+    def get_account(self, account_id):
+        return self.get(f"/account/{account_id}")
+
+    # ================================
+    # Transaction endpoints
+    # ================================
+
+    def deposit(self, account_id, amount, currency, idempotency_key=None):
+        return self.post("/transaction/deposit", deposit_payload(account_id, amount, currency),
+                         headers=idempotency_headers(idempotency_key))
+
+    def withdraw(self, account_id, amount, currency, idempotency_key=None):
+        return self.post("/transaction/withdraw", withdraw_payload(account_id, amount, currency),
+                         headers=idempotency_headers(idempotency_key))
+
+    def transfer(self, debit_account_id, credit_account_id, amount, currency, idempotency_key=None):
+        return self.post("/transaction/transfer", transfer_payload(debit_account_id, credit_account_id, amount, currency),
+                         headers=idempotency_headers(idempotency_key))
+
+
+_client = None
+
+
+def get_client():
+    """Returns the process-wide ApiClient, creating it on first use."""
+    global _client
+    if _client is None:
+        from features.utils.cassette import get_cassette
+        _client = ApiClient(cassette=get_cassette())
+        logger.info(f"Initialized pooled API client for {_client.base_url}")
+    return _client
+
+
+def close_client():
+    """Closes the process-wide ApiClient so pooled connections are released."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,137 @@
+import json
+import time
+from features.utils import config
+from features.utils.api_client import (
+    IDEMPOTENCY_HEADER, account_payload, deposit_payload, idempotency_headers, withdraw_payload, transfer_payload
+)
+from features.utils.logger import logger
+
+
+def ledger_transport(ledger):
+    """httpx transport that answers from an in-memory Ledger, the async counterpart of stub_mode.start_stub."""
+    import httpx
+
+    def handle(request):
+        try:
+            payload = json.loads(request.content) if request.content else {}
+        except ValueError:
+            return httpx.Response(400, json={"error": "Malformed JSON body"})
+        status, body = ledger.handle(request.method, request.url.path, payload, request.headers.get(IDEMPOTENCY_HEADER))
+        return httpx.Response(status, json=body)
+
+    return httpx.MockTransport(handle)
+
+
+class AsyncApiClient:
+    """
+    asyncio counterpart of ApiClient on one pooled httpx.AsyncClient.
+
+    Responses expose status_code, text and json() like requests responses, so the
+    validation and attachment helpers work unchanged. The client is bound to the event
+    loop it is first used on; use get_async_client() from coroutines on the worker loop.
+    """
+
+    def __init__(self, base_url=None, pool_size=None, connect_timeout=None, read_timeout=None, transport=None):
+        import httpx
+
+        self.base_url = (base_url or config.API_BASE_URL).rstrip("/")
+        pool_size = pool_size or config.HTTP_POOL_SIZE
+        timeout = httpx.Timeout(
+            read_timeout if read_timeout is not None else config.HTTP_READ_TIMEOUT,
+            connect=connect_timeout if connect_timeout is not None else config.HTTP_CONNECT_TIMEOUT,
+        )
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            headers={"Accept": "application/json"},
+            transport=transport,
+        )
+
+        # Same timing records as ApiClient.listeners; httpx does not expose connection setup time
+        self.listeners = []
+
+    # ================================
+    # Low-level helpers
+    # ================================
+
+    async def request(self, method, path, **kwargs):
+        started = time.perf_counter()
+        response = await self.client.request(method, path, **kwargs)
+        total = time.perf_counter() - started
+
+        record = {
+            "method": method,
+            "path": path,
+            "status": response.status_code,
+            "total_s": total,
+            "connect_s": 0.0,
+            "server_s": total,
+        }
+        for listener in self.listeners:
+            listener(record)
+        return response
+
+    async def get(self, path, **kwargs):
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path, payload, **kwargs):
+        return await self.request("POST", path, json=payload, **kwargs)
+
+    async def close(self):
+        await self.client.aclose()
+
+    # ================================
+    # Account endpoints
+    # ================================
+
+    async def create_account(self, currency="USD"):
+        return await self.post("/account", account_payload(currency))
+
+    async def get_account(self, account_id):
+        return await self.get(f"/account/{account_id}")
+
+    # ================================
+    # Transaction endpoints
+    # ================================
+
+    async def deposit(self, account_id, amount, currency, idempotency_key=None):
+        return await self.post("/transaction/deposit", deposit_payload(account_id, amount, currency),
+                               headers=idempotency_headers(idempotency_key))
+
+    async def withdraw(self, account_id, amount, currency, idempotency_key=None):
+        return await self.post("/transaction/withdraw", withdraw_payload(account_id, amount, currency),
+                               headers=idempotency_headers(idempotency_key))
+
+    async def transfer(self, debit_account_id, credit_account_id, amount, currency, idempotency_key=None):
+        return await self.post("/transaction/transfer", transfer_payload(debit_account_id, credit_account_id, amount, currency),
+                               headers=idempotency_headers(idempotency_key))
+
+
+_client = None
+_transport = None
+_listeners = []
+
+
+def configure_async_client(transport=None, listeners=()):
+    """Sets the transport (e.g. ledger_transport in stub mode) and listeners for the client get_async_client() creates."""
+    global _transport
+    _transport = transport
+    _listeners[:] = listeners
+
+
+def get_async_client():
+    """Returns the worker's AsyncApiClient, creating it on first use (call from the worker loop)."""
+    global _client
+    if _client is None:
+        _client = AsyncApiClient(transport=_transport)
+        _client.listeners.extend(_listeners)
+        logger.info(f"Initialized async API client for {_client.base_url}")
+    return _client
+
+
+async def close_async_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,87 @@
+import functools
+import threading
+from features.utils.async_client import close_async_client
+from features.utils.logger import logger
+
+
+class WorkerLoop:
+    """
+    One asyncio event loop per behave worker, running on a background thread.
+
+    Behave calls steps synchronously, so coroutine steps are submitted to this loop and the
+    step blocks until its coroutine finishes. Work submitted without waiting (see submit())
+    keeps running between steps and scenarios, which is what lets setup for later scenarios
+    overlap with the current one.
+    """
+
+    def __init__(self):
+        import asyncio
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="async-steps", daemon=True)
+        self.thread.start()
+
+    def submit(self, coroutine):
+        """Schedules `coroutine` on the loop and returns a concurrent.futures.Future."""
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine, timeout=None):
+        """Runs `coroutine` on the loop and blocks the calling (behave) thread until it returns."""
+        return self.submit(coroutine).result(timeout)
+
+    def close(self):
+        self.run(close_async_client())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+_worker_loop = None
+
+
+def get_worker_loop():
+    """Returns this process's WorkerLoop, starting it on first use."""
+    global _worker_loop
+    if _worker_loop is None:
+        _worker_loop = WorkerLoop()
+        logger.info("Started the async step event loop")
+    return _worker_loop
+
+
+def close_worker_loop():
+    global _worker_loop
+    if _worker_loop is not None:
+        _worker_loop.close()
+        _worker_loop = None
+
+
+def run(coroutine):
+    return get_worker_loop().run(coroutine)
+
+
+def submit(coroutine):
+    return get_worker_loop().submit(coroutine)
+
+
+def async_step(func):
+    """
+    Lets a behave step be written as a coroutine.
+
+        @allure.step("Given ...")
+        @given("...")
+        @async_step
+        async def step_impl(context, ...):
+            await asyncio.gather(...)
+    """
+
+    @functools.wraps(func)
+    def wrapper(context, *args, **kwargs):
+        return run(func(context, *args, **kwargs))
+
+    # behave reports (and results_store records) a step's location from its code object
+    wrapper.__code__ = wrapper.__code__.replace(
+        co_filename=func.__code__.co_filename, co_firstlineno=func.__code__.co_firstlineno
+    )
+    return wrapper
@@ -0,0 +1,202 @@
+import functools
+import hashlib
+import os
+import queue
+import shutil
+import threading
+from types import SimpleNamespace
+from features.utils import config
+from features.utils.logger import logger
+
+LEVELS = ("none", "failures-only", "all")
+# allure and allure_commons are only imported once something is attached or the writer is installed
+HOOKS = ("report_result", "report_container", "report_attached_file", "report_attached_data")
+# Names of allure.attachment_type members; attach() resolves them, so steps need not import allure
+attachment_type = SimpleNamespace(JSON="JSON", TEXT="TEXT", PNG="PNG", JPG="JPG")
+
+
+class BufferedAttachmentWriter:
+    """
+    Stands in for allure's AllureFileLogger: results and containers are still written
+    immediately, but attachment bodies are queued and written by a background thread in
+    batches. Identical payloads are written once and hard-linked for every later use.
+    """
+
+    def __init__(self, file_logger, batch_size=50):
+        self.file_logger = file_logger
+        self.report_dir = str(file_logger._report_dir)
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.written = {}  # content hash -> first file written with that content
+        self.deduplicated = 0
+        self.thread = threading.Thread(target=self._run, name="allure-attachments", daemon=True)
+        self.thread.start()
+
+    # ================================
+    # allure logger hooks
+    # ================================
+
+    def report_result(self, result):
+        self.file_logger.report_result(result)
+
+    def report_container(self, container):
+        self.file_logger.report_container(container)
+
+    def report_attached_file(self, source, file_name):
+        self.queue.put(("file", source, file_name))
+
+    def report_attached_data(self, body, file_name):
+        self.queue.put(("data", body, file_name))
+
+    # ================================
+    # Background writer
+    # ================================
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                try:
+                    if item is not None:
+                        self._write(*item)
+                except Exception as e:
+                    logger.warning(f"Failed to write allure attachment {item[2]}: {e}")
+                finally:
+                    self.queue.task_done()
+
+    def _write(self, kind, source, file_name):
+        destination = os.path.join(self.report_dir, file_name)
+        if kind == "file":
+            shutil.copyfile(source, destination)
+            return
+
+        body = source.encode("utf-8") if isinstance(source, str) else source
+        digest = hashlib.sha1(body).hexdigest()
+        first = self.written.get(digest)
+        if first is not None:
+            try:
+                os.link(first, destination)
+                self.deduplicated += 1
+                return
+            except OSError:
+                pass  # filesystem without hard links; fall back to a normal write
+
+        with open(destination, "wb") as attached_file:
+            attached_file.write(body)
+        self.written.setdefault(digest, destination)
+
+    def flush(self):
+        """Blocks until every queued attachment is on disk."""
+        self.queue.join()
+
+
+# ================================
+# Step-facing API
+# ================================
+
+_writers = []
+_pending = []
+# Attachments made off the main thread (coroutine steps run on the async event loop thread)
+_deferred = []
+_deferred_lock = threading.Lock()
+
+
+def install():
+    """Swaps every registered AllureFileLogger for a BufferedAttachmentWriter (no-op without the allure formatter)."""
+    import allure_commons
+    from allure_commons import plugin_manager
+    from allure_commons.logger import AllureFileLogger
+
+    for name in HOOKS:
+        # What @allure_commons.hookimpl would do in the class body, without importing allure_commons with this module
+        allure_commons.hookimpl(getattr(BufferedAttachmentWriter, name))
+    for plugin in list(plugin_manager.get_plugins()):
+        if isinstance(plugin, AllureFileLogger):
+            writer = BufferedAttachmentWriter(plugin, batch_size=config.ATTACHMENT_BATCH_SIZE)
+            plugin_manager.unregister(plugin)
+            plugin_manager.register(writer)
+            _writers.append(writer)
+
+
+def attach(body, name=None, attachment_type=None, failed=None):
+    """
+    Drop-in for allure.attach that honours ATTACHMENT_LEVEL.
+
+    `body` may be a callable; it is only evaluated when the attachment is actually kept,
+    so with "failures-only" passing steps never serialize their payloads. Pass `failed` when
+    the outcome of the step the attachment belongs to is already known (after the step ended).
+    """
+    if config.ATTACHMENT_LEVEL == "none":
+        return
+    if failed is not None:
+        if failed or config.ATTACHMENT_LEVEL == "all":
+            _emit(body, name, attachment_type)
+        return
+    if threading.current_thread() is not threading.main_thread():
+        # allure tracks the running step per thread, so these are emitted by emit_deferred()
+        with _deferred_lock:
+            _deferred.append((body, name, attachment_type))
+        return
+    if config.ATTACHMENT_LEVEL == "failures-only":
+        _pending.append((body, name, attachment_type))
+        return
+    _emit(body, name, attachment_type)
+
+
+def _emit(body, name, attachment_type):
+    import allure
+
+    if isinstance(attachment_type, str):
+        attachment_type = getattr(allure.attachment_type, attachment_type)
+    allure.attach(body() if callable(body) else body, name=name, attachment_type=attachment_type)
+
+
+def allure_step(title):
+    """Drop-in for @allure.step that imports allure when the step first runs, not when the steps module loads."""
+
+    def decorator(func):
+        wrapped = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal wrapped
+            if wrapped is None:
+                import allure
+
+                wrapped = allure.step(title)(func)
+            return wrapped(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def emit_deferred():
+    """Attaches, on the calling (main) thread, everything attach() received from other threads."""
+    with _deferred_lock:
+        deferred = _deferred[:]
+        del _deferred[:]
+    for body, name, attachment_type in deferred:
+        attach(body, name, attachment_type)
+
+
+def after_step(step):
+    """Emits attachments made from other threads, then the ones held back for `step` if it failed."""
+    emit_deferred()
+    if step.status == "failed":
+        for body, name, attachment_type in _pending:
+            _emit(body, name, attachment_type)
+    del _pending[:]
+
+
+def flush():
+    """Writes out everything still queued; must run before the allure formatter closes."""
+    for writer in _writers:
+        writer.flush()
+        if writer.deduplicated:
+            logger.info(f"Allure attachments deduplicated: {writer.deduplicated}")
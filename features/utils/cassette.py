@@ -0,0 +1,448 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+from features.utils import config
+from features.utils.http_transport import TimedHTTPAdapter
+from features.utils.logger import logger
+
+MODES = ("off", "record", "replay", "auto", "verify")
+
+# Index entry: sha1(normalized request), offset and length of the compressed record, recorded_at
+INDEX_ENTRY = struct.Struct("<20sQId")
+
+# Path segments that look server-generated (numbers, UUIDs, long hex) are masked in request keys like ignored fields
+ID_SEGMENT = re.compile(r"^(?:\d+|[0-9a-fA-F]{8,}|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27})$")
+MASK = "<id>"
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode for a request the cassette has no response for."""
+
+
+def _mask_ids(value, ignore_fields, ids):
+    """`value` with every ignored field replaced by MASK; the replaced values are appended to `ids` in key order."""
+    if isinstance(value, dict):
+        masked = {}
+        for key in sorted(value):
+            if key in ignore_fields and not isinstance(value[key], (dict, list)):
+                ids.append(value[key])
+                masked[key] = MASK
+            else:
+                masked[key] = _mask_ids(value[key], ignore_fields, ids)
+        return masked
+    if isinstance(value, list):
+        return [_mask_ids(item, ignore_fields, ids) for item in value]
+    return value
+
+
+def normalize_request(method, url, body, ignore_fields=()):
+    """
+    Canonical form of a request: method, path with sorted query (no host, so a cassette
+    recorded against one environment replays against another) and key-sorted JSON body.
+
+    Id-like path segments and the `ignore_fields` of the body are masked, so the key does not
+    depend on the ids the server generated in this run. Returns (key, ids), where `ids` are
+    the masked values in key order; they line up with the ids of any request with that key.
+    """
+    ids = []
+    parts = urlsplit(url)
+    segments = []
+    for segment in parts.path.rstrip("/").split("/"):
+        if ID_SEGMENT.match(segment):
+            ids.append(segment)
+            segment = MASK
+        segments.append(segment)
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    path = "/".join(segments) + (f"?{query}" if query else "")
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    if body:
+        try:
+            body = json.dumps(_mask_ids(json.loads(body), set(ignore_fields), ids), sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            pass
+    return f"{method.upper()} {path} {body or ''}", ids
+
+
+def request_hash(key):
+    return hashlib.sha1(key.encode("utf-8")).digest()
+
+
+def _masked(text, ignored_fields):
+    """JSON body with volatile fields (generated ids, timestamps) blanked, for drift comparison."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+
+    def mask(value):
+        if isinstance(value, dict):
+            return {key: "<ignored>" if key in ignored_fields else mask(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [mask(item) for item in value]
+        return value
+
+    return mask(data)
+
+
+def _like(recorded, live):
+    """`live` in the type of `recorded` (ids taken from a path are strings, JSON ids may be numbers)."""
+    if isinstance(recorded, int) and not isinstance(recorded, bool) and str(live).isdigit():
+        return int(live)
+    return str(live) if isinstance(recorded, str) else live
+
+
+def remap_ids(text, recorded_ids, live_ids, ignore_fields):
+    """
+    A recorded JSON body with the ids of the recorded request replaced by those of the live one,
+    so a replayed response refers to the accounts the running scenario actually uses.
+    """
+    mapping = {str(old): new for old, new in zip(recorded_ids, live_ids)
+               if old is not None and new is not None and str(old) != str(new)}
+    if not mapping:
+        return text
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+
+    def remap(value):
+        if isinstance(value, dict):
+            return {key: _like(item, mapping[str(item)])
+                    if key in ignore_fields and not isinstance(item, (dict, list)) and str(item) in mapping else remap(item)
+                    for key, item in value.items()}
+        if isinstance(value, list):
+            return [remap(item) for item in value]
+        return value
+
+    return json.dumps(remap(data))
+
+
+class CassetteIndex:
+    """
+    Read-only view of a cassette: a sorted, fixed-width index (<name>.idx) and the compressed
+    records it points into (<name>.data), both memory-mapped so opening a large cassette costs
+    nothing and a lookup is a binary search over the index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._files = []
+        self.index = self._map(f"{path}.idx")
+        self.data = self._map(f"{path}.data")
+        self.count = len(self.index) // INDEX_ENTRY.size if self.index is not None else 0
+
+    def _map(self, path):
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        handle = open(path, "rb")
+        self._files.append(handle)
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def entry(self, position):
+        return INDEX_ENTRY.unpack_from(self.index, position * INDEX_ENTRY.size)
+
+    def find(self, digest):
+        """All (offset, length, recorded_at) stored for `digest`, in recording order."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.entry(middle)[0] < digest:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < self.count:
+            entry_digest, offset, length, recorded_at = self.entry(low)
+            if entry_digest != digest:
+                break
+            found.append((offset, length, recorded_at))
+            low += 1
+        return found
+
+    def record(self, offset, length):
+        return json.loads(zlib.decompress(self.data[offset:offset + length]))
+
+    def records(self):
+        for position in range(self.count):
+            _, offset, length, _ = self.entry(position)
+            yield self.record(offset, length)
+
+    def close(self):
+        for mapped in (self.index, self.data):
+            if mapped is not None:
+                mapped.close()
+        for handle in self._files:
+            handle.close()
+        self._files = []
+
+
+class Cassette:
+    """
+    Record/replay store for API responses, keyed by normalized request.
+
+    Modes: "record" sends every request and stores the response; "replay" serves from the
+    cassette with no network (a miss raises CassetteMiss); "auto" replays fresh entries and
+    records the rest; "verify" sends every request and reports responses that drifted from
+    the cassette, as well as requests it has no recording for. Keys mask generated ids (see
+    normalize_request), and a replayed body gets the live request's ids in place of the
+    recorded ones. Requests that occur several times (e.g. POST /account) are replayed in
+    the order they were recorded. Entries older than `ttl` seconds are not replayed in
+    auto mode and are evicted on save, as are the oldest entries beyond `max_entries`.
+    """
+
+    def __init__(self, path, mode="replay", ttl=None, max_entries=None, ignore_fields=()):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode} (expected one of {', '.join(MODES)})")
+        self.path = path
+        self.mode = mode
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.ignore_fields = set(ignore_fields)
+        self.index = CassetteIndex(path)
+        self.recorded = []
+        self.drift = []
+        self.recorded_total = 0
+        self.hits = 0
+        self.misses = 0
+        self._served = {}
+        self._lock = threading.Lock()
+
+    def expired(self, recorded_at, now=None):
+        return bool(self.ttl) and (now or time.time()) - recorded_at > self.ttl
+
+    # ================================
+    # Replay
+    # ================================
+
+    def request_key(self, method, url, body):
+        """(key, ids) of a request, masking this cassette's ignored fields."""
+        return normalize_request(method, url, body, self.ignore_fields)
+
+    def replayed(self, recorded, ids):
+        """The record with its body rewritten to the live request's ids."""
+        body = remap_ids(recorded["body"], recorded.get("request_ids", []), ids, self.ignore_fields)
+        return dict(recorded, body=body)
+
+    def lookup(self, key, fresh_only=False):
+        """The next recorded response for `key`, or None."""
+        entries = self.index.find(request_hash(key))
+        if fresh_only:
+            entries = [entry for entry in entries if not self.expired(entry[2])]
+        if not entries:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            self.hits += 1
+        # Past the recorded occurrences, keep answering with the last one
+        offset, length, _ = entries[min(served, len(entries) - 1)]
+        return self.index.record(offset, length)
+
+    def should_send(self, key, ids=()):
+        """(send_live, recorded) for a request about to go out."""
+        if self.mode == "replay":
+            recorded = self.lookup(key)
+            if recorded is None:
+                raise CassetteMiss(f"No recorded response for {key} in {self.path}")
+            return False, self.replayed(recorded, ids)
+        if self.mode == "auto":
+            recorded = self.lookup(key, fresh_only=True)
+            return recorded is None, self.replayed(recorded, ids) if recorded is not None else None
+        if self.mode == "verify":
+            return True, self.lookup(key)
+        return True, None
+
+    # ================================
+    # Record / drift
+    # ================================
+
+    def after_live(self, key, status, headers, text, recorded=None, ids=()):
+        """Stores (record/auto) or compares (verify) a response that came from the network."""
+        if self.mode == "verify":
+            if recorded is None:
+                # Nothing to compare against is drift too: the suite now sends a request it never recorded
+                logger.warning(f"Cassette has no recording for {key}: live {status}")
+                with self._lock:
+                    self.drift.append({"request": key, "recorded_status": None, "live_status": status,
+                                       "recorded_body": None, "live_body": text})
+            elif (
+                recorded["status"] != status
+                or _masked(recorded["body"], self.ignore_fields) != _masked(text, self.ignore_fields)
+            ):
+                drift = {"request": key, "recorded_status": recorded["status"], "live_status": status,
+                         "recorded_body": recorded["body"], "live_body": text}
+                logger.warning(f"Cassette drift for {key}: recorded {recorded['status']}, live {status}")
+                with self._lock:
+                    self.drift.append(drift)
+            return
+
+        with self._lock:
+            self.recorded_total += 1
+            self.recorded.append({
+                "request": key,
+                "request_ids": list(ids),
+                "status": status,
+                "content_type": headers.get("Content-Type", "application/json"),
+                "body": text,
+                "recorded_at": time.time(),
+            })
+
+    def save(self):
+        """Merges new recordings into the cassette, applying TTL and size eviction, and rewrites it atomically."""
+        if not self.recorded:
+            return None
+
+        now = time.time()
+        rerecorded = {entry["request"] for entry in self.recorded}
+        # A request recorded in this run replaces all of its older occurrences
+        kept = [record for record in self.index.records()
+                if record["request"] not in rerecorded and not self.expired(record["recorded_at"], now)]
+        entries = kept + self.recorded
+        evicted = self.index.count - len(kept)
+        if self.max_entries and len(entries) > self.max_entries:
+            entries.sort(key=lambda record: record["recorded_at"])
+            evicted += len(entries) - self.max_entries
+            entries = entries[-self.max_entries:]
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        index = []
+        with open(f"{self.path}.data.tmp", "wb") as data:
+            for sequence, record in enumerate(entries):
+                blob = zlib.compress(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+                index.append((request_hash(record["request"]), sequence, data.tell(), len(blob), record["recorded_at"]))
+                data.write(blob)
+        # Sorted by request hash, then recording order, so find() is a binary search
+        index.sort(key=lambda item: (item[0], item[1]))
+        with open(f"{self.path}.idx.tmp", "wb") as handle:
+            for digest, _, offset, length, recorded_at in index:
+                handle.write(INDEX_ENTRY.pack(digest, offset, length, recorded_at))
+
+        self.index.close()
+        os.replace(f"{self.path}.data.tmp", f"{self.path}.data")
+        os.replace(f"{self.path}.idx.tmp", f"{self.path}.idx")
+        self.index = CassetteIndex(self.path)
+        self.recorded = []
+        logger.info(f"Cassette {self.path} saved: {self.index.count} entries ({evicted} evicted)")
+        return self.path
+
+    def write_drift_report(self, path):
+        if not self.drift:
+            return None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.drift, handle, indent=2)
+        return path
+
+    def stats(self):
+        return {"mode": self.mode, "entries": self.index.count, "hits": self.hits, "misses": self.misses,
+                "recorded": self.recorded_total, "drift": len(self.drift)}
+
+    def close(self):
+        self.index.close()
+
+
+# ================================
+# Transports
+# ================================
+
+class CassetteAdapter(TimedHTTPAdapter):
+    """requests adapter that answers from, records into, or checks against a Cassette."""
+
+    def __init__(self, cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        key, ids = self.cassette.request_key(request.method, request.url, request.body)
+        send_live, recorded = self.cassette.should_send(key, ids)
+        if not send_live:
+            return self.replayed_response(request, recorded)
+
+        response = super().send(request, **kwargs)
+        self.cassette.after_live(key, response.status_code, response.headers, response.text, recorded, ids)
+        return response
+
+    @staticmethod
+    def replayed_response(request, recorded):
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.headers = CaseInsensitiveDict({"Content-Type": recorded["content_type"], "X-Cassette": "replay"})
+        response._content = recorded["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(0)
+        return response
+
+
+def cassette_transport(cassette, transport=None):
+    """httpx transport with the same behaviour as CassetteAdapter, wrapping `transport` (default: network)."""
+    import httpx
+
+    inner = transport or httpx.AsyncHTTPTransport()
+
+    class CassetteTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            key, ids = cassette.request_key(request.method, str(request.url), request.content)
+            send_live, recorded = cassette.should_send(key, ids)
+            if not send_live:
+                return httpx.Response(
+                    recorded["status"],
+                    headers={"Content-Type": recorded["content_type"], "X-Cassette": "replay"},
+                    content=recorded["body"].encode("utf-8"),
+                )
+
+            response = await inner.handle_async_request(request)
+            body = await response.aread()
+            cassette.after_live(key, response.status_code, response.headers, body.decode("utf-8", "replace"), recorded, ids)
+            return httpx.Response(response.status_code, headers=response.headers, content=body)
+
+        async def aclose(self):
+            await inner.aclose()
+
+    return CassetteTransport()
+
+
+_cassette = None
+
+
+def get_cassette():
+    """The process-wide Cassette configured by API_CASSETTE_MODE, or None when it is "off"."""
+    global _cassette
+    if _cassette is None and config.API_CASSETTE_MODE != "off":
+        _cassette = Cassette(
+            config.API_CASSETTE_PATH,
+            mode=config.API_CASSETTE_MODE,
+            ttl=config.API_CASSETTE_TTL,
+            max_entries=config.API_CASSETTE_MAX_ENTRIES,
+            ignore_fields=config.API_CASSETTE_IGNORE_FIELDS,
+        )
+        logger.info(f"API cassette {_cassette.path} opened in {_cassette.mode} mode ({_cassette.index.count} entries)")
+    return _cassette
+
+
+def close_cassette():
+    """Saves new recordings and the drift report, and returns the cassette stats (None when disabled)."""
+    global _cassette
+    if _cassette is None:
+        return None
+    _cassette.save()
+    _cassette.write_drift_report(config.API_CASSETTE_DRIFT_REPORT)
+    stats = _cassette.stats()
+    _cassette.close()
+    _cassette = None
+    return stats
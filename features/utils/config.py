@@ -2,4 +2,92 @@ import os
 from dotenv import load_dotenv
 
 load_dotenv()
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8080")
\ No newline at end of file
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8080")
+
+# "live" talks to API_BASE_URL, "stub" serves it in-process from features/utils/stub_server.Ledger
+API_MODE = os.getenv("API_MODE", "live").lower()
+
+# HTTP client settings (shared pooled session, see features/utils/api_client.py)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.2"))
+
+# Record/replay of API responses (see features/utils/cassette.py): off, record, replay, auto or verify
+API_CASSETTE_MODE = os.getenv("API_CASSETTE_MODE", "off").lower()
+API_CASSETTE_PATH = os.getenv("API_CASSETTE_PATH", os.path.join("cassettes", "api"))
+API_CASSETTE_TTL = float(os.getenv("API_CASSETTE_TTL", str(7 * 24 * 3600)))
+API_CASSETTE_MAX_ENTRIES = int(os.getenv("API_CASSETTE_MAX_ENTRIES", "20000"))
+API_CASSETTE_IGNORE_FIELDS = [
+    field.strip() for field in os.getenv("API_CASSETTE_IGNORE_FIELDS", "id,accountId,debitAccountId,creditAccountId,timestamp").split(",")
+    if field.strip()
+]
+API_CASSETTE_DRIFT_REPORT = os.getenv("API_CASSETTE_DRIFT_REPORT", os.path.join("reports", "cassette_drift.json"))
+
+# Pre-provisioned account pool (see features/utils/account_pool.py)
+ACCOUNT_POOL_ENABLED = os.getenv("ACCOUNT_POOL_ENABLED", "true").lower() == "true"
+ACCOUNT_POOL_SIZE = int(os.getenv("ACCOUNT_POOL_SIZE", "6"))
+ACCOUNT_POOL_BUCKETS = os.getenv("ACCOUNT_POOL_BUCKETS", "USD:0,USD:500")
+ACCOUNT_POOL_CONCURRENCY = int(os.getenv("ACCOUNT_POOL_CONCURRENCY", "8"))
+
+# Allure attachments (see features/utils/attachments.py): "none", "failures-only" or "all"
+ATTACHMENT_LEVEL = os.getenv("ATTACHMENT_LEVEL", "all").lower()
+ATTACHMENT_BATCH_SIZE = int(os.getenv("ATTACHMENT_BATCH_SIZE", "50"))
+# UI screenshots (see features/utils/screenshots.py): "off", "on-failure", "on-step-end" or "always"
+SCREENSHOT_POLICY = os.getenv("SCREENSHOT_POLICY", "on-failure").lower()
+SCREENSHOT_MAX_WIDTH = int(os.getenv("SCREENSHOT_MAX_WIDTH", "1280"))
+SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", "70"))
+# Frames whose 64-bit perceptual hashes differ in at most this many bits count as identical
+SCREENSHOT_DEDUP_DISTANCE = int(os.getenv("SCREENSHOT_DEDUP_DISTANCE", "4"))
+
+# UI WebDriver sessions (see features/utils/driver_pool.py)
+EDGE_DRIVER_PATH = os.getenv("EDGE_DRIVER_PATH")
+DRIVER_CACHE_FILE = os.getenv("DRIVER_CACHE_FILE", os.path.join(".cache", "webdriver.json"))
+UI_HEADLESS = os.getenv("UI_HEADLESS", "true").lower() == "true"
+# Sessions per behave process; ui_tests/environment.py keeps 1 because behave runs scenarios serially
+UI_DRIVER_POOL_SIZE = int(os.getenv("UI_DRIVER_POOL_SIZE", "1"))
+# Seconds a scenario waits for a pooled session before failing
+UI_DRIVER_ACQUIRE_TIMEOUT = float(os.getenv("UI_DRIVER_ACQUIRE_TIMEOUT", "120"))
+UI_WINDOW_SIZE = os.getenv("UI_WINDOW_SIZE", "1920,1080")
+UI_WAIT_TIMEOUT = float(os.getenv("UI_WAIT_TIMEOUT", "10"))
+UI_POLL_INTERVAL = float(os.getenv("UI_POLL_INTERVAL", "0.1"))
+UI_OPTIONAL_WAIT_TIMEOUT = float(os.getenv("UI_OPTIONAL_WAIT_TIMEOUT", "5"))
+UI_OPTIONAL_GRACE = float(os.getenv("UI_OPTIONAL_GRACE", "1"))
+UI_BASE_URL = os.getenv("UI_BASE_URL", "https://gomspace.com")
+# Block images, fonts, media and third-party hosts via DevTools (plus any comma-separated UI_BLOCKED_URLS patterns)
+UI_BLOCK_RESOURCES = os.getenv("UI_BLOCK_RESOURCES", "false").lower() == "true"
+UI_BLOCKED_URLS = [pattern.strip() for pattern in os.getenv("UI_BLOCKED_URLS", "").split(",") if pattern.strip()]
+# "off", "record" (save the rendered HTML of every visited page) or "replay" (serve UI_BASE_URL from the snapshots)
+UI_SNAPSHOT_MODE = os.getenv("UI_SNAPSHOT_MODE", "off").lower()
+UI_SNAPSHOT_DIR = os.getenv("UI_SNAPSHOT_DIR", os.path.join("ui_tests", "snapshots"))
+
+# Timing instrumentation (see features/utils/profiling.py)
+WORKER_ID = os.getenv("TEST_WORKER_ID", "main")
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+TIMINGS_DIR = os.getenv("TIMINGS_DIR", os.path.join("reports", "timings"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "10"))
+# Raw request records kept per worker (a uniform sample); every request still counts in the per-endpoint stats
+PROFILE_REQUEST_SAMPLE = int(os.getenv("PROFILE_REQUEST_SAMPLE", "200"))
+
+# Duplicate-request storms (see features/utils/idempotency.py): with more than 1 copy the deposit and transfer
+# steps send identical requests concurrently, resend them after DUPLICATE_STORM_TIMEOUT and check for double application
+DUPLICATE_STORM_COPIES = int(os.getenv("DUPLICATE_STORM_COPIES", "1"))
+DUPLICATE_STORM_RETRIES = int(os.getenv("DUPLICATE_STORM_RETRIES", "2"))
+DUPLICATE_STORM_TIMEOUT = float(os.getenv("DUPLICATE_STORM_TIMEOUT", "2"))
+IDEMPOTENCY_KEYS = os.getenv("IDEMPOTENCY_KEYS", "true").lower() == "true"
+
+# Data-driven scenarios (see features/utils/datasets.py)
+DATASET_CONCURRENCY = int(os.getenv("DATASET_CONCURRENCY", "8"))
+
+# Create each feature's accounts ahead of its scenarios on the async worker loop when the account
+# pool is disabled (see features/utils/async_steps.py and account_pool.prefetch_accounts)
+ASYNC_PREFETCH_ENABLED = os.getenv("ASYNC_PREFETCH_ENABLED", "true").lower() == "true"
+
+# Repeated requests are replayed in the order they were recorded, so a recording is made with
+# accounts set up one at a time, in scenario order (replay and verify keep the concurrent setup)
+SERIAL_ACCOUNT_SETUP = API_CASSETTE_MODE == "record"
+if SERIAL_ACCOUNT_SETUP:
+    ACCOUNT_POOL_ENABLED = False
+    ASYNC_PREFETCH_ENABLED = False
+    DATASET_CONCURRENCY = 1
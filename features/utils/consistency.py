@@ -0,0 +1,232 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from features.utils.api_client import deposit_payload, withdraw_payload, transfer_payload
+from features.utils.load import ENDPOINTS
+
+# Balances are floats on the wire; anything below half a cent is rounding, not a lost update
+TOLERANCE = 0.005
+
+
+class ConsistencyChecker:
+    """
+    Fires concurrent transactions between a small set of accounts and checks the ledger afterwards.
+
+    Every request is recorded with its start/end time and outcome. Once all requests have
+    completed, balances are read back through /account/{id} and checked for:
+
+    - conservation: the total across accounts equals the starting total plus successful
+      deposits minus successful withdrawals (transfers must not create or destroy money);
+    - non-negative balances;
+    - per-account agreement with the acknowledged history (catches lost updates and
+      double debits even when they cancel out in the total).
+
+    Requests that ended in a transport error or 5xx are "indeterminate": they may or may not
+    have been applied, so accounts they touch are excluded from the per-account check.
+    """
+
+    def __init__(self, client, accounts, mix=None, currency="USD", amount=1.0, concurrency=16, seed=None):
+        self.client = client
+        self.accounts = list(accounts)
+        mix = mix or {"transfer": 1.0}
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.currency = currency
+        self.amount = amount
+        self.concurrency = concurrency
+        self.random = random.Random(seed)
+        self.history = []
+        self.history_lock = threading.Lock()
+
+    # ================================
+    # Execution
+    # ================================
+
+    def balances(self):
+        balances = {}
+        for account_id in self.accounts:
+            response = self.client.get_account(account_id)
+            response.raise_for_status()
+            balances[account_id] = float(response.json()["balance"])
+        return balances
+
+    def plan(self, count):
+        """Builds the request list up front so a seed reproduces the same workload."""
+        planned = []
+        for _ in range(count):
+            operation = self.random.choices(self.operations, self.weights)[0]
+            debit, credit = self.random.sample(self.accounts, 2)
+            if operation == "deposit":
+                planned.append((operation, deposit_payload(credit, self.amount, self.currency), None, credit))
+            elif operation == "withdraw":
+                planned.append((operation, withdraw_payload(debit, self.amount, self.currency), debit, None))
+            else:
+                planned.append((operation, transfer_payload(debit, credit, self.amount, self.currency), debit, credit))
+        return planned
+
+    def send(self, index, operation, payload, debit, credit):
+        started = time.perf_counter()
+        try:
+            status = self.client.post(ENDPOINTS[operation], payload).status_code
+        except Exception as e:
+            status = type(e).__name__
+        entry = {
+            "seq": index,
+            "operation": operation,
+            "debit": debit,
+            "credit": credit,
+            "amount": self.amount,
+            "status": status,
+            "start": started,
+            "end": time.perf_counter(),
+        }
+        with self.history_lock:
+            self.history.append(entry)
+
+    def run(self, count):
+        """Sends `count` transactions with `concurrency` in flight and returns the report."""
+        if len(self.accounts) < 2:
+            raise ValueError("The consistency checker needs at least two accounts")
+
+        initial = self.balances()
+        planned = self.plan(count)
+        self.history = []
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for index, request in enumerate(planned):
+                executor.submit(self.send, index, *request)
+        elapsed = time.perf_counter() - started
+
+        final = self.balances()
+        return self.report(initial, final, elapsed)
+
+    # ================================
+    # Invariants
+    # ================================
+
+    @staticmethod
+    def applied(entry):
+        return entry["status"] == 200
+
+    @staticmethod
+    def indeterminate(entry):
+        return not isinstance(entry["status"], int) or entry["status"] >= 500
+
+    def expected_balances(self, initial):
+        expected = dict(initial)
+        for entry in self.history:
+            if not self.applied(entry):
+                continue
+            if entry["debit"] is not None:
+                expected[entry["debit"]] -= entry["amount"]
+            if entry["credit"] is not None:
+                expected[entry["credit"]] += entry["amount"]
+        return expected
+
+    def violations(self, initial, final):
+        found = []
+        uncertain = {
+            account_id
+            for entry in self.history if self.indeterminate(entry)
+            for account_id in (entry["debit"], entry["credit"]) if account_id is not None
+        }
+
+        net_external = sum(
+            entry["amount"] * (1 if entry["operation"] == "deposit" else -1)
+            for entry in self.history
+            if self.applied(entry) and entry["operation"] != "transfer"
+        )
+        expected_total = sum(initial.values()) + net_external
+        actual_total = sum(final.values())
+        if not uncertain and abs(actual_total - expected_total) > TOLERANCE:
+            found.append({
+                "invariant": "conservation",
+                "expected_total": round(expected_total, 2),
+                "actual_total": round(actual_total, 2),
+                "accounts": sorted(self.accounts),
+            })
+
+        for account_id, balance in final.items():
+            if balance < -TOLERANCE:
+                found.append({"invariant": "non_negative", "account": account_id, "balance": balance, "accounts": [account_id]})
+
+        for account_id, balance in self.expected_balances(initial).items():
+            if account_id not in uncertain and abs(final[account_id] - balance) > TOLERANCE:
+                found.append({
+                    "invariant": "acknowledged_history",
+                    "account": account_id,
+                    "expected_balance": round(balance, 2),
+                    "actual_balance": round(final[account_id], 2),
+                    "accounts": [account_id],
+                })
+        return found
+
+    def minimal_history(self, accounts, limit=20):
+        """
+        Smallest useful slice of the history for a violation on `accounts`.
+
+        Only requests touching those accounts can have caused it, and a lost update or double
+        debit needs two requests on the same account in flight at once, so requests that did not
+        overlap another request on the same account are dropped when any overlapping ones exist.
+        """
+        accounts = set(accounts)
+        relevant = sorted(
+            (entry for entry in self.history
+             if (self.applied(entry) or self.indeterminate(entry)) and {entry["debit"], entry["credit"]} & accounts),
+            key=lambda entry: entry["start"]
+        )
+
+        by_account = defaultdict(list)
+        for entry in relevant:
+            for account_id in {entry["debit"], entry["credit"]} & accounts:
+                by_account[account_id].append(entry)
+
+        overlapping = set()
+        for entries in by_account.values():
+            for i, entry in enumerate(entries):
+                for other in entries[i + 1:]:
+                    if other["start"] >= entry["end"]:
+                        break
+                    overlapping.update((entry["seq"], other["seq"]))
+
+        if overlapping:
+            relevant = [entry for entry in relevant if entry["seq"] in overlapping]
+        origin = self.history[0]["start"] if self.history else 0.0
+        return [
+            {
+                "seq": entry["seq"],
+                "operation": entry["operation"],
+                "debit": entry["debit"],
+                "credit": entry["credit"],
+                "amount": entry["amount"],
+                "status": entry["status"],
+                "start_ms": round((entry["start"] - origin) * 1000, 3),
+                "end_ms": round((entry["end"] - origin) * 1000, 3),
+            }
+            for entry in relevant[:limit]
+        ]
+
+    def report(self, initial, final, elapsed):
+        self.history.sort(key=lambda entry: entry["start"])
+        statuses = defaultdict(int)
+        for entry in self.history:
+            statuses[f"{entry['operation']}:{entry['status']}"] += 1
+
+        violations = self.violations(initial, final)
+        for violation in violations:
+            violation["history"] = self.minimal_history(violation.pop("accounts"))
+
+        return {
+            "requests": len(self.history),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(self.history) / elapsed, 2) if elapsed else 0.0,
+            "applied": sum(1 for entry in self.history if self.applied(entry)),
+            "indeterminate": sum(1 for entry in self.history if self.indeterminate(entry)),
+            "statuses": dict(statuses),
+            "initial_balances": initial,
+            "final_balances": final,
+            "violations": violations,
+        }
@@ -0,0 +1,132 @@
+import csv
+import itertools
+import json
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from features.utils.account_pool import create_account
+from features.utils.api_client import get_client
+
+INVALID_ACCOUNT_ID = "999999999"
+
+# ================================
+# Streaming readers
+# ================================
+
+def iter_rows(path):
+    """
+    Lazily yields dataset rows as dicts from a .csv or .jsonl file, one line at a time.
+
+    Columns: operation (deposit/withdraw/transfer), account, counter_account, balance, amount,
+    currency, account_currency (optional), expected_status. `account` / `counter_account` are
+    "new" (a fresh account funded with `balance`) or "invalid" (an id that does not exist).
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.endswith(".jsonl"):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(line for line in handle if not line.startswith("#"))
+
+
+def batches(rows, size):
+    """Groups an iterator into lists of at most `size` items without materialising it."""
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ================================
+# Row execution
+# ================================
+
+def _account_id(client, kind, currency, balance):
+    if kind == "invalid":
+        return INVALID_ACCOUNT_ID
+    return create_account(client, currency, balance)["id"]
+
+
+def run_row(client, row):
+    """Executes one dataset row and returns (actual_status, response_text)."""
+    operation = row["operation"].strip().lower()
+    currency = row["currency"].strip()
+    amount = row["amount"]
+    balance = float(row.get("balance") or 0)
+    # Invalid-currency rows name a valid account_currency so the request still reaches the endpoint
+    account_currency = (row.get("account_currency") or currency).strip()
+    account = _account_id(client, row.get("account", "new").strip(), account_currency, balance)
+
+    if operation == "deposit":
+        response = client.deposit(account, amount, currency)
+    elif operation == "withdraw":
+        response = client.withdraw(account, amount, currency)
+    elif operation == "transfer":
+        counter = _account_id(client, (row.get("counter_account") or "new").strip(), account_currency, 0)
+        response = client.transfer(account, counter, amount, currency)
+    else:
+        raise ValueError(f"Unknown dataset operation: {operation}")
+    return response.status_code, response.text
+
+
+class DatasetRun:
+    """Aggregated outcome of a dataset: counters per operation/status plus the failing rows only."""
+
+    def __init__(self, max_failures_kept=50):
+        self.rows = 0
+        self.passed = 0
+        self.outcomes = Counter()
+        self.failures = []
+        self.failure_count = 0
+        self.max_failures_kept = max_failures_kept
+
+    def add(self, line_number, row, status, body, on_failure=None):
+        self.rows += 1
+        expected = int(row["expected_status"])
+        self.outcomes[f"{row['operation']}:{status}"] += 1
+        if status == expected:
+            self.passed += 1
+            return
+
+        self.failure_count += 1
+        failure = {"row": line_number, "input": row, "expected": expected, "actual": status, "body": body}
+        if on_failure is not None:
+            on_failure(failure)
+        if len(self.failures) < self.max_failures_kept:
+            self.failures.append(failure)
+
+
+def run_dataset(path, batch_size=100, concurrency=8, client=None, on_failure=None):
+    """
+    Streams `path` through the shared API client in batches and returns a DatasetRun.
+
+    Only one batch is held in memory at a time, so the dataset size does not matter.
+    `on_failure` is called (on the calling thread) once per failing row.
+    """
+    client = client or get_client()
+    run = DatasetRun()
+    numbered = enumerate(iter_rows(path), start=1)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for batch in batches(numbered, batch_size):
+            outcomes = executor.map(lambda item: _safe_run(client, item[1]), batch)
+            for (line_number, row), (status, body) in zip(batch, outcomes):
+                run.add(line_number, row, status, body, on_failure)
+    return run
+
+
+def _safe_run(client, row):
+    try:
+        return run_row(client, row)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def resolve_dataset(path):
+    """Dataset paths in feature files are relative to the features/ directory unless absolute."""
+    if os.path.isabs(path) or os.path.exists(path):
+        return path
+    return os.path.join("features", path)
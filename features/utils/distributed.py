@@ -0,0 +1,265 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from features.utils.scheduler import (
+    assign_shards, behave_command, discover_scenarios, durations_from_allure, load_durations, missing_scenarios,
+    save_durations
+)
+
+# Scenario sources for each worker pool; API and UI workers need different images/resources
+POOLS = {
+    "api": ["features"],
+    "ui": ["ui_tests"],
+}
+LEASE_SECONDS = 60
+POLL_SECONDS = 1.0
+
+
+class FileBroker:
+    """
+    Work queue on a directory shared by every container (a compose volume or NFS mount).
+
+    Each shard is one JSON file. Workers claim a shard by renaming it from pending/ to
+    claimed/ (an atomic rename, so exactly one worker wins), keep the claim alive by
+    touching it while behave runs, and write done/<shard>.json when it finishes. A claim
+    that stops being touched for LEASE_SECONDS is put back in pending/ by the coordinator,
+    so a killed container only costs its shard's time. The coordinator writes `sealed`
+    (holding the shard count) once every shard is queued; idle workers keep polling until
+    every shard is done, so they are still around to take a re-queued shard.
+    """
+
+    def __init__(self, root, pool):
+        self.root = root
+        self.pool = pool
+        self.dirs = {name: os.path.join(root, pool, name) for name in ("pending", "claimed", "done")}
+        self.results_dir = os.path.join(root, "results", pool)
+        self.sealed_marker = os.path.join(root, pool, "sealed")
+
+    # ================================
+    # Coordinator side
+    # ================================
+
+    def reset(self):
+        shutil.rmtree(os.path.join(self.root, self.pool), ignore_errors=True)
+        shutil.rmtree(self.results_dir, ignore_errors=True)
+        for path in list(self.dirs.values()) + [self.results_dir]:
+            os.makedirs(path, exist_ok=True)
+
+    def enqueue(self, shards):
+        for index, shard in enumerate(shards):
+            shard_id = f"{self.pool}-{index:03d}"
+            temporary = os.path.join(self.root, self.pool, f".{shard_id}.json")
+            with open(temporary, "w", encoding="utf-8") as handle:
+                json.dump(dict(shard, id=shard_id, pool=self.pool), handle)
+            # Appear in pending/ atomically so a worker never reads a half-written shard
+            os.replace(temporary, os.path.join(self.dirs["pending"], f"{shard_id}.json"))
+        with open(self.sealed_marker, "w", encoding="utf-8") as handle:
+            handle.write(str(len(shards)))
+
+    def done(self):
+        results = []
+        for name in os.listdir(self.dirs["done"]):
+            if name.startswith("."):
+                continue  # still being written
+            with open(os.path.join(self.dirs["done"], name), encoding="utf-8") as handle:
+                results.append(json.load(handle))
+        return results
+
+    def requeue_expired(self):
+        """Returns shards whose worker stopped renewing its lease to pending/; returns their ids."""
+        requeued = []
+        now = time.time()
+        for name in os.listdir(self.dirs["claimed"]):
+            path = os.path.join(self.dirs["claimed"], name)
+            try:
+                if now - os.path.getmtime(path) <= LEASE_SECONDS:
+                    continue
+                shard_id = name.rsplit("--", 1)[1]
+                os.replace(path, os.path.join(self.dirs["pending"], shard_id))
+                requeued.append(shard_id)
+            except (FileNotFoundError, IndexError):
+                continue
+        return requeued
+
+    # ================================
+    # Worker side
+    # ================================
+
+    def sealed(self):
+        return os.path.exists(self.sealed_marker)
+
+    def claims(self):
+        """Number of shards currently claimed by some worker."""
+        try:
+            return len(os.listdir(self.dirs["claimed"]))
+        except FileNotFoundError:
+            return 0
+
+    def finished(self):
+        """Whether the sealed queue has a done/ entry for every shard (or was already removed by the coordinator)."""
+        try:
+            if not self.sealed():
+                return False
+            with open(self.sealed_marker, encoding="utf-8") as handle:
+                total = int(handle.read() or 0)
+            done = [name for name in os.listdir(self.dirs["done"]) if not name.startswith(".")]
+        except FileNotFoundError:
+            return True  # the coordinator collected the run and dropped the queue
+        return len(done) >= total
+
+    def claim(self, worker_id):
+        """Atomically takes the next pending shard, or returns None when there is none right now."""
+        try:
+            names = sorted(os.listdir(self.dirs["pending"]))
+        except FileNotFoundError:
+            return None
+        for name in names:
+            claimed = os.path.join(self.dirs["claimed"], f"{worker_id}--{name}")
+            try:
+                os.rename(os.path.join(self.dirs["pending"], name), claimed)
+                # A rename keeps the queued file's mtime; start the lease now so the claim is not already expired
+                os.utime(claimed)
+                with open(claimed, encoding="utf-8") as handle:
+                    return claimed, json.load(handle)
+            except FileNotFoundError:
+                continue  # another worker won this one (or it was re-queued before the lease started)
+        return None
+
+    def complete(self, claimed, shard, result):
+        temporary = os.path.join(self.dirs["done"], f".{shard['id']}.json")
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(dict(result, id=shard["id"], scenarios=shard["scenarios"]), handle)
+        os.replace(temporary, os.path.join(self.dirs["done"], f"{shard['id']}.json"))
+        try:
+            os.remove(claimed)
+        except FileNotFoundError:
+            pass
+
+
+# ================================
+# Coordinator
+# ================================
+
+def coordinate(root, pools, shards_per_pool, results_dir="allure-results", name_filter=None, timeout=3600):
+    """
+    Shards every pool's scenarios by historical duration, waits for the workers to finish
+    them and collects their allure results into `results_dir`. Returns one exit code.
+    """
+    durations = load_durations()
+    brokers = {}
+    expected = {}
+    for pool in pools:
+        scenarios = discover_scenarios(POOLS[pool], name_filter)
+        if not scenarios:
+            continue
+        # More shards than workers so fast workers pick up extra ones instead of idling
+        shards = assign_shards(scenarios, shards_per_pool[pool], durations)
+        broker = brokers[pool] = FileBroker(root, pool)
+        broker.reset()
+        # Counted from what was queued: workers may claim shards before pending/ could be listed
+        expected[pool] = len(shards)
+        broker.enqueue([{"paths": POOLS[pool], "scenarios": shard["scenarios"], "expected_s": shard["load"]} for shard in shards])
+        print(f" Queued {len(scenarios)} {pool} scenario(s) in {len(shards)} shard(s)")
+
+    started = time.time()
+    while True:
+        finished = {pool: len(broker.done()) for pool, broker in brokers.items()}
+        if all(finished[pool] >= expected[pool] for pool in brokers):
+            break
+        if time.time() - started > timeout:
+            print(f" Timed out after {timeout}s waiting for shards: {finished} of {expected}")
+            break
+        for pool, broker in brokers.items():
+            for shard_id in broker.requeue_expired():
+                print(f" Lease expired for {shard_id}; re-queued")
+        time.sleep(POLL_SECONDS)
+
+    exit_code = 0
+    os.makedirs(results_dir, exist_ok=True)
+    for pool, broker in brokers.items():
+        for result in sorted(broker.done(), key=lambda item: item["id"]):
+            print(f" {result['id']}: {len(result['scenarios'])} scenario(s) on {result['worker']} "
+                  f"in {result['seconds']:.1f}s (exit code {result['exit_code']})")
+            exit_code = exit_code or result["exit_code"]
+        durations.update(durations_from_allure(broker.results_dir))
+        for name in os.listdir(broker.results_dir):
+            shutil.move(os.path.join(broker.results_dir, name), os.path.join(results_dir, name))
+        if len(broker.done()) < expected[pool]:
+            exit_code = exit_code or 1
+        # Drop the drained queue so workers started for the next run wait for a fresh one
+        shutil.rmtree(os.path.join(root, pool), ignore_errors=True)
+    save_durations(durations)
+    print(f" Distributed run finished in {time.time() - started:.1f}s")
+    return exit_code
+
+
+# ================================
+# Worker
+# ================================
+
+def _renew_lease(path, stop):
+    while not stop.wait(LEASE_SECONDS / 4):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return
+
+
+def work(root, pool, worker_id=None, idle_timeout=600):
+    """
+    Claims and runs shards from `pool` until every shard of the sealed queue is done. While
+    other workers still hold claims this worker keeps waiting (without the idle timeout),
+    because a claim whose worker dies comes back to pending/.
+    """
+    worker_id = worker_id or socket.gethostname()
+    broker = FileBroker(root, pool)
+    idle_since = time.time()
+    ran = 0
+
+    while True:
+        claim = broker.claim(worker_id)
+        if claim is None:
+            if broker.finished():
+                break
+            if broker.claims():
+                idle_since = time.time()
+            if time.time() - idle_since > idle_timeout:
+                print(f" Worker {worker_id}: no work for {idle_timeout}s; exiting")
+                break
+            time.sleep(POLL_SECONDS)
+            continue
+
+        claimed, shard = claim
+        output_dir = os.path.join(broker.results_dir, shard["id"])
+        os.makedirs(output_dir, exist_ok=True)
+        stop = threading.Event()
+        threading.Thread(target=_renew_lease, args=(claimed, stop), daemon=True).start()
+
+        print(f" Worker {worker_id}: running {shard['id']} ({len(shard['scenarios'])} scenario(s))")
+        started = time.time()
+        env = dict(os.environ, TEST_WORKER_ID=f"{worker_id}-{shard['id']}")
+        try:
+            exit_code = subprocess.call(behave_command(shard["paths"], shard["scenarios"], output_dir), env=env)
+        finally:
+            stop.set()
+
+        # A shard that silently ran fewer scenarios than assigned must not pass
+        missing = missing_scenarios(output_dir, shard["scenarios"])
+        if missing:
+            print(f" Worker {worker_id}: {shard['id']} did not run {len(missing)} scenario(s): {missing}")
+            exit_code = exit_code or 1
+
+        # Flatten into the pool's results directory for the coordinator to collect
+        for name in os.listdir(output_dir):
+            shutil.move(os.path.join(output_dir, name), os.path.join(broker.results_dir, name))
+        os.rmdir(output_dir)
+        broker.complete(claimed, shard, {"worker": worker_id, "exit_code": exit_code, "seconds": time.time() - started})
+        ran += 1
+        idle_since = time.time()
+
+    print(f" Worker {worker_id}: ran {ran} shard(s) from the {pool} pool")
+    return 0
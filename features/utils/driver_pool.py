@@ -0,0 +1,206 @@
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from selenium import webdriver
+from selenium.webdriver.edge.options import Options
+from selenium.webdriver.edge.service import Service
+from features.utils import config
+from features.utils.logger import logger
+
+
+# ================================
+# Driver binary resolution (cached on disk)
+# ================================
+
+def resolve_driver_path(cache_file=None):
+    """
+    Returns the msedgedriver path, resolving it at most once per machine.
+
+    Order: EDGE_DRIVER_PATH, the on-disk cache, msedgedriver on PATH, then webdriver-manager
+    (which needs network access), whose result is written to the cache for later runs.
+    """
+    if config.EDGE_DRIVER_PATH:
+        return config.EDGE_DRIVER_PATH
+
+    cache_file = cache_file or config.DRIVER_CACHE_FILE
+    if os.path.exists(cache_file):
+        with open(cache_file, encoding="utf-8") as handle:
+            cached = json.load(handle).get("edgedriver")
+        if cached and os.path.exists(cached):
+            return cached
+
+    path = shutil.which("msedgedriver")
+    if path is None:
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        logger.info("Resolving Edge WebDriver through webdriver-manager...")
+        path = EdgeChromiumDriverManager().install()
+
+    os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+    with open(cache_file, "w", encoding="utf-8") as handle:
+        json.dump({"edgedriver": path}, handle)
+    return path
+
+
+# ================================
+# Resource blocking (DevTools request interception)
+# ================================
+
+# Heavy static resources the UI scenarios never assert on
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+]
+# Third-party trackers, embeds and the cookie-consent provider (no banner means no banner to dismiss)
+BLOCKED_THIRD_PARTY_PATTERNS = [
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*youtube.com*", "*ytimg.com*", "*vimeo.com*",
+    "*facebook.net*", "*facebook.com*", "*linkedin.com*", "*licdn.com*", "*twitter.com*",
+    "*hotjar.com*", "*hubspot.com*", "*hs-scripts.com*", "*hs-analytics.net*", "*leadinfo.net*",
+    "*cookiebot.com*", "*cookieinformation.com*", "*consensu.org*", "*onetrust.com*",
+]
+
+
+def block_resources(driver, extra_patterns=()):
+    """
+    Blocks heavy resource types and third-party hosts for every page this session loads,
+    through the Chromium DevTools Network domain (Edge exposes it via execute_cdp_cmd).
+    Blocked requests fail immediately in the browser instead of going over the network.
+    """
+    patterns = BLOCKED_RESOURCE_PATTERNS + BLOCKED_THIRD_PARTY_PATTERNS + list(extra_patterns)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+# ================================
+# Warm pool of browser sessions
+# ================================
+
+class DriverPoolTimeout(TimeoutError):
+    """Raised when no WebDriver session becomes free within the acquire timeout."""
+
+
+class DriverPool:
+    """
+    Keeps up to `size` Edge sessions alive for the whole run.
+
+    A scenario acquires a session and releases it afterwards; released sessions have their
+    cookies and web storage cleared and are parked on about:blank instead of being quit.
+
+    With block_resources=True every session is launched with images disabled, an "eager"
+    page load strategy (DOMContentLoaded rather than every subresource) and the request
+    blocking above, which is all the DOM presence checks in ui_tests/ need.
+    """
+
+    def __init__(self, size=1, headless=True, window_size="1920,1080", block_resources=False, blocked_urls=()):
+        self.size = size
+        self.headless = headless
+        self.window_size = window_size
+        self.block_resources = block_resources
+        self.blocked_urls = list(blocked_urls)
+        self.idle = queue.Queue()
+        self.created = 0
+        self.lock = threading.Lock()
+        self._driver_path = None
+
+    def options(self):
+        options = Options()
+        if self.headless:
+            options.add_argument("--headless=new")
+            options.add_argument(f"--window-size={self.window_size}")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-first-run")
+        if self.block_resources:
+            options.page_load_strategy = "eager"
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_argument("--disable-extensions")
+            options.add_argument("--mute-audio")
+        return options
+
+    def launch(self):
+        if self._driver_path is None:
+            self._driver_path = resolve_driver_path()
+        logger.info("Launching Edge WebDriver session for the pool...")
+        driver = webdriver.Edge(service=Service(self._driver_path), options=self.options())
+        if self.block_resources:
+            block_resources(driver, self.blocked_urls)
+        return driver
+
+    def warm_up(self, count=None):
+        """Starts sessions ahead of the first scenario."""
+        for _ in range(count if count is not None else self.size):
+            with self.lock:
+                if self.created >= self.size:
+                    return
+                self.created += 1
+            self.idle.put(self.launch())
+
+    def acquire(self, timeout=None):
+        """
+        Returns an idle session, launching one while the pool is below `size`; otherwise waits
+        up to `timeout` seconds (UI_DRIVER_ACQUIRE_TIMEOUT by default) for one to be released.
+        """
+        timeout = config.UI_DRIVER_ACQUIRE_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self.lock:
+                can_launch = self.created < self.size
+                if can_launch:
+                    self.created += 1
+            if can_launch:
+                try:
+                    return self.launch()
+                except Exception:
+                    with self.lock:
+                        self.created -= 1
+                    raise
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DriverPoolTimeout(
+                    f"No WebDriver session became free within {timeout:g}s ({self.created} of {self.size} in use); "
+                    f"raise UI_DRIVER_ACQUIRE_TIMEOUT, or check that sessions are released"
+                )
+            try:
+                # Wake up periodically: a discarded session frees a slot without anything being put back
+                return self.idle.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                continue
+
+    def reset(self, driver):
+        driver.delete_all_cookies()
+        driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        driver.get("about:blank")
+
+    def release(self, driver):
+        """Resets the session and returns it to the pool; a session that cannot be reset is quit."""
+        try:
+            self.reset(driver)
+        except Exception as e:
+            logger.warning(f"Discarding WebDriver session that failed to reset: {e}")
+            self.discard(driver)
+            return
+        self.idle.put(driver)
+
+    def discard(self, driver):
+        try:
+            driver.quit()
+        finally:
+            with self.lock:
+                self.created -= 1
+
+    def close(self):
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(driver)
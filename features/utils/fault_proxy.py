@@ -0,0 +1,165 @@
+import http.client
+import random
+import socket
+import struct
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Hop-by-hop headers are not forwarded; the proxy manages its own connections
+HOP_BY_HOP = {"connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade", "proxy-connection"}
+
+
+class FaultProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are separate writes; don't wait for the delayed ACK
+
+    def _forward(self):
+        proxy = self.server.proxy
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_BY_HOP}
+
+        fault = proxy.next_fault()
+        delay = proxy.delay()
+        if delay:
+            time.sleep(delay)
+
+        upstream = proxy.connection()
+        try:
+            upstream.request(self.command, self.path, body=body, headers=headers)
+            response = upstream.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            proxy.discard_connection()
+            proxy.count("upstream_error")
+            self.send_error(502)
+            return
+
+        # Faults hit after the upstream applied the request: the client cannot tell whether it did
+        if fault == "drop":
+            proxy.count("dropped")
+            time.sleep(proxy.hold)
+            self.close_connection = True
+            return
+        if fault == "reset":
+            proxy.count("reset")
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            self.close_connection = True
+            return
+
+        proxy.count("forwarded")
+        self.send_response(response.status)
+        for name, value in response.getheaders():
+            if name.lower() not in HOP_BY_HOP and name.lower() != "content-length":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._forward()
+
+    def do_POST(self):
+        self._forward()
+
+    def log_message(self, format, *args):
+        pass  # keep storm runs quiet
+
+
+class FaultProxy:
+    """
+    HTTP proxy in front of `upstream` that injects latency, dropped responses and connection resets.
+
+    Every request gets `latency` seconds plus up to `jitter` seconds of delay. With probability
+    `drop_rate` the response is withheld for `hold` seconds and the connection closed (the
+    client sees a read timeout); with `reset_rate` the connection is reset instead. Both faults
+    happen after the upstream processed the request, which is exactly when a retrying client
+    can apply a transaction twice.
+    """
+
+    def __init__(self, upstream, latency=0.0, jitter=0.0, drop_rate=0.0, reset_rate=0.0, hold=5.0,
+                 host="127.0.0.1", port=0, seed=None):
+        parts = urlsplit(upstream)
+        self.upstream_host = parts.hostname
+        self.upstream_port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.upstream_https = parts.scheme == "https"
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.reset_rate = reset_rate
+        self.hold = hold
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.local = threading.local()
+        self.httpd = ThreadingHTTPServer((host, port), FaultProxyHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.proxy = self
+        self.thread = None
+
+    # ================================
+    # Fault decisions
+    # ================================
+
+    def next_fault(self):
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.drop_rate:
+            return "drop"
+        if roll < self.drop_rate + self.reset_rate:
+            return "reset"
+        return None
+
+    def delay(self):
+        if not self.jitter:
+            return self.latency
+        with self.lock:
+            return self.latency + self.random.uniform(0, self.jitter)
+
+    def count(self, outcome):
+        with self.lock:
+            self.counts[outcome] += 1
+
+    # ================================
+    # Upstream connections (one keep-alive connection per handler thread)
+    # ================================
+
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            factory = http.client.HTTPSConnection if self.upstream_https else http.client.HTTPConnection
+            connection = self.local.connection = factory(self.upstream_host, self.upstream_port, timeout=30)
+        return connection
+
+    def discard_connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    # ================================
+    # Lifecycle
+    # ================================
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="fault-proxy", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,45 @@
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# ================================
+# Connection timing (connect vs. server time per request)
+# ================================
+
+connect_timing = threading.local()
+
+
+def _record_connect(connect):
+    started = time.perf_counter()
+    try:
+        connect()
+    finally:
+        connect_timing.seconds = getattr(connect_timing, "seconds", 0.0) + time.perf_counter() - started
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        _record_connect(super().connect)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _record_connect(super().connect)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record how long TCP/TLS setup took on the calling thread."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
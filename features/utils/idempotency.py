@@ -0,0 +1,267 @@
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from features.utils import config
+from features.utils.api_client import deposit_payload, idempotency_headers, transfer_payload
+from features.utils.consistency import TOLERANCE
+from features.utils.load import ENDPOINTS
+
+
+def new_key():
+    return str(uuid.uuid4())
+
+
+# ================================
+# Sending one logical transaction as a storm of identical requests
+# ================================
+
+def send_with_retries(client, operation, payload, key=None, retries=2, timeout=None):
+    """
+    Sends one request the way an impatient client does: on a read timeout or a dropped
+    connection it resends the identical request (same idempotency key, if any) up to
+    `retries` more times. Returns (final response or None, list of attempt outcomes).
+    """
+    attempts = []
+    for _ in range(retries + 1):
+        kwargs = {"headers": idempotency_headers(key)}
+        if timeout is not None:
+            kwargs["timeout"] = (config.HTTP_CONNECT_TIMEOUT, timeout)
+        try:
+            response = client.post(ENDPOINTS[operation], payload, **kwargs)
+        except Exception as e:
+            attempts.append(type(e).__name__)
+            continue
+        attempts.append(response.status_code)
+        return response, attempts
+    return None, attempts
+
+
+def storm(client, operation, payload, copies=3, retries=2, timeout=None, use_key=True, executor=None):
+    """
+    Fires `copies` identical requests for one transaction at the same time, each retrying
+    after timeouts. Returns a summary with the representative response (the first 200, else
+    the first response at all) and every attempt's outcome.
+    """
+    key = new_key() if use_key else None
+    own_executor = executor is None
+    executor = executor or ThreadPoolExecutor(max_workers=copies)
+    try:
+        futures = [executor.submit(send_with_retries, client, operation, payload, key, retries, timeout) for _ in range(copies)]
+        results = [future.result() for future in futures]
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False)
+
+    responses = [response for response, _ in results if response is not None]
+    acknowledged = [response for response in responses if response.status_code == 200]
+    return {
+        "key": key,
+        "response": (acknowledged or responses or [None])[0],
+        "acknowledged": len(acknowledged),
+        "answered": len(responses),
+        "attempts": [outcome for _, outcomes in results for outcome in outcomes],
+    }
+
+
+def outcome(result):
+    """Whether any copy was acknowledged ("applied"), none got an answer ("unknown") or all were refused ("rejected")."""
+    if result["acknowledged"]:
+        return "applied"
+    return "unknown" if not result["answered"] else "rejected"
+
+
+def _readable_balances(client, account_ids):
+    balances = {}
+    for account_id in account_ids:
+        response = client.get_account(account_id)
+        if response.status_code == 200:
+            balances[account_id] = float(response.json()["balance"])
+    return balances
+
+
+def storm_transaction(client, operation, payload):
+    """
+    Step-level storm (DUPLICATE_STORM_COPIES > 1): sends the step's deposit/transfer as
+    concurrent identical copies with retries after DUPLICATE_STORM_TIMEOUT, then reads the
+    balances back. `double_applied` lists every account that moved by more than the one
+    transaction the step asked for.
+    """
+    debit = payload.get("debitAccountId")
+    credit = payload.get("creditAccountId", payload.get("accountId"))
+    before = _readable_balances(client, [account_id for account_id in (debit, credit) if account_id is not None])
+
+    result = storm(client, operation, payload, copies=config.DUPLICATE_STORM_COPIES, retries=config.DUPLICATE_STORM_RETRIES,
+                   timeout=config.DUPLICATE_STORM_TIMEOUT, use_key=config.IDEMPOTENCY_KEYS)
+    result["outcome"] = outcome(result)
+
+    after = _readable_balances(client, before)
+    amount = float(payload["amount"])
+    result["double_applied"] = []
+    for account_id, balance in before.items():
+        change = (after[account_id] - balance) * (-1 if account_id == debit else 1)
+        allowed = {"applied": (amount,), "unknown": (0.0, amount)}.get(result["outcome"], (0.0,))
+        if all(abs(change - expected) > TOLERANCE for expected in allowed):
+            result["double_applied"].append({"account": account_id, "change": round(change, 2), "expected": allowed})
+    return result
+
+
+# ================================
+# Duplicate-request storm against a set of accounts
+# ================================
+
+class DuplicateStorm:
+    """
+    Sends `count` deposits/transfers, each as a storm of identical requests with retries,
+    and checks afterwards that no transaction was applied more than once.
+
+    Every account's final balance must lie between applying each acknowledged transaction
+    once and additionally applying each transaction whose outcome is unknown (no copy got a
+    response, so it may or may not have happened). Anything outside that range is a double
+    application (or a lost one). Without idempotency keys the server has no way to tell the
+    copies apart, which is what the check is expected to catch.
+    """
+
+    def __init__(self, client, accounts, mix=None, currency="USD", amount=1.0, copies=3, retries=2,
+                 timeout=None, use_keys=True, concurrency=16, seed=None, balance_client=None):
+        if len(accounts) < 2:
+            raise ValueError("The duplicate storm needs at least two accounts")
+        self.client = client
+        # Balances are read around the storm, not through it (e.g. bypassing a fault-injecting proxy)
+        self.balance_client = balance_client or client
+        self.accounts = list(accounts)
+        mix = mix or {"transfer": 3.0, "deposit": 1.0}
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.currency = currency
+        self.amount = amount
+        self.copies = copies
+        self.retries = retries
+        self.timeout = timeout
+        self.use_keys = use_keys
+        self.concurrency = concurrency
+        self.random = random.Random(seed)
+        self.results = []
+        self.results_lock = threading.Lock()
+
+    def balances(self):
+        balances = {}
+        for account_id in self.accounts:
+            response = self.balance_client.get_account(account_id)
+            response.raise_for_status()
+            balances[account_id] = float(response.json()["balance"])
+        return balances
+
+    def plan(self, count):
+        planned = []
+        for _ in range(count):
+            operation = self.random.choices(self.operations, self.weights)[0]
+            debit, credit = self.random.sample(self.accounts, 2)
+            if operation == "deposit":
+                planned.append((operation, deposit_payload(credit, self.amount, self.currency), None, credit))
+            else:
+                planned.append((operation, transfer_payload(debit, credit, self.amount, self.currency), debit, credit))
+        return planned
+
+    def send(self, executor, operation, payload, debit, credit):
+        result = storm(self.client, operation, payload, self.copies, self.retries, self.timeout, self.use_keys, executor)
+        result.update(operation=operation, debit=debit, credit=credit, outcome=outcome(result))
+        with self.results_lock:
+            self.results.append(result)
+
+    def run(self, count):
+        initial = self.balances()
+        planned = self.plan(count)
+        self.results = []
+
+        started = time.perf_counter()
+        # Outer pool runs transactions concurrently; the inner one sends each transaction's copies at once
+        with ThreadPoolExecutor(max_workers=self.concurrency * self.copies) as copies_executor:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                for request in planned:
+                    executor.submit(self.send, copies_executor, *request)
+        elapsed = time.perf_counter() - started
+
+        return self.report(initial, self.balances(), elapsed)
+
+    def bounds(self, initial):
+        """(lowest, highest) plausible final balance per account given acknowledged and unknown outcomes."""
+        low, high = dict(initial), dict(initial)
+        for result in self.results:
+            if result["outcome"] == "rejected":
+                continue
+            applied = result["outcome"] == "applied"
+            if result["debit"] is not None:
+                low[result["debit"]] -= self.amount
+                if applied:
+                    high[result["debit"]] -= self.amount
+            if result["credit"] is not None:
+                high[result["credit"]] += self.amount
+                if applied:
+                    low[result["credit"]] += self.amount
+        return low, high
+
+    def report(self, initial, final, elapsed):
+        low, high = self.bounds(initial)
+        violations = []
+        for account_id, balance in final.items():
+            if balance > high[account_id] + TOLERANCE or balance < low[account_id] - TOLERANCE:
+                excess = balance - high[account_id] if balance > high[account_id] else balance - low[account_id]
+                violations.append({
+                    "account": account_id,
+                    "balance": round(balance, 2),
+                    "expected_min": round(low[account_id], 2),
+                    "expected_max": round(high[account_id], 2),
+                    # Each double-applied transaction moves the balance by one amount
+                    "extra_applications": round(abs(excess) / self.amount, 2),
+                })
+
+        attempts = Counter(str(outcome) for result in self.results for outcome in result["attempts"])
+        http_requests = sum(attempts.values())
+        outcomes = Counter(result["outcome"] for result in self.results)
+        return {
+            "transactions": len(self.results),
+            "copies": self.copies,
+            "retries": self.retries,
+            "idempotency_keys": self.use_keys,
+            "elapsed_s": round(elapsed, 3),
+            "transactions_per_second": round(len(self.results) / elapsed, 2) if elapsed else 0.0,
+            "http_requests": http_requests,
+            "http_requests_per_second": round(http_requests / elapsed, 2) if elapsed else 0.0,
+            "outcomes": dict(outcomes),
+            "attempts": dict(attempts),
+            "double_applied": violations,
+        }
+
+
+# ================================
+# Throughput cost of the dedup path
+# ================================
+
+def dedup_cost(client, account_id, count=500, concurrency=16, currency="USD"):
+    """
+    Sends `count` unique deposits without and then with idempotency keys (no duplicates, so
+    the server does the same work apart from key bookkeeping) and compares throughput.
+    """
+    def timed(use_keys):
+        payload = deposit_payload(account_id, 1, currency)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(client.post, ENDPOINTS["deposit"], payload,
+                                       headers=idempotency_headers(new_key() if use_keys else None))
+                       for _ in range(count)]
+            statuses = Counter(future.result().status_code for future in futures)
+        elapsed = time.perf_counter() - started
+        return {"requests_per_second": round(count / elapsed, 2), "statuses": {str(k): v for k, v in statuses.items()}}
+
+    without_keys = timed(False)
+    with_keys = timed(True)
+    baseline = without_keys["requests_per_second"]
+    return {
+        "requests": count,
+        "without_keys": without_keys,
+        "with_keys": with_keys,
+        "throughput_cost": round(1 - with_keys["requests_per_second"] / baseline, 4) if baseline else None,
+    }
@@ -0,0 +1,166 @@
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from features.utils.api_client import deposit_payload, withdraw_payload, transfer_payload
+
+ENDPOINTS = {
+    "deposit": "/transaction/deposit",
+    "withdraw": "/transaction/withdraw",
+    "transfer": "/transaction/transfer",
+}
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+def parse_mix(spec):
+    """Parses "deposit=5,withdraw=2,transfer=3" into normalised operation weights."""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown operation in mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class LoadStats:
+    """Thread-safe collector of per-operation latency samples and outcomes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {name: [] for name in ENDPOINTS}
+        self.statuses = {name: Counter() for name in ENDPOINTS}
+        self.errors = {name: 0 for name in ENDPOINTS}
+
+    def record(self, operation, latency, status):
+        """`status` is the HTTP status code, or the exception class name for transport errors."""
+        with self.lock:
+            self.latencies[operation].append(latency)
+            self.statuses[operation][str(status)] += 1
+            if not isinstance(status, int) or status >= 500:
+                self.errors[operation] += 1
+
+    @staticmethod
+    def histogram(latencies):
+        buckets = Counter()
+        for latency in latencies:
+            latency_ms = latency * 1000
+            bound = next((b for b in HISTOGRAM_BOUNDS_MS if latency_ms <= b), None)
+            buckets[f"<={bound}ms" if bound else f">{HISTOGRAM_BOUNDS_MS[-1]}ms"] += 1
+        return dict(buckets)
+
+    def summary(self, elapsed):
+        report = {"elapsed_s": round(elapsed, 3), "operations": {}}
+        total = 0
+        total_errors = 0
+        for operation, latencies in self.latencies.items():
+            if not latencies:
+                continue
+            ordered = sorted(latencies)
+            total += len(ordered)
+            total_errors += self.errors[operation]
+            report["operations"][operation] = {
+                "requests": len(ordered),
+                "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+                "error_rate": round(self.errors[operation] / len(ordered), 4),
+                "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+                "statuses": dict(self.statuses[operation]),
+                "histogram": self.histogram(ordered),
+            }
+        report["requests"] = total
+        report["throughput_rps"] = round(total / elapsed, 2) if elapsed else 0.0
+        report["error_rate"] = round(total_errors / total, 4) if total else 0.0
+        return report
+
+
+class LoadRunner:
+    """
+    Replays the deposit/withdraw/transfer step payloads against the API.
+
+    With `rps` set the runner is open-loop: requests are released on a fixed schedule
+    regardless of how fast earlier ones complete, and latency is measured from the
+    scheduled start so queueing delay is not hidden. Without `rps` it is closed-loop:
+    `concurrency` workers send back-to-back requests.
+    """
+
+    def __init__(self, client, accounts, mix, currency="USD", amount=1.0, rps=None, concurrency=10, seed=None):
+        self.client = client
+        self.accounts = list(accounts)
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.currency = currency
+        self.amount = amount
+        self.rps = rps
+        self.concurrency = concurrency
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats = LoadStats()
+
+    def next_request(self):
+        with self.random_lock:
+            operation = self.random.choices(self.operations, self.weights)[0]
+            debit, credit = self.random.sample(self.accounts, 2) if len(self.accounts) > 1 else (self.accounts[0],) * 2
+
+        if operation == "deposit":
+            payload = deposit_payload(credit, self.amount, self.currency)
+        elif operation == "withdraw":
+            payload = withdraw_payload(debit, self.amount, self.currency)
+        else:
+            payload = transfer_payload(debit, credit, self.amount, self.currency)
+        return operation, payload
+
+    def send(self, operation, payload, scheduled_at=None):
+        started = scheduled_at if scheduled_at is not None else time.perf_counter()
+        try:
+            status = self.client.post(ENDPOINTS[operation], payload).status_code
+        except Exception as e:
+            status = type(e).__name__
+        self.stats.record(operation, time.perf_counter() - started, status)
+
+    def run_open_loop(self, duration):
+        interval = 1.0 / self.rps
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            sent = 0
+            while True:
+                scheduled_at = start + sent * interval
+                if scheduled_at - start >= duration:
+                    break
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self.send, *self.next_request(), scheduled_at)
+                sent += 1
+        return time.perf_counter() - start
+
+    def run_closed_loop(self, duration):
+        start = time.perf_counter()
+        deadline = start + duration
+
+        def worker():
+            while time.perf_counter() < deadline:
+                self.send(*self.next_request())
+
+        threads = [threading.Thread(target=worker, name=f"load-{i}") for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+    def run(self, duration):
+        elapsed = self.run_open_loop(duration) if self.rps else self.run_closed_loop(duration)
+        return self.stats.summary(elapsed)
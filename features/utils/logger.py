@@ -1,10 +1,126 @@
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-logging.basicConfig(
-    filename="reports/test_log.log",  # Log file
-    filemode="w",
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    level=logging.INFO
-)
+# Scenario/step currently running in this process; set by the environment hooks
+log_context = {"scenario": None, "step": None}
 
-logger = logging.getLogger(__name__)
\ No newline at end of file
+
+def set_log_context(**fields):
+    log_context.update(fields)
+
+
+class ContextFilter(logging.Filter):
+    """Stamps each record with the worker, scenario and step it was logged from."""
+
+    def __init__(self, worker):
+        super().__init__()
+        self.worker = worker
+
+    def filter(self, record):
+        record.worker = self.worker
+        record.scenario = log_context["scenario"]
+        record.step = log_context["step"]
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line; long messages (e.g. response bodies) are truncated unless sampled."""
+
+    def __init__(self, max_message=2000, sample_rate=0.0):
+        super().__init__()
+        self.max_message = max_message
+        self.sample_rate = sample_rate
+
+    def format(self, record):
+        message = record.getMessage()
+        if self.max_message and len(message) > self.max_message and random.random() >= self.sample_rate:
+            message = f"{message[:self.max_message]}... [truncated {len(message) - self.max_message} chars]"
+
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "worker": getattr(record, "worker", None),
+            "scenario": getattr(record, "scenario", None),
+            "step": getattr(record, "step", None),
+            "message": message,
+        }
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler whose file-writing QueueListener is only created on the first record, so
+    importing this module never touches the filesystem. Callers never block on disk.
+    """
+
+    def __init__(self):
+        super().__init__(queue.SimpleQueue())
+        self.worker = os.getenv("TEST_WORKER_ID", "main")
+        self.addFilter(ContextFilter(self.worker))
+        self.listener = None
+        self._start_lock = threading.Lock()
+
+    def start_listener(self):
+        log_dir = os.getenv("LOG_DIR", "reports")
+        suffix = "" if self.worker == "main" else f"-{self.worker}"
+        path = os.path.join(log_dir, f"test_log{suffix}.log")
+        os.makedirs(log_dir, exist_ok=True)
+
+        file_handler = RotatingFileHandler(
+            path,
+            maxBytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            backupCount=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+            encoding="utf-8",
+            delay=True
+        )
+        # Start every run with a fresh file; the previous run is kept as the first backup
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            file_handler.doRollover()
+        file_handler.setFormatter(JsonLinesFormatter(
+            max_message=int(os.getenv("LOG_MAX_MESSAGE", "2000")),
+            sample_rate=float(os.getenv("LOG_BODY_SAMPLE_RATE", "0"))
+        ))
+
+        self.listener = QueueListener(self.queue, file_handler, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.stop_listener)
+
+    def stop_listener(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def prepare(self, record):
+        # Freeze the message and traceback now; formatting to JSON happens on the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        if self.listener is None:
+            with self._start_lock:
+                if self.listener is None:
+                    self.start_listener()
+        super().emit(record)
+
+
+_handler = LazyQueueHandler()
+_root = logging.getLogger()
+_root.addHandler(_handler)
+_root.setLevel(logging.INFO)
+
+logger = logging.getLogger(__name__)
@@ -0,0 +1,129 @@
+import os
+import re
+import shutil
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlsplit
+
+# The recorded page is the rendered DOM, so its scripts must not run (and re-render) again on replay
+SCRIPT_TAG = re.compile(r"<script\b.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+HEAD_END = re.compile(r"</head\s*>", re.IGNORECASE)
+
+# The rules of every linked stylesheet the browser could read, from the CSSOM (no second download).
+# Cross-origin sheets without CORS headers cannot be read and come back as null.
+STYLESHEETS_SCRIPT = """
+return Array.from(document.styleSheets).filter(sheet => sheet.href).map(sheet => {
+    try { return [sheet.href, Array.from(sheet.cssRules).map(rule => rule.cssText).join("\\n")]; }
+    catch (e) { return [sheet.href, null]; }
+});
+"""
+
+
+def page_stylesheets(driver):
+    """[(href, css)] of the page's linked stylesheets; css is None for sheets the browser would not expose."""
+    try:
+        return [(href, css) for href, css in driver.execute_script(STYLESHEETS_SCRIPT) or []]
+    except Exception:
+        return []
+
+
+def _style_tag(href, css):
+    # "<\/style" is the same text to CSS but cannot close the element early
+    return f'<style data-snapshot-href="{escape(href)}">\n' + css.replace("</style", "<\\/style") + "\n</style>\n"
+
+
+class SnapshotStore:
+    """
+    Rendered HTML of the pages a UI run visited, one file per path + query.
+
+    Links to `origin` are rewritten to relative ones when a page is saved, so navigating
+    from a replayed page stays on the local snapshot server. The first page saved also
+    becomes "/" when the site redirected its root (e.g. to a language prefix).
+
+    Stylesheets passed to save() are inlined at the end of <head>, so replayed pages keep
+    their layout and visibility rules; their <link> tags are left in place and 404 locally.
+    """
+
+    def __init__(self, directory, origin):
+        self.directory = directory
+        self.origin = origin.rstrip("/")
+
+    @staticmethod
+    def key(url):
+        parts = urlsplit(url)
+        return (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    def path_for(self, key):
+        return os.path.join(self.directory, quote(key, safe="") + ".html")
+
+    def save(self, url, html, stylesheets=()):
+        if not url.startswith(("http://", "https://")):
+            return None  # about:blank, data: URLs
+        html = SCRIPT_TAG.sub("", html)
+        inlined = "".join(_style_tag(href, css) for href, css in stylesheets if css is not None)
+        if inlined:
+            html, found = HEAD_END.subn(lambda match: inlined + match.group(0), html, count=1)
+            if not found:
+                html = inlined + html
+        html = html.replace(self.origin + "/", "/").replace(f'"{self.origin}"', '"/"')
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(self.key(url))
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(html)
+        os.replace(temporary, path)
+        root = self.path_for("/")
+        if not os.path.exists(root):
+            shutil.copyfile(path, root)
+        return path
+
+    def load(self, key):
+        try:
+            with open(self.path_for(key), "rb") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+
+class SnapshotRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are separate writes; don't wait for the delayed ACK
+
+    def do_GET(self):
+        body = self.server.store.load(self.path)
+        # Anything that was not recorded (stylesheets, images, scripts) is a fast 404, never a network call
+        status = 200 if body is not None else 404
+        body = body or b""
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep UI runs quiet
+
+
+class SnapshotServer:
+    """Serves a SnapshotStore over HTTP on a background thread so the UI suite runs offline."""
+
+    def __init__(self, store, host="127.0.0.1", port=0):
+        self.httpd = ThreadingHTTPServer((host, port), SnapshotRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.store = store
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="snapshot-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,61 @@
+from features.utils.waits import wait_for
+
+PRODUCT_CLASS = "shop_productlistdynamiccolumns"
+
+# One round-trip for the whole listing: textContent of every product's title and teaser
+SNAPSHOT_SCRIPT = """
+return Array.from(document.getElementsByClassName(arguments[0])).map(function (product) {
+    var title = product.getElementsByClassName('name')[0];
+    var teaser = product.getElementsByClassName('teaser')[0];
+    return {
+        title: title ? (title.innerText || title.textContent).trim() : null,
+        description: teaser ? (teaser.innerText || teaser.textContent).trim() : null
+    };
+});
+"""
+
+
+class ProductListing:
+    """
+    Page object for a product category listing.
+
+    `products()` waits for the listing and reads every product's title and description with
+    a single execute_script call instead of two find_element calls per product. The result
+    is cached until the page URL changes, so the count and detail checks of a scenario
+    share one snapshot.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._url = None
+        self._products = None
+
+    def products(self, refresh=False):
+        url = self.driver.current_url
+        if refresh or self._products is None or url != self._url:
+            # Polls the same script until at least one product is rendered, so the wait is the read
+            self._products = wait_for(
+                self.driver, lambda driver: driver.execute_script(SNAPSHOT_SCRIPT, PRODUCT_CLASS) or False, "Product list"
+            )
+            self._url = url
+        return self._products
+
+    def count(self):
+        return len(self.products())
+
+    def incomplete(self):
+        """(position, product) for every product without a title or a description."""
+        return [(index, product) for index, product in enumerate(self.products(), start=1)
+                if not product["title"] or not product["description"]]
+
+    def summary(self):
+        """One line per product, for a single aggregated attachment."""
+        return "\n".join(f"{index}. Title: {product['title']}, Description: {product['description']}"
+                         for index, product in enumerate(self.products(), start=1))
+
+
+def product_listing(context):
+    """The scenario's ProductListing; behave drops it with the rest of the scenario's context."""
+    if getattr(context, "product_listing", None) is None or context.product_listing.driver is not context.driver:
+        context.product_listing = ProductListing(context.driver)
+    return context.product_listing
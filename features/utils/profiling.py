@@ -0,0 +1,195 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+# Upper bounds (ms) of the per-endpoint latency histogram; the last bucket takes everything slower
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+# Requests to /account/123 and /account/456 are one endpoint
+ID_SEGMENT = re.compile(r"/(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27})(?=/|$)")
+
+
+def endpoint(method, path):
+    return f"{method.upper()} {ID_SEGMENT.sub('/{id}', path.split('?', 1)[0])}"
+
+
+class Profiler:
+    """
+    Collects wall times for scenarios, steps, fixtures and HTTP requests during one behave run.
+
+    The environment hooks drive it (start_*/end_*); the API client reports requests through
+    record_request. write() produces the machine-readable timings file and summary() the
+    "top N slowest" view.
+
+    Requests are aggregated per endpoint (count, times, status codes, latency histogram) and
+    only a uniform sample of `request_sample` raw records is kept, so a dataset scenario
+    sending thousands of requests does not grow memory or the timings file.
+    """
+
+    def __init__(self, worker_id="main", request_sample=200):
+        self.worker_id = worker_id
+        self.scenarios = []
+        self.steps = []
+        self.fixtures = []
+        self.endpoints = {}
+        self.request_count = 0
+        self.request_sample = request_sample
+        self.requests = []  # reservoir sample of raw request records
+        self._requests_lock = threading.Lock()
+        self._random = random.Random(0)
+        self.current_scenario = None
+        self.current_step = None
+        self._scenario_started = None
+        self._step_started = None
+        self._main_thread = threading.main_thread()
+
+    # ================================
+    # Hook entry points
+    # ================================
+
+    def start_scenario(self, scenario):
+        self.current_scenario = scenario.name
+        self._scenario_started = time.perf_counter()
+
+    def end_scenario(self, scenario):
+        self.scenarios.append({
+            "name": scenario.name,
+            "feature": scenario.feature.name,
+            "location": str(scenario.location),
+            "status": str(getattr(scenario.status, "name", scenario.status)),
+            "seconds": time.perf_counter() - self._scenario_started,
+        })
+        self.current_scenario = None
+
+    def start_step(self, step):
+        self.current_step = f"{step.keyword} {step.name}"
+        self._step_started = time.perf_counter()
+
+    def end_step(self, step):
+        self.steps.append({
+            "scenario": self.current_scenario,
+            "step": self.current_step,
+            "location": str(step.location),
+            "status": str(getattr(step.status, "name", step.status)),
+            "seconds": time.perf_counter() - self._step_started,
+        })
+        self.current_step = None
+
+    @contextmanager
+    def fixture(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fixtures.append({"name": name, "scenario": self.current_scenario, "seconds": time.perf_counter() - started})
+
+    def record_request(self, record):
+        # Requests from background threads (e.g. account pool refills) are not charged to the current step
+        on_main = threading.current_thread() is self._main_thread
+        sampled = dict(
+            record,
+            scenario=self.current_scenario if on_main else None,
+            step=self.current_step if on_main else None,
+            thread=threading.current_thread().name,
+        )
+        milliseconds = record["total_s"] * 1000
+        bucket = next(index for index, bound in enumerate(LATENCY_BUCKETS_MS) if milliseconds <= bound)
+        key = endpoint(record["method"], record["path"])
+        with self._requests_lock:
+            entry = self.endpoints.get(key)
+            if entry is None:
+                entry = self.endpoints[key] = {
+                    "count": 0, "total_seconds": 0.0, "connect_seconds": 0.0, "server_seconds": 0.0,
+                    "max_seconds": 0.0, "statuses": {}, "histogram": [0] * len(LATENCY_BUCKETS_MS),
+                }
+            entry["count"] += 1
+            entry["total_seconds"] += record["total_s"]
+            entry["connect_seconds"] += record["connect_s"]
+            entry["server_seconds"] += record["server_s"]
+            entry["max_seconds"] = max(entry["max_seconds"], record["total_s"])
+            status = str(record["status"])
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            entry["histogram"][bucket] += 1
+
+            # Reservoir sampling: every request so far had the same chance to be kept
+            self.request_count += 1
+            if len(self.requests) < self.request_sample:
+                self.requests.append(sampled)
+            else:
+                slot = self._random.randrange(self.request_count)
+                if slot < self.request_sample:
+                    self.requests[slot] = sampled
+
+    # ================================
+    # Reporting
+    # ================================
+
+    def slowest_steps(self, top_n):
+        """Step texts ranked by total time across the run."""
+        totals = defaultdict(lambda: {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+        for step in self.steps:
+            entry = totals[step["step"]]
+            entry["count"] += 1
+            entry["seconds"] += step["seconds"]
+            entry["max_seconds"] = max(entry["max_seconds"], step["seconds"])
+        ranked = sorted(totals.items(), key=lambda item: item[1]["seconds"], reverse=True)
+        return [dict(entry, step=text) for text, entry in ranked[:top_n]]
+
+    def summary(self, top_n=10):
+        endpoints = list(self.endpoints.values())
+        return {
+            "worker": self.worker_id,
+            "scenario_seconds": sum(scenario["seconds"] for scenario in self.scenarios),
+            "fixture_seconds": sum(fixture["seconds"] for fixture in self.fixtures),
+            "http": {
+                "requests": self.request_count,
+                "total_seconds": sum(entry["total_seconds"] for entry in endpoints),
+                "connect_seconds": sum(entry["connect_seconds"] for entry in endpoints),
+                "server_seconds": sum(entry["server_seconds"] for entry in endpoints),
+            },
+            "slowest_scenarios": sorted(self.scenarios, key=lambda scenario: scenario["seconds"], reverse=True)[:top_n],
+            "slowest_steps": self.slowest_steps(top_n),
+        }
+
+    def write(self, directory, top_n=10):
+        """Writes <directory>/<worker>.json with the raw records, per-endpoint request stats and the summary; returns the path."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.worker_id}.json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({
+                "summary": self.summary(top_n),
+                "scenarios": self.scenarios,
+                "steps": self.steps,
+                "fixtures": self.fixtures,
+                "endpoints": self.endpoints,
+                "latency_buckets_ms": [str(bound) for bound in LATENCY_BUCKETS_MS],
+                "requests": self.requests,
+            }, handle, indent=2)
+        return path
+
+    def format_summary(self, top_n=10):
+        summary = self.summary(top_n)
+        http = summary["http"]
+        lines = [
+            f" Timing summary ({summary['worker']}): {len(self.scenarios)} scenarios in {summary['scenario_seconds']:.2f}s, "
+            f"fixtures {summary['fixture_seconds']:.2f}s, {http['requests']} HTTP requests in {http['total_seconds']:.2f}s "
+            f"(connect {http['connect_seconds']:.2f}s, server {http['server_seconds']:.2f}s)",
+            f" Top {top_n} slowest scenarios:",
+        ]
+        lines += [f"   {scenario['seconds']:8.3f}s  {scenario['name']}" for scenario in summary["slowest_scenarios"]]
+        lines.append(f" Top {top_n} slowest steps (total / count / max):")
+        lines += [
+            f"   {step['seconds']:8.3f}s  x{step['count']:<3} max {step['max_seconds']:.3f}s  {step['step']}"
+            for step in summary["slowest_steps"]
+        ]
+        return "\n".join(lines)
+
+
+def timed_fixture(context, name):
+    """Times a fixture with the run's profiler, or does nothing when profiling is disabled."""
+    profiler = getattr(context, "profiler", None)
+    return profiler.fixture(name) if profiler is not None else nullcontext()
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PID_FILE = os.path.join("reports", "allure_generate.pid")
+FINGERPRINT_FILE = ".results-fingerprint"
+
+
+def is_ci():
+    """True when reports must not be served (CI=true, or ALLURE_SERVE=false)."""
+    return os.getenv("CI", "").lower() in ("1", "true") or os.getenv("ALLURE_SERVE", "true").lower() == "false"
+
+
+def results_fingerprint(results_dir):
+    """Hash of every result file's name, size and mtime; unchanged results mean an unchanged report."""
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(results_dir):
+        # history/ is copied in from the previous report, it is not a result of this run
+        dirs[:] = sorted(name for name in dirs if not (root == results_dir and name == "history"))
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            digest.update(f"{os.path.relpath(path, results_dir)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return handle.read().strip()
+
+
+def _link_or_copy(source, destination):
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def snapshot_results(results_dir):
+    """
+    Hard-links (or copies) the current results into a new directory under reports/ and returns it.
+
+    allure writes every result and attachment as a new file, so the snapshot is unaffected by a suite
+    that keeps writing into `results_dir` while the report is generated from it.
+    """
+    os.makedirs(os.path.dirname(PID_FILE), exist_ok=True)
+    snapshot = tempfile.mkdtemp(prefix=".allure-snapshot-", dir=os.path.dirname(PID_FILE))
+
+    def top_level_history(root, names):
+        # history/ is replaced from the previous report, and a linked copy would be overwritten in place
+        return ["history"] if os.path.samefile(root, results_dir) else []
+
+    if os.path.isdir(results_dir):
+        shutil.copytree(results_dir, snapshot, ignore=top_level_history, copy_function=_link_or_copy, dirs_exist_ok=True)
+    return snapshot
+
+
+def carry_history(results_dir, report_dir):
+    """Copies the previous report's history into the results so trends survive regeneration."""
+    history = os.path.join(report_dir, "history")
+    if os.path.isdir(history):
+        shutil.copytree(history, os.path.join(results_dir, "history"), dirs_exist_ok=True)
+
+
+def wait_for_background_generation(timeout=600):
+    """Blocks until a report generation started with background=True has finished (it removes the PID file)."""
+    deadline = time.time() + timeout
+    while os.path.exists(PID_FILE) and time.time() < deadline:
+        time.sleep(0.5)
+    if os.path.exists(PID_FILE):
+        print(" Background report generation did not finish in time; continuing.")
+        os.remove(PID_FILE)
+
+
+def _generate(snapshot, report_dir):
+    """Builds the report from a snapshot made by snapshot_results(), then removes the snapshot."""
+    try:
+        fingerprint = results_fingerprint(snapshot)
+        carry_history(snapshot, report_dir)
+        exit_code = subprocess.call(f'allure generate "{snapshot}" --clean -o "{report_dir}"', shell=True)
+        if exit_code == 0:
+            with open(os.path.join(report_dir, FINGERPRINT_FILE), "w", encoding="utf-8") as handle:
+                handle.write(fingerprint)
+        return exit_code
+    finally:
+        shutil.rmtree(snapshot, ignore_errors=True)
+
+
+def generate_report(results_dir="allure-results", report_dir="allure-report", background=False):
+    """
+    Runs `allure generate` only when the results changed since the last report.
+
+    The report is always rebuilt in full, from a snapshot of `results_dir` taken before this
+    returns, so neither the results a later suite writes nor the carried-over history end up
+    in the directory being read. With background=True the generator runs in a separate
+    process and the caller returns immediately; reports/allure_generate.pid exists until it
+    finishes, so the next suite can keep running and only waits before generating its own report.
+    Returns the Popen for background runs, otherwise None.
+    """
+    wait_for_background_generation()
+
+    if results_fingerprint(results_dir) == _read(os.path.join(report_dir, FINGERPRINT_FILE)):
+        print(" Allure results unchanged since the last report; skipping generation.")
+        return None
+
+    snapshot = snapshot_results(results_dir)
+    if background:
+        # Written before the child starts so it can never remove the file before it exists
+        with open(PID_FILE, "w", encoding="utf-8") as handle:
+            handle.write(str(os.getpid()))
+        process = subprocess.Popen([sys.executable, "-m", "features.utils.reporting", snapshot, report_dir])
+        print(f" Generating Allure HTML Report in the background (pid {process.pid})...")
+        return process
+
+    print("Generating Allure HTML Report...")
+    _generate(snapshot, report_dir)
+    return None
+
+
+def serve_report(results_dir="allure-results"):
+    """Serves the report in a browser unless running in CI mode."""
+    if is_ci():
+        print(" CI mode: not serving the Allure report.")
+        return
+    print("\n Serving Allure Report...\n")
+    subprocess.call(f'allure serve "{results_dir}"', shell=True)
+
+
+if __name__ == "__main__":
+    # Background generation entry point used by generate_report(background=True)
+    try:
+        sys.exit(_generate(sys.argv[1], sys.argv[2]))
+    finally:
+        if os.path.exists(PID_FILE):
+            os.remove(PID_FILE)
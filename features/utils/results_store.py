@@ -0,0 +1,163 @@
+import os
+import time
+
+RESULTS_DB = os.getenv("RESULTS_DB", os.path.join("reports", "results.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenario_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scenario TEXT NOT NULL,
+    feature_file TEXT,
+    status TEXT NOT NULL,
+    duration REAL NOT NULL,
+    worker TEXT,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_scenario ON scenario_results (scenario, finished_at);
+CREATE TABLE IF NOT EXISTS scenario_steps (
+    scenario TEXT NOT NULL,
+    step_def TEXT NOT NULL,
+    PRIMARY KEY (scenario, step_def)
+);
+"""
+
+
+def runner_step_registry(context):
+    """
+    The step registry the running behave loaded its step definitions into.
+
+    Newer behave versions keep it on the runner and leave the module-level registry empty.
+    """
+    registry = getattr(getattr(context, "_runner", None), "step_registry", None)
+    if registry is None:
+        from behave.step_registry import registry
+    return registry
+
+
+def step_definition_id(step, registry):
+    """
+    Identifies the step definition that handles `step` as "<file>::<pattern>".
+
+    The pattern is used instead of a line number so the id survives unrelated edits.
+    """
+    match = registry.find_match(step)
+    if match is None:
+        return None
+    for matcher in registry.steps.get(step.step_type, []):
+        if matcher.func is match.func:
+            return f"{os.path.relpath(match.location.filename)}::{matcher.pattern}"
+    return None
+
+
+class ResultsStore:
+    """SQLite history of scenario outcomes, durations and the step definitions each scenario hit."""
+
+    def __init__(self, path=RESULTS_DB):
+        import sqlite3
+
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Parallel workers write to the same file; wait for their locks instead of failing
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.executescript(SCHEMA)
+
+    def record(self, results, worker="main"):
+        """Stores [{"scenario", "feature_file", "status", "duration", "step_defs"}] in one transaction."""
+        now = time.time()
+        with self.connection:
+            for result in results:
+                self.connection.execute(
+                    "INSERT INTO scenario_results (scenario, feature_file, status, duration, worker, finished_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (result["scenario"], result["feature_file"], result["status"], result["duration"], worker, now)
+                )
+                # A passing run saw every step, so it replaces the mapping; a failing run only adds to it
+                if result["status"] == "passed":
+                    self.connection.execute("DELETE FROM scenario_steps WHERE scenario = ?", (result["scenario"],))
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO scenario_steps (scenario, step_def) VALUES (?, ?)",
+                    [(result["scenario"], step_def) for step_def in result["step_defs"]]
+                )
+
+    def last_results(self):
+        """{scenario: (status, duration)} from each scenario's most recent run."""
+        rows = self.connection.execute(
+            "SELECT scenario, status, duration FROM scenario_results r "
+            "WHERE finished_at = (SELECT MAX(finished_at) FROM scenario_results WHERE scenario = r.scenario)"
+        )
+        return {scenario: (status, duration) for scenario, status, duration in rows}
+
+    def failed_scenarios(self):
+        return {scenario for scenario, (status, _) in self.last_results().items() if status != "passed"}
+
+    def scenarios_using(self, step_defs):
+        if not step_defs:
+            return set()
+        placeholders = ",".join("?" for _ in step_defs)
+        rows = self.connection.execute(
+            f"SELECT DISTINCT scenario FROM scenario_steps WHERE step_def IN ({placeholders})", list(step_defs)
+        )
+        return {scenario for (scenario,) in rows}
+
+    def scenarios_using_modules(self, modules):
+        """Scenarios that ran any step defined in one of the `modules` (steps file paths)."""
+        scenarios = set()
+        for module in modules:
+            rows = self.connection.execute(
+                "SELECT DISTINCT scenario FROM scenario_steps WHERE substr(step_def, 1, ?) = ?",
+                (len(module) + 2, f"{module}::")
+            )
+            scenarios.update(scenario for (scenario,) in rows)
+        return scenarios
+
+    def close(self):
+        self.connection.close()
+
+
+class ScenarioRecorder:
+    """Collects results from the behave hooks and writes them to the ResultsStore once, in after_all."""
+
+    def __init__(self, step_registry):
+        self.step_registry = step_registry
+        self.results = []
+        self.current = None
+
+    def start_scenario(self, scenario):
+        from features.utils.scheduler import base_scenario_name
+
+        self.current = {
+            # Outline rows are stored under the outline's name, which is what -n filters select on
+            "scenario": base_scenario_name(scenario.name),
+            "feature_file": os.path.relpath(scenario.filename),
+            "step_defs": set(),
+            "started": time.perf_counter(),
+        }
+
+    def record_step(self, step):
+        step_def = step_definition_id(step, self.step_registry)
+        if self.current is not None and step_def:
+            self.current["step_defs"].add(step_def)
+
+    def end_scenario(self, scenario):
+        if self.current is None:
+            return
+        self.current["status"] = str(getattr(scenario.status, "name", scenario.status))
+        self.current["duration"] = time.perf_counter() - self.current.pop("started")
+        # Rows of one outline become a single result: any failing row fails it, durations add up
+        previous = next((result for result in self.results if result["scenario"] == self.current["scenario"]), None)
+        if previous is None:
+            self.results.append(self.current)
+        else:
+            if previous["status"] == "passed":
+                previous["status"] = self.current["status"]
+            previous["duration"] += self.current["duration"]
+            previous["step_defs"] |= self.current["step_defs"]
+        self.current = None
+
+    def flush(self, worker="main", path=RESULTS_DB):
+        store = ResultsStore(path)
+        try:
+            store.record(self.results, worker)
+        finally:
+            store.close()
+        self.results = []
@@ -0,0 +1,188 @@
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DURATIONS_FILE = os.path.join("reports", "durations.json")
+TIMINGS_DIR = os.getenv("TIMINGS_DIR", os.path.join("reports", "timings"))
+DEFAULT_DURATION = 1.0
+FORMATTER = "allure_behave.formatter:AllureFormatter"
+
+# ================================
+# Scenario discovery & duration history
+# ================================
+
+SCENARIO_RE = re.compile(r"^\s*Scenario(?: Outline)?:\s*(?P<name>.+?)\s*$")
+# behave names each Scenario Outline row "<outline name> -- @1.1 <examples name>"
+OUTLINE_ROW_SUFFIX = re.compile(r" -- @.*$")
+
+
+def base_scenario_name(name):
+    """The name as declared in the feature file, for both plain scenarios and outline rows."""
+    return OUTLINE_ROW_SUFFIX.sub("", name)
+
+
+def discover_scenarios(paths, name_filter=None):
+    """Returns the scenario names declared in the given feature directories/files, in file order."""
+    scenarios = []
+    for path in paths:
+        files = [path] if path.endswith(".feature") else sorted(glob.glob(os.path.join(path, "**", "*.feature"), recursive=True))
+        for feature_file in files:
+            with open(feature_file, encoding="utf-8") as handle:
+                for line in handle:
+                    match = SCENARIO_RE.match(line)
+                    if match and match.group("name") not in scenarios:
+                        scenarios.append(match.group("name"))
+    if name_filter:
+        scenarios = [name for name in scenarios if re.search(name_filter, name)]
+    return scenarios
+
+
+def load_durations(path=DURATIONS_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_durations(durations, path=DURATIONS_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(durations, handle, indent=2, sort_keys=True)
+
+
+def durations_from_timings(paths):
+    """Reads scenario wall times from profiler timings files (see features/utils/profiling.py)."""
+    durations = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            for scenario in json.load(handle).get("scenarios", []):
+                name = base_scenario_name(scenario["name"])
+                # An outline costs the sum of its rows
+                durations[name] = durations.get(name, 0.0) + scenario["seconds"]
+    return durations
+
+
+def durations_from_allure(results_dir):
+    """Reads scenario wall times (seconds) from allure *-result.json files."""
+    durations = {}
+    for result_file in glob.glob(os.path.join(results_dir, "*-result.json")):
+        with open(result_file, encoding="utf-8") as handle:
+            result = json.load(handle)
+        if "start" in result and "stop" in result:
+            name = base_scenario_name(result["name"])
+            durations[name] = durations.get(name, 0.0) + (result["stop"] - result["start"]) / 1000.0
+    return durations
+
+
+def executed_scenarios(results_dir):
+    """Declared names of the scenarios that produced an allure result in `results_dir`."""
+    executed = set()
+    for result_file in glob.glob(os.path.join(results_dir, "*-result.json")):
+        with open(result_file, encoding="utf-8") as handle:
+            executed.add(base_scenario_name(json.load(handle)["name"]))
+    return executed
+
+
+def missing_scenarios(results_dir, scenarios):
+    """Assigned scenarios that behave did not run (e.g. a -n filter that matched nothing)."""
+    executed = executed_scenarios(results_dir)
+    return [name for name in scenarios if name not in executed]
+
+
+# ================================
+# Scheduling
+# ================================
+
+def assign_shards(scenarios, workers, durations):
+    """Longest-processing-time-first: each scenario goes to the currently lightest shard."""
+    shards = [{"scenarios": [], "load": 0.0} for _ in range(max(1, workers))]
+    ordered = sorted(scenarios, key=lambda name: durations.get(name, DEFAULT_DURATION), reverse=True)
+    for name in ordered:
+        lightest = min(shards, key=lambda shard: shard["load"])
+        lightest["scenarios"].append(name)
+        lightest["load"] += durations.get(name, DEFAULT_DURATION)
+    return [shard for shard in shards if shard["scenarios"]]
+
+
+def behave_command(paths, scenarios, output_dir):
+    """Builds the behave argv for one shard; every scenario is matched by its exact name (and all its outline rows)."""
+    command = [sys.executable, "-m", "behave", *paths]
+    for name in scenarios:
+        command += ["-n", f"^{re.escape(name)}( -- @.*)?$"]
+    command += ["-f", FORMATTER, "-o", output_dir]
+    return command
+
+
+def run_shard(index, paths, scenarios, results_dir):
+    output_dir = os.path.join(results_dir, f"worker-{index}")
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Each worker is its own behave process, so it gets its own context, client and account pool
+    env = dict(os.environ, TEST_WORKER_ID=f"worker-{index}")
+    started = time.time()
+    exit_code = subprocess.call(behave_command(paths, scenarios, output_dir), env=env)
+    print(f" Worker {index} finished {len(scenarios)} scenario(s) in {time.time() - started:.1f}s (exit code {exit_code})")
+
+    # A shard that silently ran fewer scenarios than assigned must not pass
+    missing = missing_scenarios(output_dir, scenarios)
+    if missing:
+        print(f" Worker {index} did not run {len(missing)} of its {len(scenarios)} scenario(s): {missing}")
+        exit_code = exit_code or 1
+    return exit_code
+
+
+def merge_results(results_dir, worker_count):
+    """Moves every worker's allure files into the shared results directory."""
+    for index in range(worker_count):
+        worker_dir = os.path.join(results_dir, f"worker-{index}")
+        if not os.path.isdir(worker_dir):
+            continue
+        for name in os.listdir(worker_dir):
+            shutil.move(os.path.join(worker_dir, name), os.path.join(results_dir, name))
+        os.rmdir(worker_dir)
+
+
+def run_parallel(paths, workers, results_dir="allure-results", name_filter=None, scenarios=None):
+    """
+    Runs the scenarios under `paths` across `workers` behave processes and returns one exit code.
+
+    `scenarios` restricts the run to an explicit list of scenario names.
+    """
+    if scenarios is None:
+        scenarios = discover_scenarios(paths, name_filter)
+    if not scenarios:
+        print(" No scenarios matched.")
+        return 0
+
+    durations = load_durations()
+    shards = assign_shards(scenarios, workers, durations)
+    for index, shard in enumerate(shards):
+        print(f" Worker {index}: {len(shard['scenarios'])} scenario(s), ~{shard['load']:.1f}s expected")
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(run_shard, index, paths, shard["scenarios"], results_dir)
+            for index, shard in enumerate(shards)
+        ]
+        exit_codes = [future.result() for future in futures]
+
+    # Refresh the duration history from this run before the worker files are merged away
+    for index in range(len(shards)):
+        durations.update(durations_from_allure(os.path.join(results_dir, f"worker-{index}")))
+        timings = [
+            path for path in glob.glob(os.path.join(TIMINGS_DIR, "*", f"worker-{index}.json"))
+            if os.path.getmtime(path) >= started
+        ]
+        durations.update(durations_from_timings(timings))
+    save_durations(durations)
+    merge_results(results_dir, len(shards))
+
+    return next((code for code in exit_codes if code != 0), 0)
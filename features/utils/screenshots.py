@@ -0,0 +1,133 @@
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+from features.utils import attachments, config
+from features.utils.logger import logger
+
+POLICIES = ("off", "on-failure", "on-step-end", "always")
+
+_executor = None
+_captured = []  # (name, future) taken during the current step
+_encoding = []  # (name, future, step failed) of the whole scenario, attached in after_scenario
+_fingerprints = []  # frames already attached in the current scenario
+
+
+def _encoder():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="screenshots")
+    return _executor
+
+
+# ================================
+# Encoding and perceptual hashing (off the main thread)
+# ================================
+
+def difference_hash(image):
+    """64-bit dHash: which of two horizontally adjacent pixels is brighter in a 9x8 grayscale thumbnail."""
+    from PIL import Image
+
+    pixels = list(image.convert("L").resize((9, 8), Image.BILINEAR).getdata())
+    bits = 0
+    for row in range(8):
+        for column in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + column] > pixels[row * 9 + column + 1])
+    return bits
+
+
+def encode(png):
+    """
+    Returns (body, attachment_type, fingerprint, perceptual) for a raw PNG screenshot: downscaled
+    to SCREENSHOT_MAX_WIDTH and re-encoded as JPEG. Without Pillow the PNG is kept as is and
+    only byte-identical frames are deduplicated.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return png, attachments.attachment_type.PNG, hashlib.sha1(png).hexdigest(), False
+
+    image = Image.open(io.BytesIO(png)).convert("RGB")
+    fingerprint = difference_hash(image)
+    if image.width > config.SCREENSHOT_MAX_WIDTH:
+        height = round(image.height * config.SCREENSHOT_MAX_WIDTH / image.width)
+        image = image.resize((config.SCREENSHOT_MAX_WIDTH, height), Image.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=config.SCREENSHOT_QUALITY, optimize=True)
+    return output.getvalue(), attachments.attachment_type.JPG, fingerprint, True
+
+
+def _duplicate(fingerprint, perceptual):
+    for seen, seen_perceptual in _fingerprints:
+        if perceptual and seen_perceptual:
+            if bin(fingerprint ^ seen).count("1") <= config.SCREENSHOT_DEDUP_DISTANCE:
+                return True
+        elif fingerprint == seen:
+            return True
+    return False
+
+
+# ================================
+# Step-facing API
+# ================================
+
+def capture(driver, name):
+    """
+    Takes a screenshot from inside a step when SCREENSHOT_POLICY is "always". Encoding runs on
+    a background thread; the result is attached when the scenario ends. With the other policies
+    this is a no-op, so passing steps never block the browser for a screenshot.
+    """
+    if config.SCREENSHOT_POLICY != "always" or driver is None:
+        return
+    _take(driver, name)
+
+
+def _take(driver, name):
+    try:
+        png = driver.get_screenshot_as_png()
+    except Exception as e:
+        logger.warning(f"Could not take screenshot '{name}': {e}")
+        return
+    _captured.append((name, _encoder().submit(encode, png)))
+
+
+def after_step(step, driver):
+    """
+    Adds the step-end or failure frame the policy asks for and hands this step's screenshots
+    to after_scenario; the step never waits for them to be encoded.
+    """
+    policy = config.SCREENSHOT_POLICY
+    failed = step.status == "failed"
+    if driver is not None and (policy == "on-step-end" or (policy in ("on-failure", "always") and failed)):
+        _take(driver, f"{'Failure' if failed else 'Step end'}: {step.name}")
+
+    _encoding.extend((name, future, failed) for name, future in _captured)
+    del _captured[:]
+
+
+def after_scenario():
+    """
+    Attaches the scenario's encoded screenshots in the order they were taken, skipping frames
+    that look the same as one already attached. ATTACHMENT_LEVEL applies per originating step.
+    """
+    encoding = _encoding[:]
+    del _encoding[:]
+    del _captured[:]
+    for name, future, failed in encoding:
+        try:
+            body, attachment_type, fingerprint, perceptual = future.result()
+        except Exception as e:
+            logger.warning(f"Could not encode screenshot '{name}': {e}")
+            continue
+        if _duplicate(fingerprint, perceptual):
+            logger.info(f"Screenshot '{name}' matches an earlier frame; not attached")
+            continue
+        _fingerprints.append((fingerprint, perceptual))
+        attachments.attach(body, name=name, attachment_type=attachment_type, failed=failed)
+    del _fingerprints[:]
+
+
+def close():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,156 @@
+import ast
+import glob
+import os
+import re
+import subprocess
+
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(?P<start>\d+)(?:,(?P<count>\d+))? @@")
+STEP_DECORATORS = {"given", "when", "then", "step"}
+
+
+def changed_files(rev, paths):
+    """Files under `paths` that differ between `rev` and the working tree (including untracked ones)."""
+    output = subprocess.run(
+        ["git", "diff", "--name-only", rev, "--", *paths], capture_output=True, text=True, check=True
+    ).stdout.split()
+    untracked = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard", "--", *paths], capture_output=True, text=True, check=True
+    ).stdout.split()
+    return sorted(set(output) | set(untracked))
+
+
+def changed_lines(rev, path):
+    """Working-tree line numbers touched since `rev`; a pure deletion marks the line it happened at."""
+    diff = subprocess.run(
+        ["git", "diff", "-U0", rev, "--", path], capture_output=True, text=True, check=True
+    ).stdout
+    if not diff:
+        # Untracked file: every line is new
+        with open(path, encoding="utf-8") as handle:
+            return set(range(1, sum(1 for _ in handle) + 1))
+
+    lines = set()
+    for line in diff.splitlines():
+        match = HUNK_RE.match(line)
+        if match:
+            start = int(match.group("start"))
+            count = int(match.group("count") or 1)
+            lines.update(range(start, start + max(count, 1)))
+    return lines
+
+
+def step_definitions(path):
+    """Yields (first_line, last_line, pattern) for every behave step function in a steps module."""
+    with open(path, encoding="utf-8") as handle:
+        tree = ast.parse(handle.read(), filename=path)
+
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        first_line = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        for decorator in node.decorator_list:
+            if (
+                isinstance(decorator, ast.Call)
+                and isinstance(decorator.func, ast.Name)
+                and decorator.func.id in STEP_DECORATORS
+                and decorator.args
+                and isinstance(decorator.args[0], ast.Constant)
+            ):
+                yield first_line, node.end_lineno, decorator.args[0].value
+
+
+def changed_step_definitions(rev, steps_dirs):
+    """
+    What changed in the steps modules since `rev`, as (step_defs, modules): the ids
+    ("<file>::<pattern>", as stored by results_store) of step definitions whose code changed,
+    and the modules changed outside any step function (helpers, imports, module-level code)
+    or deleted, which can affect every step they define.
+    """
+    step_defs = set()
+    modules = set()
+    for path in changed_files(rev, steps_dirs):
+        if not path.endswith(".py"):
+            continue
+        if not os.path.exists(path):
+            modules.add(os.path.relpath(path))
+            continue
+        lines = changed_lines(rev, path)
+        definitions = list(step_definitions(path))
+        for first_line, last_line, pattern in definitions:
+            if any(first_line <= line <= last_line for line in lines):
+                step_defs.add(f"{os.path.relpath(path)}::{pattern}")
+        if any(not any(first <= line <= last for first, last, _ in definitions) for line in lines):
+            modules.add(os.path.relpath(path))
+    return step_defs, modules
+
+
+def feature_files(feature_dirs):
+    return sorted(path for directory in feature_dirs for path in glob.glob(os.path.join(directory, "**", "*.feature"), recursive=True))
+
+
+def scenarios_referencing(paths, feature_dirs):
+    """
+    Scenarios whose text (steps, tables, Examples, or the file's Background) mentions one of
+    `paths`, written relative to the repository, the feature file or the feature directory.
+    """
+    from features.utils.scheduler import SCENARIO_RE
+
+    scenarios = set()
+    for directory in feature_dirs:
+        for feature_file in feature_files([directory]):
+            references = set()
+            for path in paths:
+                for base in (".", os.path.dirname(feature_file), directory):
+                    references.add(os.path.relpath(path, base).replace(os.sep, "/"))
+
+            preamble, blocks = [], []
+            with open(feature_file, encoding="utf-8") as handle:
+                for line in handle:
+                    match = SCENARIO_RE.match(line)
+                    if match:
+                        blocks.append((match.group("name"), []))
+                    (blocks[-1][1] if blocks else preamble).append(line)
+            for name, lines in blocks:
+                text = "".join(preamble + lines)
+                if any(reference in text for reference in references):
+                    scenarios.add(name)
+    return scenarios
+
+
+def affected_by_changes(rev, store, feature_dirs, steps_dirs, support_dirs):
+    """
+    Returns the set of scenario names to run for changes since `rev`, or None when everything
+    must run: a change to shared support code (environment hooks, utils), or a change that
+    cannot be traced to the scenarios it affects.
+    """
+    from features.utils.scheduler import discover_scenarios
+
+    if any(path.endswith(".py") for path in changed_files(rev, support_dirs)):
+        return None
+
+    step_defs, modules = changed_step_definitions(rev, steps_dirs)
+    scenarios = store.scenarios_using(step_defs) | store.scenarios_using_modules(modules)
+
+    steps_prefixes = tuple(os.path.join(os.path.normpath(directory), "") for directory in steps_dirs)
+    changed = [path for path in changed_files(rev, feature_dirs) if not os.path.normpath(path).startswith(steps_prefixes)]
+    for path in changed:
+        if path.endswith(".feature"):
+            # Scenarios of a deleted feature file are gone; there is nothing left to run for them
+            scenarios.update(discover_scenarios([path]) if os.path.exists(path) else [])
+        elif path.endswith(".py"):
+            return None
+        else:
+            # Data files (e.g. datasets) select the scenarios that mention them
+            referencing = scenarios_referencing([path], feature_dirs)
+            if not referencing:
+                return None
+            scenarios.update(referencing)
+
+    # A non-empty diff must never select nothing: run everything rather than pass without testing
+    if not scenarios and (changed or step_defs or modules):
+        return None
+
+    # Plus scenarios that have never been recorded
+    known = set(store.last_results())
+    scenarios.update(name for name in discover_scenarios(feature_dirs) if name not in known)
+    return scenarios
@@ -0,0 +1,41 @@
+import json
+import re
+from urllib.parse import urlparse
+import responses
+from features.utils.config import API_BASE_URL
+from features.utils.logger import logger
+from features.utils.stub_server import IDEMPOTENCY_HEADER, Ledger
+
+
+def _callback(ledger):
+    def handle(request):
+        try:
+            payload = json.loads(request.body) if request.body else {}
+        except ValueError:
+            return 400, {"Content-Type": "application/json"}, json.dumps({"error": "Malformed JSON body"})
+        status, body = ledger.handle(request.method, urlparse(request.url).path, payload, request.headers.get(IDEMPOTENCY_HEADER))
+        return status, {"Content-Type": "application/json"}, json.dumps(body)
+    return handle
+
+
+def start_stub(base_url=API_BASE_URL, ledger=None):
+    """
+    Intercepts every requests call to `base_url` and answers it from an in-memory Ledger.
+
+    No socket is opened, so a scenario costs only the step logic. Returns the started
+    RequestsMock; call stop_stub() with it when the run is over.
+    """
+    ledger = ledger or Ledger()
+    mock = responses.RequestsMock(assert_all_requests_are_fired=False)
+    url_pattern = re.compile(rf"^{re.escape(base_url.rstrip('/'))}/.*")
+    for method in (responses.GET, responses.POST):
+        mock.add_callback(method, url_pattern, callback=_callback(ledger))
+    mock.start()
+    mock.ledger = ledger
+    logger.info(f"API stub mode enabled: requests to {base_url} are served in-process")
+    return mock
+
+
+def stop_stub(mock):
+    mock.stop()
+    mock.reset()
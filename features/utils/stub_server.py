@@ -0,0 +1,256 @@
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUPPORTED_CURRENCIES = {"USD", "EUR", "GBP", "DKK", "SEK", "NOK", "CHF", "JPY", "INR"}
+
+ACCOUNT_PATH = re.compile(r"^/account/(?P<account_id>[^/]+)$")
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+class Ledger:
+    """
+    In-memory stand-in for the fund-transfer backend.
+
+    Status codes follow what the feature files assert: 201 for a created account,
+    200 for a successful read or transaction, 400 for invalid amounts/currencies or
+    insufficient funds and 404 for unknown accounts.
+
+    With atomic=False transactions read balances, yield, then write them back without holding
+    the lock, reproducing the lost-update/double-debit races the consistency checker looks for.
+
+    With row_lock_hold > 0 every transaction also takes a lock per account it touches (in id
+    order) and holds it that many seconds before applying, like a database doing work under
+    row locks: transactions on different accounts run in parallel, those on a hot account queue.
+
+    Transactions sent with an Idempotency-Key are applied once per key: a repeat of the same
+    request waits for the first one and gets its response, a different request under a used
+    key gets 422. Keys are kept for the life of the ledger.
+    """
+
+    def __init__(self, atomic=True, row_lock_hold=0.0):
+        self.atomic = atomic
+        self.row_lock_hold = row_lock_hold
+        self.accounts = {}
+        self.lock = threading.Lock()
+        self.row_locks = {}
+        self.idempotency = {}  # key -> {"request", "done", "response"}
+        self._ids = itertools.count(1)
+
+    # ================================
+    # Validation helpers
+    # ================================
+
+    @staticmethod
+    def _amount(payload):
+        try:
+            amount = float(payload.get("amount"))
+        except (TypeError, ValueError):
+            return None
+        return amount if amount > 0 else None
+
+    def _account(self, account_id):
+        return self.accounts.get(str(account_id))
+
+    @staticmethod
+    def _error(status, message):
+        return status, {"error": message}
+
+    # ================================
+    # Endpoints
+    # ================================
+
+    def create_account(self, payload):
+        currency = payload.get("currency")
+        if currency not in SUPPORTED_CURRENCIES:
+            return self._error(400, f"Unsupported currency: {currency}")
+        with self.lock:
+            account = {"id": str(next(self._ids)), "currency": currency, "balance": 0.0}
+            self.accounts[account["id"]] = account
+            return 201, dict(account)
+
+    def get_account(self, account_id):
+        with self.lock:
+            account = self._account(account_id)
+            if account is None:
+                return self._error(404, f"Account {account_id} not found")
+            return 200, dict(account)
+
+    def deposit(self, payload):
+        return self._move(payload.get("accountId"), None, payload, "deposit")
+
+    def withdraw(self, payload):
+        return self._move(None, payload.get("accountId"), payload, "withdraw")
+
+    def transfer(self, payload):
+        return self._move(payload.get("creditAccountId"), payload.get("debitAccountId"), payload, "transfer")
+
+    def _row_locks(self, *account_ids):
+        with self.lock:
+            return [self.row_locks.setdefault(account_id, threading.Lock())
+                    for account_id in sorted({str(account_id) for account_id in account_ids if account_id is not None})]
+
+    def _move(self, credit_id, debit_id, payload, kind):
+        if not self.row_lock_hold:
+            return self._move_locked(credit_id, debit_id, payload, kind)
+        rows = self._row_locks(credit_id, debit_id)
+        for lock in rows:
+            lock.acquire()
+        try:
+            time.sleep(self.row_lock_hold)
+            return self._move_locked(credit_id, debit_id, payload, kind)
+        finally:
+            for lock in reversed(rows):
+                lock.release()
+
+    def _move_locked(self, credit_id, debit_id, payload, kind):
+        amount = self._amount(payload)
+        currency = payload.get("currency")
+
+        with self.lock:
+            credit = self._account(credit_id) if credit_id is not None else None
+            debit = self._account(debit_id) if debit_id is not None else None
+            if (credit_id is not None and credit is None) or (debit_id is not None and debit is None):
+                return self._error(404, "Account not found")
+            if amount is None:
+                return self._error(400, "Amount must be a positive number")
+            if currency not in SUPPORTED_CURRENCIES:
+                return self._error(400, f"Unsupported currency: {currency}")
+            if any(account["currency"] != currency for account in (credit, debit) if account is not None):
+                return self._error(400, "Currency does not match the account currency")
+            if debit is not None and debit["balance"] < amount:
+                return self._error(400, "Insufficient funds")
+            read = {account["id"]: account["balance"] for account in (debit, credit) if account is not None}
+            if self.atomic:
+                self._apply(debit, credit, amount, read)
+
+        if not self.atomic:
+            # Read-modify-write outside the lock: concurrent transactions overwrite each other
+            time.sleep(0.001)
+            self._apply(debit, credit, amount, read)
+
+        transaction = {"type": kind, "amount": amount, "currency": currency}
+        if debit is not None:
+            transaction["debitAccountId"] = debit["id"]
+        if credit is not None:
+            transaction["creditAccountId"] = credit["id"]
+        return 200, transaction
+
+    @staticmethod
+    def _apply(debit, credit, amount, read):
+        if debit is not None:
+            debit["balance"] = read[debit["id"]] - amount
+        if credit is not None:
+            credit["balance"] = read[credit["id"]] + amount
+
+    def handle(self, method, path, payload=None, idempotency_key=None):
+        """Dispatches one request and returns (status_code, body)."""
+        path = path.split("?", 1)[0].rstrip("/")
+        payload = payload or {}
+        if idempotency_key and method == "POST" and path.startswith("/transaction/"):
+            return self._idempotent(idempotency_key, path, payload)
+        return self._dispatch(method, path, payload)
+
+    def _idempotent(self, key, path, payload):
+        with self.lock:
+            entry = self.idempotency.get(key)
+            first = entry is None
+            if first:
+                entry = self.idempotency[key] = {"request": (path, payload), "done": threading.Event(), "response": None}
+        if entry["request"] != (path, payload):
+            return self._error(422, "Idempotency key was already used for a different request")
+        if first:
+            try:
+                entry["response"] = self._dispatch("POST", path, payload)
+            finally:
+                entry["done"].set()
+        else:
+            entry["done"].wait()
+        return entry["response"] or self._error(500, "The original request for this idempotency key failed")
+
+    def _dispatch(self, method, path, payload):
+        if method == "POST" and path == "/account":
+            return self.create_account(payload)
+        if method == "GET":
+            match = ACCOUNT_PATH.match(path)
+            if match:
+                return self.get_account(match.group("account_id"))
+        if method == "POST" and path == "/transaction/deposit":
+            return self.deposit(payload)
+        if method == "POST" and path == "/transaction/withdraw":
+            return self.withdraw(payload)
+        if method == "POST" and path == "/transaction/transfer":
+            return self.transfer(payload)
+        return self._error(404, f"No route for {method} {path}")
+
+
+# ================================
+# HTTP front-end
+# ================================
+
+class LedgerRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real backend
+    # Headers and body go out in separate writes; with Nagle on, the body waits for the client's delayed ACK (~40ms)
+    disable_nagle_algorithm = True
+
+    def _respond(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length)) if length else {}
+        except ValueError:
+            status, body = 400, {"error": "Malformed JSON body"}
+        else:
+            status, body = self.server.ledger.handle(method, self.path, payload, self.headers.get(IDEMPOTENCY_HEADER))
+
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        self._respond("POST")
+
+    def log_message(self, format, *args):
+        pass  # keep load runs quiet
+
+
+class StubServer:
+    """Runs a Ledger behind a threaded HTTP server on a background thread."""
+
+    def __init__(self, host="127.0.0.1", port=0, ledger=None):
+        self.httpd = ThreadingHTTPServer((host, port), LedgerRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.ledger = ledger or Ledger()
+        self.thread = None
+
+    @property
+    def ledger(self):
+        return self.httpd.ledger
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="stub-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
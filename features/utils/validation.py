@@ -0,0 +1,90 @@
+import json
+
+CURRENCY = {"type": "string", "pattern": "^[A-Z]{3}$"}
+ACCOUNT_ID = {"type": ["string", "integer"]}
+
+# ================================
+# Response schemas per endpoint
+# ================================
+
+ACCOUNT_SCHEMA = {
+    "type": "object",
+    "required": ["id", "currency", "balance"],
+    "properties": {
+        "id": ACCOUNT_ID,
+        "currency": CURRENCY,
+        "balance": {"type": "number"},
+    },
+}
+
+TRANSACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "amount": {"type": "number"},
+        "currency": CURRENCY,
+        "accountId": ACCOUNT_ID,
+        "debitAccountId": ACCOUNT_ID,
+        "creditAccountId": ACCOUNT_ID,
+    },
+}
+
+SCHEMAS = {
+    "create_account": ACCOUNT_SCHEMA,
+    "get_account": ACCOUNT_SCHEMA,
+    "deposit": TRANSACTION_SCHEMA,
+    "withdraw": TRANSACTION_SCHEMA,
+    "transfer": TRANSACTION_SCHEMA,
+}
+
+_validators = {}
+
+
+def validator(endpoint):
+    """Returns the compiled validator for `endpoint`; each schema is checked and compiled once per process."""
+    compiled = _validators.get(endpoint)
+    if compiled is None:
+        # jsonschema is imported on the first validation, not when the steps are loaded
+        from jsonschema import Draft7Validator
+
+        schema = SCHEMAS[endpoint]
+        Draft7Validator.check_schema(schema)
+        compiled = _validators[endpoint] = Draft7Validator(schema)
+    return compiled
+
+
+# ================================
+# Parse-once response access
+# ================================
+
+def response_json(context):
+    """Parses context.response once and caches the body on the context for the following assertions."""
+    if getattr(context, "parsed_response", None) is not context.response:
+        context.response_body = context.response.json()
+        context.parsed_response = context.response
+    return context.response_body
+
+
+def validate_response(context, endpoint, required=True):
+    """
+    Validates the cached response body against the endpoint's schema.
+
+    With required=False a body that is not JSON is accepted, for endpoints whose
+    success responses carry no payload.
+    """
+    try:
+        body = response_json(context)
+    except ValueError:
+        if required:
+            raise AssertionError(f"{endpoint} response is not valid JSON: {context.response.text}")
+        return None
+
+    errors = list(validator(endpoint).iter_errors(body))
+    assert not errors, f"{endpoint} response does not match schema: " + "; ".join(
+        f"{'/'.join(map(str, error.path)) or '<root>'}: {error.message}" for error in errors
+    )
+    return body
+
+
+def to_json(data):
+    """Serializes data for a JSON allure attachment."""
+    return json.dumps(data, indent=2, default=str)
@@ -0,0 +1,81 @@
+import time
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from features.utils import config
+from features.utils.logger import logger
+
+ABSENT = object()  # truthy marker so WebDriverWait stops polling for an absent optional element
+
+# (label, seconds, outcome) for every wait in the current scenario; drained by the environment hooks
+timings = []
+
+
+def wait_for(driver, condition, label, timeout=None, poll=None):
+    """WebDriverWait.until with configurable timeout/polling that records how long it took."""
+    timeout = config.UI_WAIT_TIMEOUT if timeout is None else timeout
+    poll = config.UI_POLL_INTERVAL if poll is None else poll
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        outcome = "timeout"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        timings.append((label, elapsed, outcome))
+        logger.info(f"Wait '{label}' took {elapsed:.3f}s ({outcome})")
+
+
+def scroll_into_view(driver, element):
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});", element)
+
+
+def visible(driver, locator, label, timeout=None):
+    """Waits for the element to be present, scrolls it into view and waits for it to be visible."""
+    element = wait_for(driver, EC.presence_of_element_located(locator), f"{label} (present)", timeout)
+    scroll_into_view(driver, element)
+    return wait_for(driver, EC.visibility_of(element), f"{label} (visible)", timeout)
+
+
+def click_when_ready(driver, locator, label, timeout=None):
+    """Scrolls the element into view, waits until it is clickable and clicks it."""
+    visible(driver, locator, label, timeout)
+    element = wait_for(driver, EC.element_to_be_clickable(locator), f"{label} (clickable)", timeout)
+    element.click()
+    return element
+
+
+def find_optional(driver, locator, label, timeout=None):
+    """
+    Returns the element if it shows up, or None once the page has finished loading and
+    stayed without it for UI_OPTIONAL_GRACE seconds, instead of always waiting out the
+    full timeout for optional pop-ups.
+    """
+    timeout = config.UI_OPTIONAL_WAIT_TIMEOUT if timeout is None else timeout
+    settled_at = [None]
+
+    def present_or_settled(driver):
+        elements = driver.find_elements(*locator)
+        if elements:
+            return elements[0]
+        if driver.execute_script("return document.readyState") != "complete":
+            settled_at[0] = None
+            return False
+        if settled_at[0] is None:
+            settled_at[0] = time.perf_counter()
+        return ABSENT if time.perf_counter() - settled_at[0] >= config.UI_OPTIONAL_GRACE else False
+
+    try:
+        result = wait_for(driver, present_or_settled, label, timeout)
+    except TimeoutException:
+        return None
+    return None if result is ABSENT else result
+
+
+def drain_timings():
+    """Returns and clears the waits recorded so far."""
+    recorded = list(timings)
+    del timings[:]
+    return recorded
@@ -0,0 +1,158 @@
+import bisect
+import itertools
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from features.utils.account_pool import create_account
+from features.utils.api_client import deposit_payload, withdraw_payload, transfer_payload
+from features.utils.load import LoadRunner, percentile
+
+
+def parse_weights(spec):
+    """Parses "USD=5,EUR=3,GBP" into {"USD": 5.0, "EUR": 3.0, "GBP": 1.0}."""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        weights[name.upper()] = float(weight or 1)
+    return weights
+
+
+def zipf_cumulative(count, skew):
+    """Cumulative Zipf weights: rank k is picked with probability proportional to 1 / k**skew (0 is uniform)."""
+    return list(itertools.accumulate(1.0 / rank ** skew for rank in range(1, count + 1)))
+
+
+def seed_accounts(client, count, currencies, initial_balance, concurrency=8):
+    """
+    Creates `count` funded accounts split across `currencies` by weight and returns
+    {currency: [account ids]}, each list in creation order (its Zipf rank order).
+    """
+    total = sum(currencies.values())
+    plan = []
+    for currency, weight in currencies.items():
+        plan += [currency] * max(2, round(count * weight / total))  # transfers need two accounts per currency
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        accounts = list(executor.map(lambda currency: create_account(client, currency, initial_balance), plan))
+
+    by_currency = defaultdict(list)
+    for account in accounts:
+        by_currency[account["currency"]].append(account["id"])
+    return dict(by_currency)
+
+
+class TenantWorkload(LoadRunner):
+    """
+    LoadRunner over a multi-currency account population with skewed transfer pairs.
+
+    Each request first picks a currency by weight, then accounts within it by Zipf rank:
+    with credit_skew around 1 a handful of "merchant" accounts receive most credits, and
+    debit_skew (0 by default) spreads debits across the rest. On top of the per-endpoint
+    latency LoadRunner reports, every request is recorded against the accounts it touched
+    so the report shows how much slower hot accounts are and how many requests queued on them.
+    """
+
+    def __init__(self, client, accounts_by_currency, currencies, mix, credit_skew=1.1, debit_skew=0.0,
+                 amount=1.0, rps=None, concurrency=10, seed=None):
+        accounts_by_currency = {currency: ids for currency, ids in accounts_by_currency.items() if len(ids) > 1}
+        super().__init__(client, list(itertools.chain(*accounts_by_currency.values())), mix,
+                         amount=amount, rps=rps, concurrency=concurrency, seed=seed)
+        self.accounts_by_currency = accounts_by_currency
+        self.currencies = [currency for currency in currencies if currency in accounts_by_currency]
+        self.currency_weights = [currencies[currency] for currency in self.currencies]
+        self.credit_weights = {currency: zipf_cumulative(len(ids), credit_skew) for currency, ids in accounts_by_currency.items()}
+        self.debit_weights = {currency: zipf_cumulative(len(ids), debit_skew) for currency, ids in accounts_by_currency.items()}
+        self.ranks = {currency: {account_id: rank for rank, account_id in enumerate(ids)}
+                      for currency, ids in accounts_by_currency.items()}
+        self.touches = defaultdict(list)  # account id -> [(start, end)] of requests on it
+        self.touches_lock = threading.Lock()
+
+    def _pick(self, currency, cumulative, exclude=None):
+        """
+        Draws an account by rank weight. `exclude` is taken out of the draw rather than redrawn,
+        so one random number suffices however much of the weight the excluded rank holds.
+        """
+        ids = self.accounts_by_currency[currency]
+        rank = self.ranks[currency].get(exclude)
+        if rank is None:
+            return ids[bisect.bisect_left(cumulative, self.random.random() * cumulative[-1])]
+
+        start = cumulative[rank - 1] if rank else 0.0
+        end = cumulative[rank]
+        point = self.random.random() * (cumulative[-1] - (end - start))
+        if point >= start:
+            point = point - start + end  # skip over the excluded rank's share
+        index = min(bisect.bisect_right(cumulative, point), len(ids) - 1)
+        if index == rank:
+            index = rank - 1 if rank else rank + 1  # only reachable through float rounding at the edges
+        return ids[index]
+
+    def next_request(self):
+        with self.random_lock:
+            operation = self.random.choices(self.operations, self.weights)[0]
+            currency = self.random.choices(self.currencies, self.currency_weights)[0]
+            credit = self._pick(currency, self.credit_weights[currency])
+            debit = self._pick(currency, self.debit_weights[currency], exclude=credit)
+
+        if operation == "deposit":
+            return operation, deposit_payload(credit, self.amount, currency)
+        if operation == "withdraw":
+            return operation, withdraw_payload(debit, self.amount, currency)
+        return operation, transfer_payload(debit, credit, self.amount, currency)
+
+    def send(self, operation, payload, scheduled_at=None):
+        started = scheduled_at if scheduled_at is not None else time.perf_counter()
+        super().send(operation, payload, scheduled_at=started)
+        finished = time.perf_counter()
+        with self.touches_lock:
+            for key in ("accountId", "debitAccountId", "creditAccountId"):
+                if key in payload:
+                    self.touches[payload[key]].append((started, finished))
+
+    # ================================
+    # Contention report
+    # ================================
+
+    @staticmethod
+    def max_in_flight(intervals):
+        """Most requests on one account that were in flight at the same moment."""
+        events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+        in_flight = peak = 0
+        for _, change in events:
+            in_flight += change
+            peak = max(peak, in_flight)
+        return peak
+
+    def contention(self, hot=5):
+        """Per-account load and latency for the `hot` busiest accounts, compared with all the others."""
+        def latency_summary(intervals):
+            ordered = sorted(end - start for start, end in intervals)
+            return {
+                "requests": len(ordered),
+                "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+            }
+
+        busiest = sorted(self.touches, key=lambda account_id: len(self.touches[account_id]), reverse=True)
+        hot_ids, cold_ids = busiest[:hot], busiest[hot:]
+        touches_total = sum(len(intervals) for intervals in self.touches.values())
+        hot_summary = latency_summary([interval for account_id in hot_ids for interval in self.touches[account_id]])
+        cold_summary = latency_summary([interval for account_id in cold_ids for interval in self.touches[account_id]])
+
+        return {
+            "accounts_touched": len(self.touches),
+            "hot_share": round(hot_summary["requests"] / touches_total, 4) if touches_total else 0.0,
+            "hot": hot_summary,
+            "cold": cold_summary,
+            "hot_p95_slowdown": round(hot_summary["p95_ms"] / cold_summary["p95_ms"], 2) if cold_summary["p95_ms"] else None,
+            "hot_accounts": [
+                dict(latency_summary(self.touches[account_id]), account=account_id,
+                     max_in_flight=self.max_in_flight(self.touches[account_id]))
+                for account_id in hot_ids
+            ],
+        }
+
+    def run(self, duration, hot=5):
+        report = super().run(duration)
+        report["contention"] = self.contention(hot)
+        return report
@@ -0,0 +1,41 @@
+import argparse
+import os
+import sys
+from features.utils.distributed import POOLS, coordinate, work
+from features.utils.reporting import generate_report
+
+parser = argparse.ArgumentParser(description="Run the API and UI suites across several containers sharing a queue directory.")
+parser.add_argument("--queue-dir", default=os.getenv("QUEUE_DIR", "queue"), help="Directory shared by the coordinator and all workers")
+subparsers = parser.add_subparsers(dest="role", required=True)
+
+coordinator = subparsers.add_parser("coordinator", help="Shard scenarios by historical duration and collect the results")
+coordinator.add_argument("scenario", nargs="*", help="Optional scenario name to run")
+coordinator.add_argument("--pools", nargs="+", choices=sorted(POOLS), default=sorted(POOLS), help="Suites to distribute")
+coordinator.add_argument("--api-shards", type=int, default=8, help="Shards for the API pool (more than workers balances better)")
+coordinator.add_argument("--ui-shards", type=int, default=4, help="Shards for the UI pool")
+coordinator.add_argument("--timeout", type=int, default=3600, help="Seconds to wait for all shards")
+
+worker = subparsers.add_parser("worker", help="Claim and run shards from one pool until the queue is drained")
+worker.add_argument("--pool", choices=sorted(POOLS), required=True, help="Pool to take shards from")
+worker.add_argument("--idle-timeout", type=int, default=600, help="Exit after this many seconds without a queued shard")
+args = parser.parse_args()
+
+if args.role == "worker":
+    sys.exit(work(args.queue_dir, args.pool, idle_timeout=args.idle_timeout))
+
+# Ensure results directory exists
+os.makedirs("allure-results", exist_ok=True)
+
+scenario_name = " ".join(args.scenario)
+print(f"\n Distributing {', '.join(args.pools)} scenarios through {args.queue_dir}\n")
+exit_code = coordinate(
+    args.queue_dir, args.pools, {"api": args.api_shards, "ui": args.ui_shards},
+    "allure-results", scenario_name or None, args.timeout
+)
+
+# One report with the results of every worker in both pools
+generate_report("allure-results", "allure-report")
+print("\n Distributed test execution completed.\n")
+
+# Exit with the first failing shard's status (useful for CI/CD pipelines)
+sys.exit(exit_code)
@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import sys
+from features.utils.account_pool import create_account
+from features.utils.api_client import ApiClient
+from features.utils.config import API_BASE_URL
+from features.utils.fault_proxy import FaultProxy
+from features.utils.idempotency import DuplicateStorm, dedup_cost
+from features.utils.load import parse_mix
+from features.utils.stub_server import StubServer
+
+parser = argparse.ArgumentParser(description="Send duplicate-request storms and check that no transaction is applied twice.")
+parser.add_argument("--transactions", type=int, default=500, help="Logical transactions to send")
+parser.add_argument("--copies", type=int, default=3, help="Identical requests fired at once per transaction")
+parser.add_argument("--retries", type=int, default=2, help="Resends of a copy after a timeout or dropped connection")
+parser.add_argument("--timeout", type=float, default=1.0, help="Client read timeout per attempt (seconds)")
+parser.add_argument("--no-keys", action="store_true", help="Send without Idempotency-Key headers (duplicates are expected)")
+parser.add_argument("--mix", default="transfer=3,deposit=1", help="Operation weights (deposit and transfer)")
+parser.add_argument("--accounts", type=int, default=10, help="Accounts to move money between")
+parser.add_argument("--currency", default="USD")
+parser.add_argument("--amount", type=float, default=1.0, help="Amount per transaction")
+parser.add_argument("--initial-balance", type=float, default=10000.0, help="Starting balance of each account")
+parser.add_argument("--concurrency", type=int, default=16, help="Transactions in flight")
+parser.add_argument("--base-url", default=API_BASE_URL)
+parser.add_argument("--stub", action="store_true", help="Start a local in-memory stand-in server and target it")
+parser.add_argument("--latency-ms", type=float, default=0.0, help="Fault proxy: added latency per request")
+parser.add_argument("--jitter-ms", type=float, default=0.0, help="Fault proxy: extra random latency up to this much")
+parser.add_argument("--drop-rate", type=float, default=0.0, help="Fault proxy: share of responses withheld after the server applied them")
+parser.add_argument("--reset-rate", type=float, default=0.0, help="Fault proxy: share of connections reset after the server applied them")
+parser.add_argument("--cost-requests", type=int, default=500, help="Unique deposits per side of the dedup cost measurement (0 skips it)")
+parser.add_argument("--output", default=os.path.join("reports", "idempotency_report.json"), help="JSON report path")
+parser.add_argument("--seed", type=int)
+args = parser.parse_args()
+
+stub = StubServer().start() if args.stub else None
+base_url = stub.base_url if stub else args.base_url
+proxy = None
+if args.latency_ms or args.jitter_ms or args.drop_rate or args.reset_rate:
+    # Withheld responses are held a little past the client timeout so the client gives up first
+    proxy = FaultProxy(base_url, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, drop_rate=args.drop_rate,
+                       reset_rate=args.reset_rate, hold=args.timeout + 1, seed=args.seed).start()
+pool_size = args.concurrency * args.copies
+# Setup and balance reads go straight to the server; only the storms go through the fault proxy
+setup_client = ApiClient(base_url=base_url, pool_size=args.concurrency)
+client = ApiClient(base_url=proxy.base_url if proxy else base_url, pool_size=pool_size, retries=0)
+
+try:
+    print(f"\n Seeding {args.accounts} {args.currency} accounts on {base_url}...")
+    accounts = [create_account(setup_client, args.currency, args.initial_balance)["id"] for _ in range(args.accounts)]
+
+    keys = "without" if args.no_keys else "with"
+    faults = f" through a fault proxy on {proxy.base_url}" if proxy else ""
+    print(f" Sending {args.transactions} transactions x {args.copies} copies ({args.retries} retries, {keys} idempotency keys){faults}\n")
+    storm = DuplicateStorm(client, accounts, parse_mix(args.mix), currency=args.currency, amount=args.amount,
+                           copies=args.copies, retries=args.retries, timeout=args.timeout, use_keys=not args.no_keys,
+                           concurrency=args.concurrency, seed=args.seed, balance_client=setup_client)
+    report = storm.run(args.transactions)
+    if proxy:
+        report["faults"] = dict(proxy.counts)
+
+    if args.cost_requests:
+        print(f" Measuring the dedup path over {args.cost_requests} unique deposits...")
+        report["dedup_cost"] = dedup_cost(setup_client, accounts[0], args.cost_requests, args.concurrency, args.currency)
+finally:
+    client.close()
+    setup_client.close()
+    if proxy:
+        proxy.stop()
+    if stub:
+        stub.stop()
+
+print(f" {report['transactions']} transactions ({report['http_requests']} HTTP requests) in {report['elapsed_s']}s: "
+      f"{report['transactions_per_second']} tx/s, outcomes {report['outcomes']}")
+print(f" Attempt outcomes: {report['attempts']}")
+if "faults" in report:
+    print(f" Injected faults: {report['faults']}")
+for violation in report["double_applied"]:
+    print(f" DOUBLE APPLICATION on account {violation['account']}: balance {violation['balance']}, expected "
+          f"{violation['expected_min']}..{violation['expected_max']} (~{violation['extra_applications']} extra)")
+if not report["double_applied"]:
+    print(" No transaction was applied more than once.")
+if "dedup_cost" in report:
+    cost = report["dedup_cost"]
+    print(f" Dedup path: {cost['with_keys']['requests_per_second']} rps with keys vs "
+          f"{cost['without_keys']['requests_per_second']} rps without ({cost['throughput_cost']:+.1%} throughput cost)")
+
+os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+with open(args.output, "w", encoding="utf-8") as handle:
+    json.dump(report, handle, indent=2)
+print(f" Report written to {args.output}\n")
+
+# Non-zero exit when any transaction was applied more than once (useful for CI/CD pipelines)
+sys.exit(1 if report["double_applied"] else 0)
@@ -0,0 +1,116 @@
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_LINE = re.compile(r"^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent>\s+)(?P<module>\S+)")
+
+parser = argparse.ArgumentParser(description="Measure how long the behave suites take to import and start.")
+parser.add_argument("--modules", nargs="*", help="Modules to import (default: the API environment and step modules)")
+parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is reported")
+parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to list")
+parser.add_argument("--scenario", help="Also time `behave --dry-run` for this scenario name (single-scenario startup)")
+parser.add_argument("--budget-ms", type=float, default=100,
+                    help="Fail when the median harness import time (behave itself excluded) exceeds this many "
+                         "milliseconds; 0 disables the check")
+parser.add_argument("--output", default=os.path.join("reports", "import_time.json"), help="JSON report path")
+parser.add_argument("--history", default=os.path.join("reports", "import_time_history.jsonl"),
+                    help="One JSON line per run is appended here so CI can track the trend")
+args = parser.parse_args()
+
+modules = args.modules or ["features.environment"] + sorted(
+    path[:-3].replace(os.sep, ".") for path in glob.glob(os.path.join("features", "steps", "*.py"))
+    if not path.endswith("__init__.py")
+)
+
+
+def import_profile():
+    """Runs a fresh interpreter with -X importtime and returns {module: (self_us, cumulative_us, top_level)}."""
+    # behave is imported first so what it loads (asyncio among others) is charged to it, not to the harness
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {module}" for module in ["behave"] + modules)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {', '.join(modules)} failed:\n{result.stderr[-2000:]}")
+
+    profile = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            # importtime indents nested imports by two spaces per level; one space means top level
+            top_level = len(match.group("indent")) == 1
+            profile[match.group("module")] = (int(match.group("self")), int(match.group("cumulative")), top_level)
+    return profile
+
+
+def behave_startup(scenario):
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "behave", "--dry-run", "--no-summary", "-f", "null", "-n", scenario],
+        capture_output=True, text=True
+    )
+    return time.perf_counter() - started
+
+
+profiles = [import_profile() for _ in range(args.repeat)]
+totals_ms = [sum(self_us for self_us, _, _ in profile.values()) / 1000 for profile in profiles]
+median_profile = profiles[totals_ms.index(sorted(totals_ms)[len(totals_ms) // 2])]
+# The harness's own cost: the cumulative time of the requested modules, which excludes behave and site
+harness_ms = [
+    sum(cumulative for module, (_, cumulative, top_level) in profile.items() if top_level and module in modules) / 1000
+    for profile in profiles
+]
+
+slowest = sorted(
+    ((module, cumulative) for module, (_, cumulative, top_level) in median_profile.items() if top_level),
+    key=lambda item: item[1], reverse=True
+)[:args.top]
+
+report = {
+    "timestamp": time.time(),
+    "python": sys.version.split()[0],
+    "modules": modules,
+    "import_ms": round(statistics.median(totals_ms), 2),
+    "import_ms_runs": [round(total, 2) for total in totals_ms],
+    "harness_import_ms": round(statistics.median(harness_ms), 2),
+    "modules_loaded": len(median_profile),
+    "slowest_imports_ms": {module: round(cumulative / 1000, 2) for module, cumulative in slowest},
+}
+if args.scenario:
+    report["scenario"] = args.scenario
+    report["behave_startup_s"] = round(statistics.median(behave_startup(args.scenario) for _ in range(args.repeat)), 3)
+
+previous = None
+if os.path.exists(args.history):
+    with open(args.history, encoding="utf-8") as handle:
+        lines = [line for line in handle if line.strip()]
+    previous = json.loads(lines[-1]) if lines else None
+
+print(f"\n Import time (median of {args.repeat}): {report['import_ms']} ms, {report['modules_loaded']} modules")
+print(f" Harness import time (behave excluded): {report['harness_import_ms']} ms")
+if previous is not None and "harness_import_ms" in previous:
+    print(f" Previous run: {previous['harness_import_ms']} ms "
+          f"({report['harness_import_ms'] - previous['harness_import_ms']:+.2f} ms)")
+if "behave_startup_s" in report:
+    print(f" behave --dry-run startup for \"{args.scenario}\": {report['behave_startup_s']} s")
+print("\n Slowest top-level imports:")
+for module, milliseconds in report["slowest_imports_ms"].items():
+    print(f"   {milliseconds:>9.2f} ms  {module}")
+
+os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+with open(args.output, "w", encoding="utf-8") as handle:
+    json.dump(report, handle, indent=2)
+with open(args.history, "a", encoding="utf-8") as handle:
+    handle.write(json.dumps(report) + "\n")
+print(f"\n Report written to {args.output}\n")
+
+# Non-zero exit when the import budget is exceeded (useful for CI/CD pipelines)
+if args.budget_ms and report["harness_import_ms"] > args.budget_ms:
+    print(f" Harness import time {report['harness_import_ms']} ms exceeds the budget of {args.budget_ms} ms")
+    sys.exit(1)
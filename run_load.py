@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import sys
+from features.utils.account_pool import create_account
+from features.utils.api_client import ApiClient
+from features.utils.config import API_BASE_URL
+from features.utils.load import LoadRunner, parse_mix
+from features.utils.stub_server import StubServer
+
+parser = argparse.ArgumentParser(description="Drive the fund-transfer endpoints at a target request rate.")
+parser.add_argument("--rps", type=float, help="Open-loop request rate; omit for closed-loop at --concurrency")
+parser.add_argument("--concurrency", type=int, default=10, help="Worker threads (and HTTP pool size)")
+parser.add_argument("--duration", type=float, default=10, help="Seconds to run")
+parser.add_argument("--mix", default="deposit=4,withdraw=2,transfer=4", help="Operation weights")
+parser.add_argument("--accounts", type=int, default=20, help="Accounts to create and fund before the run")
+parser.add_argument("--currency", default="USD")
+parser.add_argument("--amount", type=float, default=1.0, help="Amount per transaction")
+parser.add_argument("--initial-balance", type=float, default=1000.0, help="Starting balance of each account")
+parser.add_argument("--base-url", default=API_BASE_URL)
+parser.add_argument("--stub", action="store_true", help="Start a local in-memory stand-in server and target it")
+parser.add_argument("--output", default=os.path.join("reports", "load_report.json"), help="JSON report path")
+parser.add_argument("--seed", type=int)
+args = parser.parse_args()
+
+stub = StubServer().start() if args.stub else None
+base_url = stub.base_url if stub else args.base_url
+client = ApiClient(base_url=base_url, pool_size=args.concurrency, retries=0)
+
+try:
+    print(f"\n Seeding {args.accounts} {args.currency} accounts on {base_url}...")
+    accounts = [create_account(client, args.currency, args.initial_balance)["id"] for _ in range(args.accounts)]
+
+    mode = f"open-loop at {args.rps} rps" if args.rps else f"closed-loop with {args.concurrency} workers"
+    print(f" Running {mode} for {args.duration}s (mix: {args.mix})\n")
+    runner = LoadRunner(client, accounts, parse_mix(args.mix), currency=args.currency, amount=args.amount,
+                        rps=args.rps, concurrency=args.concurrency, seed=args.seed)
+    report = runner.run(args.duration)
+finally:
+    client.close()
+    if stub:
+        stub.stop()
+
+for operation, numbers in report["operations"].items():
+    print(f" {operation:<9} {numbers['requests']:>7} req  {numbers['throughput_rps']:>8} rps  "
+          f"p50 {numbers['p50_ms']:>7}ms  p95 {numbers['p95_ms']:>7}ms  p99 {numbers['p99_ms']:>7}ms  "
+          f"errors {numbers['error_rate']:.2%}")
+print(f"\n Total: {report['requests']} requests, {report['throughput_rps']} rps, error rate {report['error_rate']:.2%}")
+
+os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+with open(args.output, "w", encoding="utf-8") as handle:
+    json.dump(report, handle, indent=2)
+print(f" Report written to {args.output}\n")
+
+# Non-zero exit when any transport/5xx errors occurred (useful for CI/CD pipelines)
+sys.exit(1 if report["error_rate"] else 0)
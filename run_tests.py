@@ -1,30 +1,86 @@
+import argparse
 import os
+import subprocess
 import sys
+from features.utils.reporting import generate_report, is_ci, serve_report
+from features.utils.results_store import ResultsStore
+from features.utils.scheduler import discover_scenarios, run_parallel
+from features.utils.selection import affected_by_changes
+
+parser = argparse.ArgumentParser(description="Run the Fund Transfer API test suite.")
+parser.add_argument("scenario", nargs="*", help="Optional scenario name to run")
+parser.add_argument("--workers", type=int, default=1, help="Split scenarios across N behave processes")
+parser.add_argument("--failed-first", action="store_true", help="Run scenarios that failed last time before the rest")
+parser.add_argument("--only-failed", action="store_true", help="Run only scenarios that failed last time")
+parser.add_argument("--changed-since", metavar="GIT_REV", help="Run only scenarios affected by changes since GIT_REV")
+parser.add_argument("--ci", action="store_true", help="Headless CI mode: generate the report in the background, never serve it")
+args = parser.parse_args()
+ci_mode = args.ci or is_ci()
 
 # Ensure results directory exists
 os.makedirs("allure-results", exist_ok=True)
 
 # Get scenario name from command-line arguments (optional)
-scenario_name = " ".join(sys.argv[1:])
+scenario_name = " ".join(args.scenario)
+
+# Pick scenarios from the results history (reports/results.db) when a selection mode is used
+phases = None
+if args.failed_first or args.only_failed or args.changed_since:
+    store = ResultsStore()
+    selected = discover_scenarios(["features"], scenario_name or None)
+    failed = store.failed_scenarios()
+
+    if args.only_failed or args.changed_since:
+        wanted = set()
+        if args.only_failed:
+            wanted |= failed
+        if args.changed_since:
+            affected = affected_by_changes(
+                args.changed_since, store, ["features"], ["features/steps"], ["features/environment.py", "features/utils"]
+            )
+            wanted |= set(selected) if affected is None else affected
+        selected = [name for name in selected if name in wanted]
+    store.close()
+
+    if args.failed_first:
+        phases = [[name for name in selected if name in failed], [name for name in selected if name not in failed]]
+    else:
+        phases = [selected]
+    phases = [phase for phase in phases if phase]
+    print(f"\n Selected {sum(len(phase) for phase in phases)} scenario(s) from the results history\n")
 
-# Behave command with Allure formatter
-behave_command = 'python -m behave -f allure_behave.formatter:AllureFormatter -o allure-results'
-if scenario_name:
-    behave_command = f'python -m behave -n "{scenario_name}" -f allure_behave.formatter:AllureFormatter -o allure-results'
+if phases is not None:
+    # Each phase runs to completion before the next, so previously failed scenarios report first
+    exit_code = 0
+    for phase in phases:
+        phase_exit_code = run_parallel(["features"], args.workers, "allure-results", scenarios=phase)
+        exit_code = exit_code or phase_exit_code
+elif args.workers > 1:
+    # Run scenarios in parallel, longest first, and merge the per-worker allure results
+    print(f"\n Running tests across {args.workers} workers\n")
+    exit_code = run_parallel(["features"], args.workers, "allure-results", scenario_name or None)
+else:
+    # Behave command with Allure formatter
+    behave_command = 'python -m behave -f allure_behave.formatter:AllureFormatter -o allure-results'
+    if scenario_name:
+        behave_command = f'python -m behave -n "{scenario_name}" -f allure_behave.formatter:AllureFormatter -o allure-results'
 
-# Run Behave tests
-print(f"\n Running tests with command: {behave_command}\n")
-exit_code = os.system(behave_command)
+    # Run Behave tests
+    print(f"\n Running tests with command: {behave_command}\n")
+    exit_code = subprocess.call(behave_command, shell=True)
 
-# Generate Allure HTML report
-print("Generating Allure HTML Report...")
-os.system("allure generate allure-results --clean -o allure-report")
+if ci_mode:
+    # Let the report build while the next suite (e.g. run_ui_tests.py) is already running
+    generate_report("allure-results", "allure-report", background=True)
+    print("\n Test execution completed.\n")
+else:
+    # Generate Allure HTML report (skipped when the results did not change)
+    generate_report("allure-results", "allure-report")
 
-# Serve Allure report (automatically launches in the browser)
-print("\n Serving Allure Report...\n")
-os.system("allure serve allure-results")
+    # Serve Allure report (automatically launches in the browser)
+    serve_report("allure-results")
 
-print("\n Test execution completed. Allure report opened in the browser.\n")
+    print("\n Test execution completed. Allure report opened in the browser.\n")
 
 # Exit with the same status as Behave execution (useful for CI/CD pipelines)
-sys.exit(exit_code)
\ No newline at end of file
+sys.exit(exit_code)
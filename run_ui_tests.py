@@ -1,12 +1,31 @@
+import argparse
 import os
+import subprocess
 import sys
-import webbrowser
+from features.utils.reporting import generate_report, is_ci, serve_report
+
+parser = argparse.ArgumentParser(description="Run the GomSpace UI test suite.")
+parser.add_argument("scenario", nargs="*", help="Optional scenario name to run")
+parser.add_argument("--ci", action="store_true", help="Headless CI mode: generate the report, never serve it")
+parser.add_argument("--fast", action="store_true", help="Headless, and block images, fonts, media and third-party hosts")
+parser.add_argument("--record-snapshots", action="store_true", help="Save the rendered HTML of every visited page")
+parser.add_argument("--offline", action="store_true", help="Serve the pages from the recorded snapshots instead of the live site")
+args = parser.parse_args()
+ci_mode = args.ci or is_ci()
+
+# Picked up by features/utils/config.py in the behave process
+if args.fast:
+    os.environ.update(UI_HEADLESS="true", UI_BLOCK_RESOURCES="true")
+if args.record_snapshots:
+    os.environ["UI_SNAPSHOT_MODE"] = "record"
+if args.offline:
+    os.environ["UI_SNAPSHOT_MODE"] = "replay"
 
 # Ensure results directory exists
 os.makedirs("allure-results", exist_ok=True)
 
 # Get scenario name from command-line arguments (optional)
-scenario_name = " ".join(sys.argv[1:])
+scenario_name = " ".join(args.scenario)
 
 # Behave command with Allure formatter
 behave_command = 'python -m behave ui_tests -f allure_behave.formatter:AllureFormatter -o allure-results'
@@ -15,13 +34,17 @@ if scenario_name:
 
 # Run Behave UI tests
 print(f"\n Running UI tests with command: {behave_command}\n")
-exit_code = os.system(behave_command)
+exit_code = subprocess.call(behave_command, shell=True)
 
-# Serve Allure report (automatically launches in the browser)
-print("\n Serving Allure Report...\n")
-os.system("allure serve allure-results")
+if ci_mode:
+    # Final report with API + UI results; waits for any background generation started by run_tests.py
+    generate_report("allure-results", "allure-report")
+    print("\n UI Test execution completed.\n")
+else:
+    # Serve Allure report (automatically launches in the browser)
+    serve_report("allure-results")
 
-print("\n UI Test execution completed. Allure report opened in the browser.\n")
+    print("\n UI Test execution completed. Allure report opened in the browser.\n")
 
 # Exit with the same status as Behave execution (useful for CI/CD pipelines)
 sys.exit(exit_code)
@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import sys
+from features.utils.api_client import ApiClient
+from features.utils.config import API_BASE_URL
+from features.utils.load import parse_mix
+from features.utils.stub_server import Ledger, StubServer
+from features.utils.workload import TenantWorkload, parse_weights, seed_accounts
+
+parser = argparse.ArgumentParser(description="Drive a skewed multi-tenant transfer workload and report hot-account contention.")
+parser.add_argument("--accounts", type=int, default=200, help="Accounts to seed across the currencies")
+parser.add_argument("--currencies", default="USD=5,EUR=3,GBP=1,DKK=1", help="Currency weights of the account population")
+parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for credit accounts (0 is uniform)")
+parser.add_argument("--debit-skew", type=float, default=0.0, help="Zipf exponent for debit accounts")
+parser.add_argument("--mix", default="transfer=8,deposit=1,withdraw=1", help="Operation weights")
+parser.add_argument("--rps", type=float, help="Open-loop request rate; omit for closed-loop at --concurrency")
+parser.add_argument("--concurrency", type=int, default=32, help="Worker threads (and HTTP pool size)")
+parser.add_argument("--duration", type=float, default=10, help="Seconds to run")
+parser.add_argument("--amount", type=float, default=1.0, help="Amount per transaction")
+parser.add_argument("--initial-balance", type=float, default=10000.0, help="Starting balance of each account")
+parser.add_argument("--hot", type=int, default=5, help="Busiest accounts to report individually")
+parser.add_argument("--base-url", default=API_BASE_URL)
+parser.add_argument("--stub", action="store_true", help="Start a local in-memory stand-in server and target it")
+parser.add_argument("--row-lock-ms", type=float, default=0.0,
+                    help="Stand-in only: hold a per-account lock this long per transaction to reproduce lock contention")
+parser.add_argument("--output", default=os.path.join("reports", "workload_report.json"), help="JSON report path")
+parser.add_argument("--seed", type=int)
+args = parser.parse_args()
+
+stub_enabled = args.stub or args.row_lock_ms > 0
+stub = StubServer(ledger=Ledger(row_lock_hold=args.row_lock_ms / 1000)).start() if stub_enabled else None
+base_url = stub.base_url if stub else args.base_url
+client = ApiClient(base_url=base_url, pool_size=args.concurrency, retries=0)
+currencies = parse_weights(args.currencies)
+
+try:
+    print(f"\n Seeding {args.accounts} accounts across {', '.join(currencies)} on {base_url}...")
+    accounts = seed_accounts(client, args.accounts, currencies, args.initial_balance, args.concurrency)
+
+    mode = f"open-loop at {args.rps} rps" if args.rps else f"closed-loop with {args.concurrency} workers"
+    print(f" Running {mode} for {args.duration}s (mix: {args.mix}, credit skew {args.skew}, debit skew {args.debit_skew})\n")
+    workload = TenantWorkload(client, accounts, currencies, parse_mix(args.mix), credit_skew=args.skew,
+                              debit_skew=args.debit_skew, amount=args.amount, rps=args.rps,
+                              concurrency=args.concurrency, seed=args.seed)
+    report = workload.run(args.duration, hot=args.hot)
+finally:
+    client.close()
+    if stub:
+        stub.stop()
+
+report["population"] = {currency: len(ids) for currency, ids in accounts.items()}
+
+for operation, numbers in report["operations"].items():
+    print(f" {operation:<9} {numbers['requests']:>7} req  {numbers['throughput_rps']:>8} rps  "
+          f"p50 {numbers['p50_ms']:>7}ms  p95 {numbers['p95_ms']:>7}ms  p99 {numbers['p99_ms']:>7}ms  "
+          f"errors {numbers['error_rate']:.2%}")
+print(f"\n Total: {report['requests']} requests, {report['throughput_rps']} rps, error rate {report['error_rate']:.2%}")
+
+contention = report["contention"]
+print(f"\n Top {len(contention['hot_accounts'])} accounts take {contention['hot_share']:.1%} of account touches; "
+      f"p95 {contention['hot']['p95_ms']}ms vs {contention['cold']['p95_ms']}ms on the rest "
+      f"(x{contention['hot_p95_slowdown']})")
+for account in contention["hot_accounts"]:
+    print(f"   account {account['account']:<8} {account['requests']:>7} req  p50 {account['p50_ms']:>7}ms  "
+          f"p95 {account['p95_ms']:>7}ms  max in flight {account['max_in_flight']}")
+
+os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+with open(args.output, "w", encoding="utf-8") as handle:
+    json.dump(report, handle, indent=2)
+print(f"\n Report written to {args.output}\n")
+
+# Non-zero exit when any transport/5xx errors occurred (useful for CI/CD pipelines)
+sys.exit(1 if report["error_rate"] else 0)
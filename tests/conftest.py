@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Keep the harness logger's files out of reports/ while the unit tests run
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="harness-tests-"))
@@ -0,0 +1,109 @@
+import json
+import time
+import pytest
+from features.utils.cassette import Cassette, CassetteMiss, normalize_request, remap_ids
+
+IGNORED = ["id", "accountId", "debitAccountId", "creditAccountId", "timestamp"]
+
+
+def cassette(tmp_path, mode, **kwargs):
+    return Cassette(str(tmp_path / "api"), mode=mode, ignore_fields=IGNORED, **kwargs)
+
+
+def record(tmp_path, *exchanges):
+    """Records (method, url, body, status, response) exchanges and saves the cassette."""
+    recorder = cassette(tmp_path, "record")
+    for method, url, body, status, response in exchanges:
+        key, ids = recorder.request_key(method, url, body)
+        recorder.after_live(key, status, {}, json.dumps(response), ids=ids)
+    recorder.save()
+    recorder.close()
+
+
+def test_normalize_request_masks_generated_ids():
+    key, ids = normalize_request(
+        "post", "http://host:8080/transfer/?b=2&a=1",
+        b'{"debitAccountId": "17", "creditAccountId": 18, "amount": 5}', IGNORED
+    )
+    assert key == 'POST /transfer?a=1&b=2 {"amount":5,"creditAccountId":"<id>","debitAccountId":"<id>"}'
+    assert ids == [18, "17"]
+
+    key, ids = normalize_request("GET", "http://other/account/42", None, IGNORED)
+    assert (key, ids) == ("GET /account/<id> ", ["42"])
+
+
+def test_requests_with_other_ids_share_a_key():
+    first, _ = normalize_request("POST", "/deposit", '{"accountId": "1", "amount": 10}', IGNORED)
+    second, _ = normalize_request("POST", "/deposit", '{"amount": 10, "accountId": "900"}', IGNORED)
+    other_amount, _ = normalize_request("POST", "/deposit", '{"accountId": "1", "amount": 11}', IGNORED)
+    assert first == second
+    assert first != other_amount
+
+
+def test_remap_ids_keeps_the_recorded_type():
+    body = json.dumps({"id": 7, "accountId": "7", "balance": 7})
+    assert json.loads(remap_ids(body, ["7"], ["31"], IGNORED)) == {"id": 31, "accountId": "31", "balance": 7}
+
+
+def test_replay_serves_recorded_responses_with_live_ids(tmp_path):
+    record(
+        tmp_path,
+        ("POST", "/account", '{"currency": "USD"}', 201, {"id": "1", "currency": "USD"}),
+        ("POST", "/account", '{"currency": "USD"}', 201, {"id": "2", "currency": "USD"}),
+        ("GET", "/account/2", None, 200, {"id": "2", "balance": 0.0}),
+    )
+    replay = cassette(tmp_path, "replay")
+    created = [replay.should_send(*replay.request_key("POST", "/account", '{"currency": "USD"}'))[1] for _ in range(2)]
+    assert [json.loads(entry["body"])["id"] for entry in created] == ["1", "2"]
+
+    send_live, recorded = replay.should_send(*replay.request_key("GET", "http://elsewhere/account/55", None))
+    assert not send_live
+    assert json.loads(recorded["body"]) == {"id": "55", "balance": 0.0}
+
+    with pytest.raises(CassetteMiss):
+        replay.should_send(*replay.request_key("DELETE", "/account/55", None))
+    replay.close()
+
+
+def test_verify_reports_drift_on_requests_with_new_ids(tmp_path):
+    record(tmp_path, ("POST", "/deposit", '{"accountId": "3", "amount": -1}', 400, {"error": "Invalid amount"}))
+    verify = cassette(tmp_path, "verify")
+    key, ids = verify.request_key("POST", "/deposit", '{"accountId": "103", "amount": -1}')
+    send_live, recorded = verify.should_send(key, ids)
+    assert send_live and recorded is not None
+    verify.after_live(key, 500, {}, '{"error": "boom"}', recorded, ids)
+    assert verify.stats()["drift"] == 1
+    assert verify.drift[0]["recorded_status"] == 400
+    verify.close()
+
+
+def test_verify_reports_requests_missing_from_the_cassette(tmp_path):
+    record(tmp_path, ("GET", "/account/1", None, 200, {"id": "1"}))
+    verify = cassette(tmp_path, "verify")
+    key, ids = verify.request_key("POST", "/withdraw", '{"accountId": "1", "amount": 5}')
+    _, recorded = verify.should_send(key, ids)
+    verify.after_live(key, 200, {}, "{}", recorded, ids)
+    assert verify.stats()["misses"] == 1
+    assert verify.drift == [{"request": key, "recorded_status": None, "live_status": 200, "recorded_body": None, "live_body": "{}"}]
+    verify.close()
+
+
+def test_save_evicts_expired_and_oldest_entries(tmp_path):
+    record(tmp_path, *[("GET", f"/rates?page={page}", None, 200, {"page": page}) for page in range(5)])
+
+    stale = cassette(tmp_path, "record", max_entries=3)
+    for record_ in stale.index.records():
+        assert record_["request_ids"] == []
+    stale.after_live("GET /rates?page=9 ", 200, {}, "{}")
+    stale.save()
+    assert stale.index.count == 3
+    kept = sorted(record_["request"] for record_ in stale.index.records())
+    assert kept == ["GET /rates?page=3 ", "GET /rates?page=4 ", "GET /rates?page=9 "]
+    stale.close()
+
+    expired = cassette(tmp_path, "auto", ttl=60)
+    assert expired.should_send("GET /rates?page=3 ")[0] is False
+    expired.ttl = 0.001
+    time.sleep(0.01)
+    assert expired.should_send("GET /rates?page=4 ")[0] is True
+    expired.close()
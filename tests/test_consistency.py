@@ -0,0 +1,82 @@
+from features.utils.consistency import ConsistencyChecker
+from features.utils.stub_server import Ledger
+
+
+class Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        assert self.status_code < 400, self.body
+
+
+class LedgerClient:
+    """The slice of ApiClient the checker uses, answered in-process by a Ledger."""
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+
+    def get_account(self, account_id):
+        return Response(*self.ledger.handle("GET", f"/account/{account_id}"))
+
+    def post(self, endpoint, payload):
+        return Response(*self.ledger.handle("POST", endpoint, payload))
+
+
+def accounts(ledger, count=3, balance=100):
+    ids = []
+    for _ in range(count):
+        account_id = ledger.create_account({"currency": "USD"})[1]["id"]
+        ledger.deposit({"accountId": account_id, "amount": balance, "currency": "USD"})
+        ids.append(account_id)
+    return ids
+
+
+def entry(seq, operation, debit, credit, status=200, start=0.0, end=1.0, amount=1.0):
+    return {"seq": seq, "operation": operation, "debit": debit, "credit": credit, "amount": amount,
+            "status": status, "start": start, "end": end}
+
+
+def test_atomic_ledger_has_no_violations():
+    ledger = Ledger()
+    checker = ConsistencyChecker(LedgerClient(ledger), accounts(ledger),
+                                 mix={"transfer": 3, "deposit": 1, "withdraw": 1}, concurrency=8, seed=3)
+    report = checker.run(300)
+
+    assert report["requests"] == 300
+    assert report["violations"] == []
+    assert sum(report["final_balances"].values()) == 300 + report["statuses"].get("deposit:200", 0) \
+        - report["statuses"].get("withdraw:200", 0)
+
+
+def test_lost_update_is_reported_with_the_overlapping_requests():
+    checker = ConsistencyChecker(None, ["a", "b"])
+    checker.history = [
+        entry(0, "transfer", "a", "b", start=0.0, end=2.0),
+        entry(1, "transfer", "a", "b", start=1.0, end=3.0),
+        entry(2, "transfer", "b", "a", start=5.0, end=6.0),
+    ]
+    # "a" should end at 9, but the overlapping debits both read 10: one of them was lost
+    report = checker.report({"a": 10.0, "b": 10.0}, {"a": 10.0, "b": 11.0}, elapsed=6.0)
+
+    invariants = {(violation["invariant"], violation.get("account")) for violation in report["violations"]}
+    assert invariants == {("conservation", None), ("acknowledged_history", "a")}
+    history = next(v["history"] for v in report["violations"] if v.get("account") == "a")
+    assert [item["seq"] for item in history] == [0, 1]
+
+
+def test_indeterminate_requests_exclude_their_accounts():
+    checker = ConsistencyChecker(None, ["a", "b", "c"])
+    checker.history = [
+        entry(0, "transfer", "a", "b", status="ConnectionError"),
+        entry(1, "withdraw", "c", None, status=200),
+    ]
+    violations = checker.violations({"a": 5.0, "b": 5.0, "c": 5.0}, {"a": 4.0, "b": 6.0, "c": -1.0})
+
+    assert [(violation["invariant"], violation.get("account")) for violation in violations] == [
+        ("non_negative", "c"), ("acknowledged_history", "c")
+    ]
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from features.utils import distributed
+from features.utils.distributed import FileBroker
+
+
+def queued(tmp_path, count=2):
+    broker = FileBroker(str(tmp_path), "api")
+    broker.reset()
+    broker.enqueue([{"paths": ["features"], "scenarios": [f"Scenario {index}"]} for index in range(count)])
+    return broker
+
+
+def age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_each_shard_is_claimed_once(tmp_path):
+    broker = queued(tmp_path, count=20)
+    claims = []
+    lock = threading.Lock()
+
+    def worker(name):
+        while True:
+            claim = broker.claim(name)
+            if claim is None:
+                return
+            with lock:
+                claims.append(claim[1]["id"])
+
+    threads = [threading.Thread(target=worker, args=(f"w{index}",)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claims) == [f"api-{index:03d}" for index in range(20)]
+
+
+def test_lease_starts_when_the_shard_is_claimed(tmp_path):
+    broker = queued(tmp_path, count=1)
+    age(os.path.join(broker.dirs["pending"], "api-000.json"), distributed.LEASE_SECONDS * 10)
+    claimed, shard = broker.claim("w1")
+    assert broker.requeue_expired() == []
+    assert os.path.exists(claimed)
+
+
+def test_expired_claims_are_requeued(tmp_path):
+    broker = queued(tmp_path, count=1)
+    claimed, _ = broker.claim("w1")
+    age(claimed, distributed.LEASE_SECONDS + 1)
+    assert broker.requeue_expired() == ["api-000.json"]
+    assert broker.claim("w2")[1]["id"] == "api-000"
+
+
+def test_finished_waits_for_every_shard(tmp_path):
+    broker = queued(tmp_path, count=2)
+    assert not broker.finished()
+    first = broker.claim("w1")
+    second = broker.claim("w2")
+    assert broker.claim("w1") is None
+    # Nothing is pending, but a claimed shard may still come back if its worker dies
+    assert not broker.finished()
+    assert broker.claims() == 2
+    broker.complete(*first, {"worker": "w1", "exit_code": 0, "seconds": 1.0})
+    assert not broker.finished()
+    broker.complete(*second, {"worker": "w2", "exit_code": 0, "seconds": 1.0})
+    assert broker.finished()
+    assert sorted(result["id"] for result in broker.done()) == ["api-000", "api-001"]
+
+
+def test_claiming_survives_the_coordinator_removing_the_queue(tmp_path):
+    broker = FileBroker(str(tmp_path), "api")
+    assert broker.claim("w1") is None
+    assert not broker.finished()
+    broker = queued(tmp_path, count=1)
+    broker.claim("w1")
+    distributed.shutil.rmtree(os.path.join(str(tmp_path), "api"))
+    assert broker.claim("w2") is None
+    assert broker.claims() == 0
+    # The sealed marker went with the queue; the worker waits for a new run instead of erroring
+    assert not broker.finished()
@@ -0,0 +1,37 @@
+import urllib.error
+import urllib.request
+from features.utils.page_snapshots import SnapshotServer, SnapshotStore
+
+PAGE = ('<html><head><link rel="stylesheet" href="https://example.com/site.css"><script>render()</script></head>'
+        '<body><a href="https://example.com/products">Products</a></body></html>')
+
+
+def test_saved_page_inlines_readable_stylesheets(tmp_path):
+    store = SnapshotStore(str(tmp_path), "https://example.com")
+    store.save("https://example.com/en", PAGE, [
+        ("https://example.com/site.css", ".hidden { display: none; }"),
+        ("https://cdn.example.net/theme.css", None),
+    ])
+
+    html = store.load("/en").decode("utf-8")
+    assert "<script" not in html
+    assert '<style data-snapshot-href="/site.css">\n.hidden { display: none; }\n</style>\n</head>' in html
+    assert "theme.css" not in html
+    assert 'href="/products"' in html
+    assert store.load("/") == store.load("/en")
+
+
+def test_server_serves_recorded_pages_only(tmp_path):
+    store = SnapshotStore(str(tmp_path), "https://example.com")
+    store.save("https://example.com/en", PAGE)
+    server = SnapshotServer(store).start()
+    try:
+        with urllib.request.urlopen(f"{server.base_url}/en") as response:
+            assert b"Products" in response.read()
+        try:
+            urllib.request.urlopen(f"{server.base_url}/site.css")
+            raise AssertionError("an unrecorded path was served")
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        server.stop()
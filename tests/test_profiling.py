@@ -0,0 +1,41 @@
+import json
+from features.utils.profiling import LATENCY_BUCKETS_MS, Profiler, endpoint
+
+
+def request(path, seconds, status=200, method="POST"):
+    return {"method": method, "path": path, "status": status, "total_s": seconds, "connect_s": 0.0, "server_s": seconds}
+
+
+def test_endpoint_masks_ids():
+    assert endpoint("get", "/account/123?expand=1") == "GET /account/{id}"
+    assert endpoint("GET", "/account/0b7e8d3a-1c2f-4a5b-9c8d-7e6f5a4b3c2d/transactions") == "GET /account/{id}/transactions"
+    assert endpoint("POST", "/transfer") == "POST /transfer"
+
+
+def test_requests_are_aggregated_per_endpoint():
+    profiler = Profiler(request_sample=10)
+    for index in range(100):
+        profiler.record_request(request("/deposit", 0.003, status=200 if index % 10 else 400))
+    profiler.record_request(request("/account/7", 0.5, method="GET"))
+
+    deposit = profiler.endpoints["POST /deposit"]
+    assert deposit["count"] == 100
+    assert deposit["statuses"] == {"200": 90, "400": 10}
+    assert deposit["histogram"][LATENCY_BUCKETS_MS.index(5)] == 100
+    assert profiler.endpoints["GET /account/{id}"]["max_seconds"] == 0.5
+    assert profiler.summary()["http"]["requests"] == 101
+    assert round(profiler.summary()["http"]["total_seconds"], 6) == 0.8
+
+
+def test_raw_records_are_a_bounded_sample(tmp_path):
+    profiler = Profiler(request_sample=25)
+    for index in range(10000):
+        profiler.record_request(request(f"/account/{index}", 0.001, method="GET"))
+    assert len(profiler.requests) == 25
+    # Later requests get into the sample too, not just the first 25
+    assert any(int(record["path"].rsplit("/", 1)[1]) >= 25 for record in profiler.requests)
+
+    with open(profiler.write(str(tmp_path)), encoding="utf-8") as handle:
+        timings = json.load(handle)
+    assert len(timings["requests"]) == 25
+    assert timings["endpoints"]["GET /account/{id}"]["count"] == 10000
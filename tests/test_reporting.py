@@ -0,0 +1,42 @@
+import os
+from features.utils import reporting
+
+
+def write(path, text="{}"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+
+
+def test_snapshot_is_not_affected_by_later_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write(os.path.join("allure-results", "a-result.json"))
+    write(os.path.join("allure-results", "history", "history.json"))
+
+    snapshot = reporting.snapshot_results("allure-results")
+    write(os.path.join("allure-results", "b-result.json"))
+
+    assert sorted(os.listdir(snapshot)) == ["a-result.json"]
+
+
+def test_generation_leaves_the_results_directory_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write(os.path.join("allure-results", "a-result.json"))
+    write(os.path.join("allure-report", "history", "history.json"), "[]")
+    generated = []
+
+    def allure(command, shell):
+        snapshot = command.split('"')[1]
+        generated.append(sorted(os.listdir(snapshot)))
+        return 0
+
+    monkeypatch.setattr(reporting.subprocess, "call", allure)
+    snapshot = reporting.snapshot_results("allure-results")
+    assert reporting._generate(snapshot, "allure-report") == 0
+
+    assert generated == [["a-result.json", "history"]]
+    assert os.listdir("allure-results") == ["a-result.json"]
+    assert not os.path.exists(snapshot)
+    # Unchanged results are recognised from the fingerprint of the snapshot
+    assert reporting.generate_report("allure-results", "allure-report") is None
+    assert len(generated) == 1
@@ -0,0 +1,47 @@
+import json
+import re
+from features.utils.scheduler import (
+    assign_shards, base_scenario_name, behave_command, discover_scenarios, durations_from_allure, missing_scenarios
+)
+
+
+def write_result(results_dir, name, start=0, stop=1000):
+    results_dir.mkdir(exist_ok=True)
+    (results_dir / f"{abs(hash((name, start)))}-result.json").write_text(json.dumps({"name": name, "start": start, "stop": stop}))
+
+
+def test_assign_shards_balances_longest_first():
+    durations = {"a": 8, "b": 7, "c": 6, "d": 5, "e": 4}
+    shards = assign_shards(list(durations), 2, durations)
+    assert [shard["scenarios"] for shard in shards] == [["a", "d", "e"], ["b", "c"]]
+    assert [shard["load"] for shard in shards] == [17, 13]
+
+
+def test_assign_shards_drops_empty_shards_and_defaults_unknown_durations():
+    shards = assign_shards(["new", "old"], 5, {"old": 3})
+    assert [shard["scenarios"] for shard in shards] == [["old"], ["new"]]
+    assert assign_shards([], 0, {}) == []
+
+
+def test_outline_rows_count_as_their_outline(tmp_path):
+    assert base_scenario_name("Transfers -- @1.2 Amounts") == "Transfers"
+    write_result(tmp_path, "Transfers -- @1.1 Amounts", 0, 1500)
+    write_result(tmp_path, "Transfers -- @1.2 Amounts", 2000, 2500)
+    assert durations_from_allure(str(tmp_path)) == {"Transfers": 2.0}
+    assert missing_scenarios(str(tmp_path), ["Transfers", "Deposits"]) == ["Deposits"]
+
+
+def test_behave_command_matches_exact_names(tmp_path):
+    command = behave_command(["features"], ["Transfer (USD)"], str(tmp_path))
+    pattern = command[command.index("-n") + 1]
+    assert re.search(pattern, "Transfer (USD)")
+    assert re.search(pattern, "Transfer (USD) -- @1.1 Amounts")
+    assert not re.search(pattern, "Transfer (USD) twice")
+
+
+def test_discover_scenarios_in_file_order(tmp_path):
+    (tmp_path / "a.feature").write_text(
+        "Feature: A\n  Scenario: First\n  Scenario Outline: Second\n  Scenario: First\n", encoding="utf-8"
+    )
+    assert discover_scenarios([str(tmp_path)]) == ["First", "Second"]
+    assert discover_scenarios([str(tmp_path)], name_filter="^Sec") == ["Second"]
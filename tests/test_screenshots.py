@@ -0,0 +1,41 @@
+import threading
+from concurrent.futures import Future
+from types import SimpleNamespace
+from features.utils import attachments, config, screenshots
+
+
+class Driver:
+    def get_screenshot_as_png(self):
+        return b"png"
+
+
+def test_step_does_not_wait_for_encoding(monkeypatch):
+    release = threading.Event()
+    attached = []
+    monkeypatch.setattr(config, "SCREENSHOT_POLICY", "on-step-end")
+    monkeypatch.setattr(config, "ATTACHMENT_LEVEL", "all")
+    monkeypatch.setattr(screenshots, "encode", lambda png: release.wait(5) and (png, "PNG", "frame", False))
+    monkeypatch.setattr(attachments, "_emit", lambda body, name, attachment_type: attached.append(name))
+
+    screenshots.after_step(SimpleNamespace(status="passed", name="first"), Driver())
+    screenshots.after_step(SimpleNamespace(status="passed", name="second"), Driver())
+    assert attached == []
+
+    release.set()
+    screenshots.after_scenario()
+    # The second frame is byte-identical to the first
+    assert attached == ["Step end: first"]
+    screenshots.close()
+
+
+def test_failures_only_keeps_frames_of_failed_steps(monkeypatch):
+    attached = []
+    monkeypatch.setattr(config, "ATTACHMENT_LEVEL", "failures-only")
+    monkeypatch.setattr(attachments, "_emit", lambda body, name, attachment_type: attached.append(name))
+    for index, failed in enumerate((False, True)):
+        future = Future()
+        future.set_result((b"png", "PNG", index, False))
+        screenshots._encoding.append((f"frame {index}", future, failed))
+
+    screenshots.after_scenario()
+    assert attached == ["frame 1"]
@@ -0,0 +1,133 @@
+import os
+import subprocess
+import textwrap
+import pytest
+from features.utils.results_store import ResultsStore
+from features.utils.selection import affected_by_changes, changed_step_definitions, scenarios_referencing
+
+STEPS = textwrap.dedent('''\
+    from behave import given, then
+
+
+    def helper(value):
+        return value * 2
+
+
+    @given("a deposit of {amount}")
+    def step_impl(context, amount):
+        context.amount = helper(amount)
+
+
+    @then("the balance is {amount}")
+    def step_impl(context, amount):
+        assert context.amount == amount
+''')
+
+FEATURE = textwrap.dedent('''\
+    Feature: Money
+
+      Scenario: Deposit
+        Given a deposit of 5
+        Then the balance is 10
+
+      Scenario Outline: Dataset
+        Given the transaction dataset "<dataset>"
+
+        Examples:
+          | dataset               |
+          | data/transactions.csv |
+''')
+
+
+def git(*args):
+    subprocess.run(["git", *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("features/steps")
+    os.makedirs("features/data")
+    os.makedirs("features/utils")
+    files = {
+        "features/steps/money_steps.py": STEPS,
+        "features/money.feature": FEATURE,
+        "features/data/transactions.csv": "operation,amount\ndeposit,5\n",
+        "features/utils/helpers.py": "",
+        "features/notes.txt": "nothing refers to this\n",
+    }
+    for path, content in files.items():
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(content)
+    git("init", "-q")
+    git("-c", "user.email=t@t", "-c", "user.name=t", "commit", "-q", "--allow-empty", "-m", "empty")
+    git("add", "-A")
+    git("-c", "user.email=t@t", "-c", "user.name=t", "commit", "-q", "-m", "base")
+
+    store = ResultsStore(str(tmp_path / "results.db"))
+    store.record([
+        {"scenario": "Deposit", "feature_file": "features/money.feature", "status": "passed", "duration": 1.0,
+         "step_defs": {"features/steps/money_steps.py::a deposit of {amount}",
+                       "features/steps/money_steps.py::the balance is {amount}"}},
+        {"scenario": "Dataset", "feature_file": "features/money.feature", "status": "passed", "duration": 1.0,
+         "step_defs": {"features/steps/dataset_steps.py::the transaction dataset \"{dataset}\""}},
+    ])
+    yield store
+    store.close()
+
+
+def edit(path, old, new):
+    with open(path, encoding="utf-8") as handle:
+        content = handle.read()
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(content.replace(old, new))
+
+
+def affected(store):
+    return affected_by_changes("HEAD", store, ["features"], ["features/steps"], ["features/environment.py", "features/utils"])
+
+
+def test_no_changes_select_nothing(repo):
+    assert affected(repo) == set()
+
+
+def test_step_body_change_selects_its_scenarios(repo):
+    edit("features/steps/money_steps.py", "assert context.amount == amount", "assert context.amount == int(amount)")
+    assert changed_step_definitions("HEAD", ["features/steps"]) == (
+        {"features/steps/money_steps.py::the balance is {amount}"}, set()
+    )
+    assert affected(repo) == {"Deposit"}
+
+
+def test_helper_change_selects_every_scenario_using_the_module(repo):
+    edit("features/steps/money_steps.py", "return value * 2", "return value * 3")
+    assert changed_step_definitions("HEAD", ["features/steps"]) == (set(), {"features/steps/money_steps.py"})
+    assert affected(repo) == {"Deposit"}
+
+
+def test_import_change_selects_every_scenario_using_the_module(repo):
+    edit("features/steps/money_steps.py", "from behave import given, then", "from behave import given, then, when")
+    assert affected(repo) == {"Deposit"}
+
+
+def test_dataset_change_selects_the_scenarios_that_reference_it(repo):
+    assert scenarios_referencing(["features/data/transactions.csv"], ["features"]) == {"Dataset"}
+    edit("features/data/transactions.csv", "deposit,5", "deposit,6")
+    assert affected(repo) == {"Dataset"}
+
+
+def test_support_change_runs_everything(repo):
+    edit("features/utils/helpers.py", "", "VALUE = 1\n")
+    assert affected(repo) is None
+
+
+def test_untraceable_change_runs_everything(repo):
+    edit("features/notes.txt", "nothing", "still nothing")
+    assert affected(repo) is None
+
+
+def test_change_without_recorded_users_runs_everything(repo):
+    with repo.connection:
+        repo.connection.execute("DELETE FROM scenario_steps WHERE scenario = 'Deposit'")
+    edit("features/steps/money_steps.py", "assert context.amount == amount", "assert context.amount == int(amount)")
+    assert affected(repo) is None
@@ -0,0 +1,62 @@
+import threading
+from features.utils.stub_server import Ledger
+
+
+def funded(ledger, balance, currency="USD"):
+    _, account = ledger.handle("POST", "/account", {"currency": currency})
+    if balance:
+        ledger.handle("POST", "/transaction/deposit", {"accountId": account["id"], "amount": balance, "currency": currency})
+    return account["id"]
+
+
+def balance(ledger, account_id):
+    return ledger.handle("GET", f"/account/{account_id}")[1]["balance"]
+
+
+def test_status_codes_match_the_feature_files():
+    ledger = Ledger()
+    debit, credit = funded(ledger, 100), funded(ledger, 0)
+
+    assert ledger.handle("POST", "/account", {"currency": "XYZ"})[0] == 400
+    assert ledger.handle("GET", "/account/999")[0] == 404
+    transfer = {"debitAccountId": debit, "creditAccountId": credit, "currency": "USD"}
+    assert ledger.handle("POST", "/transaction/transfer", dict(transfer, amount=-5))[0] == 400
+    assert ledger.handle("POST", "/transaction/transfer", dict(transfer, amount=500))[0] == 400
+    assert ledger.handle("POST", "/transaction/transfer", dict(transfer, amount=40, currency="EUR"))[0] == 400
+    assert ledger.handle("POST", "/transaction/transfer", dict(transfer, creditAccountId="999", amount=1))[0] == 404
+    assert ledger.handle("POST", "/transaction/transfer/", dict(transfer, amount=40))[0] == 200
+    assert (balance(ledger, debit), balance(ledger, credit)) == (60.0, 40.0)
+
+
+def test_concurrent_transfers_conserve_money():
+    ledger = Ledger(row_lock_hold=0.001)
+    accounts = [funded(ledger, 50) for _ in range(3)]
+
+    def transfers(offset):
+        for index in range(30):
+            debit, credit = accounts[(index + offset) % 3], accounts[(index + offset + 1) % 3]
+            ledger.transfer({"debitAccountId": debit, "creditAccountId": credit, "amount": 7, "currency": "USD"})
+
+    threads = [threading.Thread(target=transfers, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    balances = [balance(ledger, account_id) for account_id in accounts]
+    assert sum(balances) == 150.0
+    assert min(balances) >= 0
+
+
+def test_idempotency_key_applies_a_transaction_once():
+    ledger = Ledger()
+    account = funded(ledger, 0)
+    deposit = {"accountId": account, "amount": 10, "currency": "USD"}
+
+    first = ledger.handle("POST", "/transaction/deposit", deposit, idempotency_key="k1")
+    repeat = ledger.handle("POST", "/transaction/deposit", deposit, idempotency_key="k1")
+    other = ledger.handle("POST", "/transaction/deposit", dict(deposit, amount=20), idempotency_key="k1")
+
+    assert first == repeat
+    assert other[0] == 422
+    assert balance(ledger, account) == 10.0
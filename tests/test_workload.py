@@ -0,0 +1,40 @@
+from collections import Counter
+from features.utils.workload import TenantWorkload, parse_weights, zipf_cumulative
+
+
+def workload(ids, credit_skew=1.1, debit_skew=0.0, seed=7):
+    return TenantWorkload(None, {"USD": ids}, {"USD": 1.0}, {"transfer": 1.0},
+                          credit_skew=credit_skew, debit_skew=debit_skew, seed=seed)
+
+
+def test_parse_weights_defaults_to_one():
+    assert parse_weights("usd=5, EUR=3,GBP") == {"USD": 5.0, "EUR": 3.0, "GBP": 1.0}
+
+
+def test_zipf_cumulative():
+    assert zipf_cumulative(3, 0) == [1.0, 2.0, 3.0]
+    assert zipf_cumulative(2, 1) == [1.0, 1.5]
+
+
+def test_excluding_the_dominant_rank_needs_no_retries():
+    runner = workload(["a", "b", "c"], credit_skew=20)
+    cumulative = runner.credit_weights["USD"]
+    # Rank 1 holds all but ~1e-6 of the weight; a rejection loop would redraw about a million times per pick
+    picks = Counter(runner._pick("USD", cumulative, exclude="a") for _ in range(2000))
+    assert set(picks) <= {"b", "c"}
+    assert picks["b"] > picks["c"]
+
+
+def test_exclusion_keeps_the_remaining_proportions():
+    runner = workload(["a", "b", "c", "d"], debit_skew=0.0)
+    cumulative = runner.debit_weights["USD"]
+    picks = Counter(runner._pick("USD", cumulative, exclude="c") for _ in range(6000))
+    assert "c" not in picks
+    assert all(1700 < picks[account] < 2300 for account in ("a", "b", "d"))
+
+
+def test_transfer_pairs_never_repeat_an_account():
+    runner = workload([f"acc-{index}" for index in range(5)], credit_skew=3, debit_skew=3)
+    for _ in range(500):
+        _, payload = runner.next_request()
+        assert payload["debitAccountId"] != payload["creditAccountId"]
@@ -1,8 +1,89 @@
-from selenium import webdriver
+from features.utils import attachments, config, screenshots
+from features.utils.driver_pool import DriverPool
+from features.utils.logger import logger, set_log_context
+from features.utils.page_snapshots import SnapshotServer, SnapshotStore, page_stylesheets
+from features.utils.profiling import Profiler, timed_fixture
+from features.utils.results_store import ScenarioRecorder, runner_step_registry
+from features.utils.waits import drain_timings
 
 def before_all(context):
     context.driver = None
+    context.recorder = ScenarioRecorder(runner_step_registry(context))
+    context.profiler = Profiler(config.WORKER_ID, config.PROFILE_REQUEST_SAMPLE) if config.PROFILING_ENABLED else None
+    attachments.install()
+
+    # Offline runs serve the recorded pages from a local server instead of UI_BASE_URL
+    context.base_url = config.UI_BASE_URL
+    context.snapshots = None
+    context.snapshot_server = None
+    if config.UI_SNAPSHOT_MODE in ("record", "replay"):
+        context.snapshots = SnapshotStore(config.UI_SNAPSHOT_DIR, config.UI_BASE_URL)
+    if config.UI_SNAPSHOT_MODE == "replay":
+        context.snapshot_server = SnapshotServer(context.snapshots).start()
+        context.base_url = context.snapshot_server.base_url
+        logger.info(f"Serving UI snapshots from {config.UI_SNAPSHOT_DIR} on {context.base_url}")
+
+    # One warm browser session for the whole run instead of a new browser per scenario. behave runs
+    # scenarios one after another, so a second session per process would only ever sit idle
+    pool_size = min(config.UI_DRIVER_POOL_SIZE, 1)
+    if config.UI_DRIVER_POOL_SIZE > 1:
+        logger.warning(f"UI_DRIVER_POOL_SIZE={config.UI_DRIVER_POOL_SIZE} applies per behave process, which runs one scenario "
+                       f"at a time; keeping 1 session. Run more UI workers for more browsers")
+    with timed_fixture(context, "driver pool warm-up"):
+        context.driver_pool = DriverPool(
+            size=pool_size,
+            headless=config.UI_HEADLESS,
+            window_size=config.UI_WINDOW_SIZE,
+            block_resources=config.UI_BLOCK_RESOURCES,
+            blocked_urls=config.UI_BLOCKED_URLS
+        )
+        context.driver_pool.warm_up()
+
+def before_scenario(context, scenario):
+    set_log_context(scenario=scenario.name, step=None)
+    context.recorder.start_scenario(scenario)
+    if context.profiler is not None:
+        context.profiler.start_scenario(scenario)
+
+def before_step(context, step):
+    set_log_context(step=f"{step.keyword} {step.name}")
+    if context.profiler is not None:
+        context.profiler.start_step(step)
+
+def after_step(context, step):
+    if context.profiler is not None:
+        context.profiler.end_step(step)
+    context.recorder.record_step(step)
+    if config.UI_SNAPSHOT_MODE == "record" and context.driver:
+        context.snapshots.save(context.driver.current_url, context.driver.page_source, page_stylesheets(context.driver))
+    screenshots.after_step(step, context.driver)
+    attachments.after_step(step)
 
 def after_scenario(context, scenario):
+    waits = drain_timings()
+    if waits:
+        total = sum(seconds for _, seconds, _ in waits)
+        slowest = max(waits, key=lambda wait: wait[1])
+        logger.info(f"Scenario '{scenario.name}' spent {total:.2f}s in {len(waits)} waits; slowest: {slowest[0]} ({slowest[1]:.2f}s)")
     if context.driver:
-        context.driver.quit()
\ No newline at end of file
+        with timed_fixture(context, "driver session reset"):
+            context.driver_pool.release(context.driver)
+        context.driver = None
+    screenshots.after_scenario()
+    if context.profiler is not None:
+        context.profiler.end_scenario(scenario)
+    context.recorder.end_scenario(scenario)
+    set_log_context(scenario=None, step=None)
+
+def after_all(context):
+    context.driver_pool.close()
+    if context.snapshot_server is not None:
+        context.snapshot_server.stop()
+    screenshots.close()
+    attachments.flush()
+    context.recorder.flush(config.WORKER_ID)
+
+    if context.profiler is not None:
+        path = context.profiler.write(f"{config.TIMINGS_DIR}/ui", config.PROFILE_TOP_N)
+        print(context.profiler.format_summary(config.PROFILE_TOP_N))
+        print(f" Timings written to {path}\n")
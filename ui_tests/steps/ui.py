@@ -1,110 +1,98 @@
-import time
-import allure
-import logging
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from features.utils import screenshots
+from features.utils.attachments import allure_step, attach, attachment_type
 from features.utils.logger import logger
-from selenium.webdriver.edge.service import Service
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+from features.utils.product_listing import product_listing
+from features.utils.waits import wait_for, visible, click_when_ready, find_optional, scroll_into_view
 from behave import given, when, then
 
 @given("I navigate to the GomSpace website")
-@allure.step("Navigating to GomSpace website")
+@allure_step("Navigating to GomSpace website")
 def step_impl(context):
-    """Launch Microsoft Edge, open GomSpace website, and handle cookie pop-up if present."""
-    logger.info("Initializing Edge WebDriver...")
+    """Take a warm Edge session from the driver pool, open GomSpace website, and handle cookie pop-up if present."""
+    logger.info("Acquiring Edge WebDriver session from the pool...")
 
-    # Use Microsoft Edge WebDriver
-    context.driver = webdriver.Edge(service=Service(EdgeChromiumDriverManager().install()))
+    # Use a pooled Microsoft Edge WebDriver session
+    context.driver = context.driver_pool.acquire()
 
-    logger.info("Navigating to GomSpace website: https://gomspace.com")
-    context.driver.get("https://gomspace.com")
+    # UI_BASE_URL, or the local snapshot server in offline (replay) mode
+    logger.info(f"Navigating to GomSpace website: {context.base_url}")
+    context.driver.get(context.base_url)
 
-    # Maximize the window for live visibility
-    context.driver.maximize_window()
+    # Maximize the window for live visibility (headless sessions use a fixed window size)
+    if not context.driver_pool.headless:
+        context.driver.maximize_window()
     
     # Wait for the page to load
-    WebDriverWait(context.driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+    wait_for(context.driver, EC.presence_of_element_located((By.TAG_NAME, "body")), "Homepage body")
 
     # Handle Cookie Pop-up if Present
     try:
         logger.info("Checking for cookie consent pop-up...")
 
-        # Wait for the Accept Cookies button to be present and clickable
-        accept_cookies_button = WebDriverWait(context.driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//a[contains(text(),'Allow all cookies')]"))
-        )
+        # Returns None as soon as the loaded page has no cookie pop-up
+        accept_cookies_button = find_optional(context.driver, (By.XPATH, "//a[contains(text(),'Allow all cookies')]"), "Cookie pop-up")
 
-        if accept_cookies_button.is_displayed():
+        if accept_cookies_button is None:
+            logger.info("No cookie consent pop-up found. Proceeding with the test.")
+        elif accept_cookies_button.is_displayed():
             logger.info("Cookie pop-up detected. Clicking 'Accept' button.")
             # Attach Screenshot of Accepting Cookies
-            allure.attach(context.driver.get_screenshot_as_png(), name="Cookies to be Accepted", attachment_type=allure.attachment_type.PNG)
+            screenshots.capture(context.driver, "Cookies to be Accepted")
             
             # Click on Accept Button
-            accept_cookies_button.click()
+            wait_for(context.driver, EC.element_to_be_clickable(accept_cookies_button), "Cookie pop-up (clickable)").click()
 
             # Wait for the button to disappear or for the next step to load
-            WebDriverWait(context.driver, 5).until(
-                EC.invisibility_of_element(accept_cookies_button)
-            )
+            wait_for(context.driver, EC.invisibility_of_element(accept_cookies_button), "Cookie pop-up (dismissed)", timeout=5)
 
             # Attach Screenshot after Accepting Cookies
-            allure.attach(context.driver.get_screenshot_as_png(), name="Cookies Accepted", attachment_type=allure.attachment_type.PNG)
+            screenshots.capture(context.driver, "Cookies Accepted")
             
             logger.info("Cookie pop-up handled successfully.")
 
     except Exception as e:
-        logger.warning("No cookie consent pop-up found. Proceeding with the test.")
+        logger.warning("Cookie consent pop-up could not be handled. Proceeding with the test.")
         logger.warning(f"Error: {e}")
 
     # Attach Screenshot of Homepage
-    allure.attach(context.driver.get_screenshot_as_png(), name="Homepage Screenshot", attachment_type=allure.attachment_type.PNG)
+    screenshots.capture(context.driver, "Homepage Screenshot")
     logger.info("GomSpace website opened successfully.")
 
 @when("I go to the Products menu and select a subcategory")
-@allure.step("Navigating to Products menu and selecting a subcategory")
+@allure_step("Navigating to Products menu and selecting a subcategory")
 def step_impl(context):
     logger.info("Attempting to click on the 'Products' menu.")
     
     try:
         # Wait for the 'Products' menu to be clickable
-        products_menu = WebDriverWait(context.driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//span[@class='main_title'][normalize-space()='Products']"))
-        )
-        products_menu.click()
+        click_when_ready(context.driver, (By.XPATH, "//span[@class='main_title'][normalize-space()='Products']"), "Products menu")
         
         # Wait for the subcategory link to be clickable
         logger.info("Products menu clicked. Selecting a subcategory.")
-        subcategory = WebDriverWait(context.driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//span[@class='title'][normalize-space()='Power Systems']"))
-        )
-        subcategory.click()
+        click_when_ready(context.driver, (By.XPATH, "//span[@class='title'][normalize-space()='Power Systems']"), "Power Systems subcategory")
 
         # Attach screenshot for debugging
-        allure.attach(context.driver.get_screenshot_as_png(), name="Subcategory Selected", attachment_type=allure.attachment_type.PNG)
+        screenshots.capture(context.driver, "Subcategory Selected")
 
         logger.info("Subcategory 'Power Systems' selected successfully.")
     
     except Exception as e:
         logger.error(f"Error selecting subcategory: {str(e)}")
-        allure.attach(str(e), name="Error Details", attachment_type=allure.attachment_type.TEXT)
+        attach(str(e), name="Error Details", attachment_type=attachment_type.TEXT)
         raise
 
 @then("the number of displayed products should be greater than 0")
-@allure.step("Verifying product count is greater than 0")
+@allure_step("Verifying product count is greater than 0")
 def step_impl(context):
     logger.info("Checking the number of displayed products.")
     
     try:
-        # Wait for product items to be visible
-        products = WebDriverWait(context.driver, 10).until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "shop_productlistdynamiccolumns"))
-        )
-        product_count = len(products)
+        # Reads every product in one script call; the snapshot is reused by the next step
+        product_count = product_listing(context).count()
         
-        allure.attach(f"Product Count: {product_count}", name="Product Count", attachment_type=allure.attachment_type.TEXT)
+        attach(f"Product Count: {product_count}", name="Product Count", attachment_type=attachment_type.TEXT)
 
         assert product_count > 0, f"Expected at least 1 product, but found {product_count}"
         
@@ -112,131 +100,109 @@ def step_impl(context):
 
     except Exception as e:
         logger.error(f"Error verifying product count: {str(e)}")
-        allure.attach(str(e), name="Error Details", attachment_type=allure.attachment_type.TEXT)
+        attach(str(e), name="Error Details", attachment_type=attachment_type.TEXT)
         raise
 
 @then("each product should have a title and description")
-@allure.step("Verifying each product has a title and description")
+@allure_step("Verifying each product has a title and description")
 def step_impl(context):
     logger.info("Checking each product for title and description.")
     
     try:
-        # Wait for the products to be visible
-        products = WebDriverWait(context.driver, 10).until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "shop_productlistdynamiccolumns"))
-        )
-        
-        for product in products:
-            try:
-                title = product.find_element(By.CLASS_NAME, "name").text
-                description = product.find_element(By.CLASS_NAME, "teaser").text
-                
-                allure.attach(f"Title: {title}, Description: {description}", name="Product Details", attachment_type=allure.attachment_type.TEXT)
-                
-                assert title, "Product title is missing"
-                assert description, "Product description is missing"
-                
-                logger.info(f"Verified product: {title} - {description}")
-            
-            except Exception as e:
-                logger.error(f"Error verifying product details: {str(e)}")
-                allure.attach(str(e), name="Error Details", attachment_type=allure.attachment_type.TEXT)
-                raise
+        listing = product_listing(context)
+        products = listing.products()
+
+        # One aggregated attachment instead of one per product
+        attach(listing.summary(), name="Product Details", attachment_type=attachment_type.TEXT)
+
+        # Assertions run locally on the snapshot, no WebDriver calls per product
+        incomplete = listing.incomplete()
+        missing = [
+            f"product {index}: " + ", ".join(field for field in ("title", "description") if not product[field]) + " missing"
+            for index, product in incomplete
+        ]
+        assert not missing, f"{len(missing)} of {len(products)} products are incomplete: " + "; ".join(missing)
+
+        logger.info(f"Verified title and description of {len(products)} products.")
 
     except Exception as e:
         logger.error(f"Error verifying products: {str(e)}")
-        allure.attach(str(e), name="Error Details", attachment_type=allure.attachment_type.TEXT)
+        attach(str(e), name="Error Details", attachment_type=attachment_type.TEXT)
         raise
 
 @when('I click on the "Read more" button for a product')
-@allure.step("Clicking 'Read more' button")
+@allure_step("Clicking 'Read more' button")
 def step_impl(context):
     logger.info("Clicking on 'Read more' button for a product.")
     
     try:
-        # Locate the 'Read more' button first
-        read_more_button = context.driver.find_element(By.XPATH, "//div[@class='shop_productlistcolumn_item itemno1']//span[contains(text(),'Read more')]")
-        
-        # Scroll incrementally by a percentage (20%) until the element is visible
-        max_scrolls = 5  # Define the maximum number of scrolls
-        scrolls = 0
-        while scrolls < max_scrolls:
-            # Scroll down by a small percentage of the page height (e.g., 20%)
-            context.driver.execute_script("window.scrollBy(0, window.innerHeight * 0.2);")
-            time.sleep(1)  # Give the page some time to load content
-            
-            # Check if the 'Read more' button is in the viewport
-            if read_more_button.is_displayed():
-                logger.info("Found 'Read more' button in view.")
-                break
+        read_more_locator = (By.XPATH, "//div[@class='shop_productlistcolumn_item itemno1']//span[contains(text(),'Read more')]")
 
-            scrolls += 1
-        # Attach screenshot before clicking 'Read More'
-        allure.attach(context.driver.get_screenshot_as_png(), name="Read More is visible to click", attachment_type=allure.attachment_type.PNG)
+        # Scroll the 'Read more' button into view and wait until it is visible
+        visible(context.driver, read_more_locator, "'Read more' button")
+        logger.info("Found 'Read more' button in view.")
 
-        # Wait for the 'Read more' button to be clickable after scrolling
-        WebDriverWait(context.driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//div[@class='shop_productlistcolumn_item itemno1']//span[contains(text(),'Read more')]"))
-        )
+        # Attach screenshot before clicking 'Read More'
+        screenshots.capture(context.driver, "Read More is visible to click")
 
-        # Click the 'Read more' button
-        read_more_button.click()
+        # Wait for the 'Read more' button to be clickable and click it
+        click_when_ready(context.driver, read_more_locator, "'Read more' button")
 
         # Attach screenshot after clicking 'Read More'
-        allure.attach(context.driver.get_screenshot_as_png(), name="Read More Clicked", attachment_type=allure.attachment_type.PNG)
+        screenshots.capture(context.driver, "Read More Clicked")
 
         logger.info("Clicked on 'Read more' button successfully.")
     
     except Exception as e:
         logger.error(f"Error clicking 'Read more': {str(e)}")
-        allure.attach(str(e), name="Error Details", attachment_type=allure.attachment_type.TEXT)
+        attach(str(e), name="Error Details", attachment_type=attachment_type.TEXT)
         raise
 
 @then("I should be navigated to the product details page")
-@allure.step("Verifying product details page")
+@allure_step("Verifying product details page")
 def step_impl(context):
     logger.info("Verifying product details page is displayed.")
     
     try:
         # Wait for the 'Add to quote request' button to be visible
-        add_to_quote_button = WebDriverWait(context.driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//span[normalize-space()='Add to quote request']"))
-        )
+        add_to_quote_button = wait_for(context.driver, EC.presence_of_element_located((By.XPATH, "//span[normalize-space()='Add to quote request']")), "'Add to quote request' button")
         
         # Scroll to the 'Add to quote request' button to ensure it's visible
-        context.driver.execute_script("arguments[0].scrollIntoView(true);", add_to_quote_button)
+        scroll_into_view(context.driver, add_to_quote_button)
 
         # Verify the product detail page by checking the button or any relevant information
         product_detail_header = add_to_quote_button.text
         
-        allure.attach(product_detail_header, name="Product Detail Page Header", attachment_type=allure.attachment_type.TEXT)
+        attach(product_detail_header, name="Product Detail Page Header", attachment_type=attachment_type.TEXT)
 
         assert product_detail_header, "Product details page not loaded properly"
 
         # Attach screenshot of the product details page
-        allure.attach(context.driver.get_screenshot_as_png(), name="Product Details Page", attachment_type=allure.attachment_type.PNG)
+        screenshots.capture(context.driver, "Product Details Page")
 
         logger.info(f"Successfully navigated to the product details page: {product_detail_header}")
     
     except Exception as e:
         logger.error(f"Error verifying product details page: {str(e)}")
-        allure.attach(str(e), name="Error Details", attachment_type=allure.attachment_type.TEXT)
+        attach(str(e), name="Error Details", attachment_type=attachment_type.TEXT)
         raise
 
 @then("I close the browser")
-@allure.step("Closing the browser")
+@allure_step("Closing the browser")
 def step_impl(context):
     logger.info("Closing the browser.")
     
     try:
         if context.driver:
-            context.driver.quit()
+            # Hand the session back to the pool; it is reset rather than relaunched
+            context.driver_pool.release(context.driver)
+            context.driver = None
             logger.info("Browser closed successfully.")
         else:
             logger.warning("Browser was already closed.")
     
     except Exception as e:
         logger.error(f"Error closing the browser: {str(e)}")
-        allure.attach(str(e), name="Error Details", attachment_type=allure.attachment_type.TEXT)
+        attach(str(e), name="Error Details", attachment_type=attachment_type.TEXT)
         raise
 